@@ -3,16 +3,24 @@ import os
 import sys
 import time
 import json
+import queue
+import threading
 from langchain_core.runnables.config import RunnableConfig
 
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.state import ResearcherState, HitlState
-from src.graph import create_hitl_graph, create_main_graph
 from src.configuration import get_config_instance
 from src.vector_db import get_embedding_model_path, get_vector_db_path, SPECIAL_DB_CONFIG
 from src.rag_helpers import get_llm_models, get_license_content
+from src.memory import ConversationMemory
+from src.checkpointing import get_session_config, list_research_sessions
+from src.cancellation import CancellationToken, ResearchCancelled
+from src.tracing import trace_run, span
+from src.llm_metrics import metrics_run, get_metrics_registry
+from src.perf_metrics import get_performance_store
+from src.warmup import ResourceWarmer, get_compiled_graphs
 
 # Set page config
 st.set_page_config(
@@ -43,6 +51,25 @@ def get_available_databases():
             
     return sorted(dbs)
 
+def get_main_graph():
+    """Main graph (compiled once per process), persisted per research session when checkpointing is enabled."""
+    config = get_config_instance()
+    return get_compiled_graphs(config.checkpoint_db_path, config.enable_checkpointing)["main"]
+
+@st.cache_resource(show_spinner=False)
+def get_resource_warmer(selected_database, embedding_model, llm_model, checkpoint_db_path, checkpointing, keep_alive):
+    """Warm-up of the graphs, embedding model, vector index and LLM; started once per process and setting."""
+    return ResourceWarmer(selected_database, embedding_model, [llm_model], checkpoint_db_path=checkpoint_db_path,
+                          checkpointing=checkpointing, keep_alive=keep_alive).start()
+
+def start_new_research():
+    """Cancel a research run that may still be in flight and reset the session."""
+    token = st.session_state.get("research_cancel_token")
+    if token is not None:
+        token.cancel("New research started")
+    st.session_state.clear()
+    st.rerun()
+
 def initialize_session_state():
     """Initialize session state variables."""
     if "hitl_complete" not in st.session_state:
@@ -57,8 +84,17 @@ def initialize_session_state():
     if "messages" not in st.session_state:
         st.session_state.messages = []
         
+    if "conversation_memory" not in st.session_state:
+        st.session_state.conversation_memory = None
+        
     if "current_phase" not in st.session_state:
         st.session_state.current_phase = "hitl" # hitl, research, complete
+        
+    if "research_session_id" not in st.session_state:
+        st.session_state.research_session_id = None
+        
+    if "resume_requested" not in st.session_state:
+        st.session_state.resume_requested = False
 
 # --- Sidebar ---
 
@@ -102,15 +138,99 @@ def render_sidebar():
         config.max_search_queries = st.number_input("Max Search Queries", min_value=1, max_value=10, value=3)
         config.enable_web_search = st.checkbox("Enable Web Search", value=False)
         config.enable_quality_checker = st.checkbox("Enable Quality Checker", value=True)
+        single_pass = st.checkbox(
+            "Single-pass Query Generation",
+            value=config.kb_question_mode == "single_pass",
+            help="Generate analysis and research queries in one structured LLM call and start retrieval while queries are streamed"
+        )
+        config.kb_question_mode = "single_pass" if single_pass else "two_pass"
+        sectioned = st.checkbox(
+            "Section-parallel Report",
+            value=config.report_mode == "sectioned",
+            help="Generate the report sections of the report structure concurrently and stitch them together"
+        )
+        config.report_mode = "sectioned" if sectioned else "single_pass"
+        incremental = st.checkbox(
+            "Repair Failing Sections Only",
+            value=config.reflection_mode == "incremental",
+            help="On a failed quality check regenerate only the sections with issues instead of the whole report"
+        )
+        config.reflection_mode = "incremental" if incremental else "full"
+        
+        if config.enable_warmup:
+            render_warmup_status(get_resource_warmer(
+                config.selected_database, config.embedding_model, config.llm_model,
+                config.checkpoint_db_path, config.enable_checkpointing, config.warmup_keep_alive
+            ))
+        
+        if config.enable_checkpointing and st.session_state.current_phase == "hitl":
+            render_resumable_sessions()
         
         st.divider()
         st.markdown("### Debug Info")
+        config.enable_tracing = st.checkbox(
+            "Record Trace",
+            value=config.enable_tracing,
+            help="Record timing spans of every node, LLM call, embedding and search and write them to .cache/traces after the research run"
+        )
+        config.enable_profiling = st.checkbox(
+            "Profile Nodes",
+            value=config.enable_profiling,
+            help=f"Run {config.profile_targets} under cProfile and tracemalloc and write the profiles to .cache/profiles/<session>"
+        )
+        st.session_state.show_performance = st.checkbox(
+            "Performance Dashboard",
+            value=st.session_state.get("show_performance", False),
+            help="Node timeline, LLM throughput, cache hit rates, retrieval latency and memory of recent runs"
+        )
         if st.checkbox("Show State"):
             if st.session_state.hitl_state:
                 st.json(st.session_state.hitl_state)
             if st.session_state.research_state:
                 st.json(st.session_state.research_state)
 
+WARMUP_ICONS = {"pending": "⏸️", "running": "⏳", "ready": "✅", "skipped": "➖", "failed": "❌"}
+
+def render_warmup_status(warmer):
+    """Readiness of the warmed-up resources; refreshes itself until the warm-up is done."""
+    def render():
+        steps = warmer.status()
+        ready = sum(step["state"] in ("ready", "skipped") for step in steps)
+        with st.expander(f"Warm-up: {ready}/{len(steps)} ready", expanded=not warmer.done):
+            for step in steps:
+                timing = f" ({step['ms'] / 1000:.1f}s)" if step["ms"] is not None else ""
+                detail = f" – {step['detail']}" if step["detail"] and step["state"] != "ready" else ""
+                st.caption(f"{WARMUP_ICONS[step['state']]} {step['step']}{timing}{detail}")
+    
+    # Polls while warming up; the next full rerun renders it once more without polling
+    st.fragment(render, run_every=None if warmer.done else 1.0)()
+
+def render_resumable_sessions():
+    """List interrupted research runs of earlier app sessions and offer to resume them."""
+    # Read once per page load and after each research run (see run_research), not on every rerun:
+    # listing scans the checkpoints table and loads the state of each session
+    if "resumable_sessions" not in st.session_state:
+        try:
+            st.session_state.resumable_sessions = list_research_sessions(get_main_graph(), limit=5)
+        except Exception as e:
+            st.caption(f"Could not read research checkpoints: {e}")
+            return
+    sessions = st.session_state.resumable_sessions
+    if not sessions:
+        return
+    st.subheader("Interrupted Research")
+    for session in sessions:
+        label = session["user_query"][:60] or session["session_id"]
+        st.caption(f"{session['updated'] or ''} · next: {', '.join(session['next'])}")
+        if st.button(f"♻️ Resume: {label}", key=f"resume_{session['session_id']}"):
+            snapshot = get_main_graph().get_state(get_session_config(session["session_id"]))
+            st.session_state.research_session_id = session["session_id"]
+            st.session_state.research_state = dict(snapshot.values)
+            st.session_state.hitl_complete = True
+            st.session_state.resume_requested = True
+            st.session_state.current_phase = "research"
+            st.rerun()
+
 # --- HITL Phase ---
 
 def render_hitl_phase():
@@ -135,12 +255,15 @@ def render_hitl_phase():
                 report_llm=get_config_instance().llm_model,
                 summarization_llm=get_config_instance().llm_model,
                 research_queries=[],
-                max_search_queries=get_config_instance().max_search_queries
+                max_search_queries=get_config_instance().max_search_queries,
+                prefetched_documents={},
+                dropped_queries=[]
             )
             
             # Run initial detection and question generation
             with st.spinner("Analyzing query and generating follow-up questions..."):
-                hitl_graph = create_hitl_graph()
+                config = get_config_instance()
+                hitl_graph = get_compiled_graphs(config.checkpoint_db_path, config.enable_checkpointing)["hitl"]
                 # Run just the first steps
                 # We need to run it step by step or invoke it
                 # For simplicity, we invoke it fully but the graph structure needs to support pausing
@@ -158,6 +281,19 @@ def render_hitl_phase():
                 res_qs = generate_follow_up_questions(st.session_state.hitl_state, None)
                 st.session_state.hitl_state.update(res_qs)
                 
+                # 3. Bounded conversation memory for the following turns
+                config = get_config_instance()
+                memory = ConversationMemory(
+                    query=query,
+                    model=st.session_state.hitl_state["summarization_llm"],
+                    language=st.session_state.hitl_state["detected_language"],
+                    max_tokens=config.conversation_memory_max_tokens,
+                    keep_turns=config.conversation_memory_keep_turns
+                )
+                memory.add_turn("assistant", f"AI Follow-up Questions:\n{res_qs['follow_up_questions']}")
+                st.session_state.conversation_memory = memory
+                st.session_state.hitl_state["additional_context"] = memory.render()
+                
                 # Add AI response
                 ai_msg = f"I've analyzed your query. To better help you, I have a few follow-up questions:\n\n{st.session_state.hitl_state['follow_up_questions']}"
                 st.session_state.messages.append({"role": "assistant", "content": ai_msg})
@@ -181,17 +317,26 @@ def render_hitl_phase():
             else:
                 # Process feedback
                 st.session_state.hitl_state["human_feedback"] = feedback
+                memory = st.session_state.conversation_memory
+                memory.add_turn("user", feedback)
                 
                 with st.spinner("Analyzing feedback..."):
-                    from src.graph import analyse_user_feedback, generate_follow_up_questions
+                    from src.graph import analyse_feedback_and_follow_up
+                    
+                    # Use the bounded context (summary + latest turns) instead of the full history
+                    st.session_state.hitl_state["additional_context"] = memory.render()
                     
-                    # 1. Analyze
-                    res_an = analyse_user_feedback(st.session_state.hitl_state, None)
-                    st.session_state.hitl_state.update(res_an)
+                    # Analyze + generate new follow-up in one turn
+                    # (falls back to two separate LLM calls if the fused call fails)
+                    res_turn = analyse_feedback_and_follow_up(st.session_state.hitl_state, None)
+                    st.session_state.hitl_state.update(res_turn)
                     
-                    # 2. Generate New Follow-up
-                    res_qs = generate_follow_up_questions(st.session_state.hitl_state, None)
-                    st.session_state.hitl_state.update(res_qs)
+                    memory.add_turn("assistant", f"Human Feedback Analysis:\n{res_turn['analysis']}")
+                    memory.add_turn("assistant", f"AI Follow-up Questions:\n{res_turn['follow_up_questions']}")
+                    st.session_state.hitl_state["additional_context"] = memory.render()
+                    
+                    # Fold older turns in the background while the user types the next answer
+                    memory.schedule_compaction()
                     
                     ai_msg = f"**Analysis:**\n{st.session_state.hitl_state['analysis']}\n\n**New Questions:**\n{st.session_state.hitl_state['follow_up_questions']}"
                     st.session_state.messages.append({"role": "assistant", "content": ai_msg})
@@ -215,28 +360,49 @@ def render_research_phase():
                 "max_search_queries": get_config_instance().max_search_queries
             })
             
+            memory = st.session_state.get("conversation_memory")
+            if memory is not None:
+                memory.wait()
+                st.session_state.hitl_state["additional_context"] = memory.render()
+            
             res_kb = generate_knowledge_base_questions(st.session_state.hitl_state, config)
             st.session_state.hitl_state.update(res_kb)
             
+            st.write("Removing duplicate research queries...")
+            from src.graph import deduplicate_research_queries
+            res_dedup = deduplicate_research_queries(st.session_state.hitl_state, config)
+            st.session_state.hitl_state.update(res_dedup)
+            
             # Display Research Queries
             st.markdown("### 📋 Generated Research Queries")
             for i, q in enumerate(st.session_state.hitl_state["research_queries"]):
                 st.markdown(f"{i+1}. {q}")
+            
+            dropped = st.session_state.hitl_state.get("dropped_queries") or []
+            if dropped:
+                with st.expander(f"🗑️ Dropped {len(dropped)} duplicate queries", expanded=False):
+                    for d in dropped:
+                        st.markdown(f"- {d['query']}  \n  ↳ duplicate of *{d['duplicate_of']}* (similarity {d['similarity']:.2f})")
                 
-            # Initialize Research State
+            # Initialize Research State (the session id keys the checkpoints of this run)
+            import uuid
+            st.session_state.research_session_id = uuid.uuid4().hex
             st.session_state.research_state = ResearcherState(
                 user_query=st.session_state.hitl_state["user_query"],
                 detected_language=st.session_state.hitl_state["detected_language"],
                 human_feedback=st.session_state.hitl_state["human_feedback"],
                 additional_context=st.session_state.hitl_state["additional_context"],
                 research_queries=st.session_state.hitl_state["research_queries"],
-                retrieved_documents={},
+                retrieved_documents=st.session_state.hitl_state.get("prefetched_documents") or {},
                 search_summaries={},
                 web_search_enabled=get_config_instance().enable_web_search,
                 internet_result=None,
                 final_answer="",
                 linked_final_answer=None,
+                source_grounding=[],
+                report_sections={},
                 quality_check=None,
+                quality_precheck=None,
                 reflection_count=0,
                 enable_quality_checker=get_config_instance().enable_quality_checker,
                 report_llm=get_config_instance().llm_model,
@@ -246,23 +412,95 @@ def render_research_phase():
             
             status.update(label="Research Phase Initialized", state="complete", expanded=False)
             
+    # Clicking this while a run streams stops the script, which cancels the run (see run_research)
+    if st.button("🔄 New Research", key="new_research_during_run"):
+        start_new_research()
+    
     # Execute Main Graph
-    if st.button("🚀 Start Deep Research", type="primary"):
-        research_placeholder = st.empty()
-        main_graph = create_main_graph()
+    main_graph = get_main_graph()
+    session_config = get_session_config(st.session_state.research_session_id or "default")
+    
+    # A checkpointed run that stopped before END (error, crash, closed tab) can be resumed
+    resumable = False
+    if main_graph.checkpointer is not None and st.session_state.research_session_id:
+        resumable = bool(main_graph.get_state(session_config).next)
+    
+    resume = st.session_state.resume_requested
+    if resumable:
+        st.info("This research run was interrupted. Completed steps are restored from the checkpoint.")
+        resume = st.button("♻️ Resume Research", type="primary") or resume
+    
+    if resume or st.button("🚀 Start Deep Research", type="primary" if not resumable else "secondary"):
+        st.session_state.resume_requested = False
+        run_research(main_graph, session_config, resume=resume and resumable)
+
+def run_research(main_graph, session_config, resume=False):
+    """Stream the main graph (from the input state, or from the last checkpoint when resuming)."""
+    with st.status("Resuming Research Workflow..." if resume else "Executing Research Workflow...", expanded=True) as status:
         
-        with st.status("Executing Research Workflow...", expanded=True) as status:
-            
-            # Stream events
+        if resume:
+            graph_input = None
+        else:
             st.session_state.research_state["final_answer"] = "" # Reset
-            
-            final_state = None
-            for event in main_graph.stream(st.session_state.research_state):
+            graph_input = st.session_state.research_state
+        
+        # The graph runs in a worker thread: Streamlit can only stop this script (button click,
+        # closed tab) at an st call, so the loop below polls and touches the status regularly.
+        token = CancellationToken()
+        st.session_state.research_cancel_token = token
+        run_config = {**session_config, "configurable": {**session_config["configurable"], "cancellation_token": token}}
+        events = queue.Queue()
+        run_id = st.session_state.research_session_id or "research"
+        st.session_state.llm_metrics_run_id = run_id
+        if not resume:
+            get_metrics_registry().clear(run_id)
+            get_performance_store().clear(run_id)
+        
+        def run_graph():
+            try:
+                # One trace file per run when tracing is enabled (see src/tracing.py);
+                # Ollama timing metrics of every LLM call are collected per run (src/llm_metrics.py)
+                with metrics_run(run_id), trace_run(run_id), span("main_graph", "graph", resume=resume):
+                    # subgraphs=True also yields the steps inside the RAG branch (namespace != ())
+                    for item in main_graph.stream(graph_input, config=run_config, subgraphs=True):
+                        events.put(("event", item))
+                events.put(("done", None))
+            except BaseException as e:
+                events.put(("error", e))
+        
+        threading.Thread(target=run_graph, name="research-run", daemon=True).start()
+        started = time.time()
+        finished = False
+        
+        try:
+            while True:
+                try:
+                    kind, payload = events.get(timeout=0.5)
+                except queue.Empty:
+                    status.update(label=f"Executing Research Workflow... ({time.time() - started:.0f}s)")
+                    continue
+                if kind == "done":
+                    finished = True
+                    break
+                if kind == "error":
+                    raise payload
+                namespace, event = payload
                 for key, value in event.items():
+                    if key == "rag_research":
+                        # Branch output repeats the updates already shown per step
+                        st.session_state.research_state.update(value or {})
+                        continue
                     st.write(f"Completed step: **{key}**")
                     if key == "retrieve_rag_documents":
                         with st.expander("📄 Retrieved Documents", expanded=False):
-                            st.json(value.get("retrieved_documents", {}))
+                            # State holds document store references; only the source names are fetched for display
+                            from src.document_store import load_documents
+                            for q, refs in (value.get("retrieved_documents") or {}).items():
+                                st.markdown(f"**{q}**")
+                                for ref, doc in zip(refs, load_documents(refs)):
+                                    score = ref.get("score") if isinstance(ref, dict) else None
+                                    score_text = f" ({score:.2f})" if score is not None else ""
+                                    st.markdown(f"- {os.path.basename(doc.metadata.get('source', 'Unknown source'))}{score_text}")
                     elif key == "summarize_query_research":
                         with st.expander("📝 Summaries", expanded=False):
                             # value is state update, search_summaries might be in it or in final state
@@ -279,21 +517,153 @@ def render_research_phase():
                             if not qc.get('is_accurate', False):
                                 st.write(f"Issues: {qc.get('issues_found', '')}")
                                 st.info("Reflecting and regenerating...")
+                    elif key == "quality_prechecker":
+                        precheck = (value or {}).get("quality_precheck") or {}
+                        if precheck.get("verdict") not in (None, "skipped"):
+                            with st.expander(f"🔎 Quality Pre-Check: {precheck['verdict']}", expanded=False):
+                                for issue in precheck.get("issues", []):
+                                    st.write(f"- {issue}")
+                    elif key == "repair_report_sections":
+                        sections = (value or {}).get("report_sections") or {}
+                        st.info(f"Repaired report sections ({len(sections)} sections in report)")
                     elif key == "generate_final_answer":
                         # Interim answer
                         pass
                     
-                    # Update session state with progress
-                    if st.session_state.research_state and value:
+                    # Update session state with progress (steps of the RAG branch arrive via rag_research)
+                    if st.session_state.research_state and value and not namespace:
                         st.session_state.research_state.update(value)
-                    final_state = st.session_state.research_state
-            
-            status.update(label="Research Complete", state="complete", expanded=False)
-            st.session_state.current_phase = "complete"
-            st.rerun()
+        except ResearchCancelled as e:
+            # Keep what the interrupted node had finished
+            st.session_state.research_state.update(e.partial)
+            status.update(label="Research Cancelled", state="error", expanded=True)
+            st.warning(f"{e}. Partial results were kept.")
+            return
+        except Exception as e:
+            status.update(label="Research Interrupted", state="error", expanded=True)
+            if main_graph.checkpointer is not None:
+                st.error(f"Research failed: {e}. Completed steps are saved, use 'Resume Research' to continue.")
+            else:
+                st.error(f"Research failed: {e}")
+            return
+        finally:
+            # Also reached when Streamlit stops the script (New Research, rerun, disconnected
+            # session): abort in-flight LLM requests instead of letting the run finish unseen.
+            if not finished:
+                token.cancel("Research run abandoned")
+            # The run changed which sessions are resumable
+            st.session_state.pop("resumable_sessions", None)
+        
+        if main_graph.checkpointer is not None:
+            st.session_state.research_state = dict(main_graph.get_state(session_config).values)
+        
+        status.update(label="Research Complete", state="complete", expanded=False)
+        st.session_state.current_phase = "complete"
+        st.rerun()
+
+# --- Performance Dashboard ---
+
+def render_performance_dashboard():
+    """Performance of the current and recent runs, from the in-process store (src/perf_metrics.py)."""
+    import altair as alt
+    import pandas as pd
+    
+    st.divider()
+    st.markdown("## 📊 Performance")
+    store = get_performance_store()
+    runs = list(reversed(store.runs()))
+    if not runs:
+        st.caption("No performance data yet. It is recorded while the graphs run.")
+        return
+    current = st.session_state.get("llm_metrics_run_id")
+    run_id = st.selectbox("Run", runs, index=runs.index(current) if current in runs else 0)
+    report = store.run_report(run_id)
+    
+    nodes = pd.DataFrame(report["nodes"])
+    if not nodes.empty:
+        st.markdown("**Node Timeline**")
+        nodes["end_ms"] = nodes["offset_ms"] + nodes["wall_ms"]
+        st.altair_chart(alt.Chart(nodes).mark_bar().encode(
+            x=alt.X("offset_ms:Q", title="ms since run start"),
+            x2="end_ms:Q",
+            y=alt.Y("node:N", sort=None, title=None),
+            color=alt.Color("thread:N", legend=None),
+            tooltip=["node", "wall_ms", "rss_mb", "thread", "error"],
+        ))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**LLM Throughput by Model**")
+        if report["llm_models"]:
+            st.dataframe(pd.DataFrame([
+                {"model": model, "calls": s["calls"], "prefill tok/s": s["prefill_tps"], "decode tok/s": s["decode_tps"],
+                 "reloads": s["reloads"], "bound": s["bound"]}
+                for model, s in report["llm_models"].items()
+            ]), hide_index=True)
+        else:
+            st.caption("No LLM calls recorded.")
+    with col2:
+        st.markdown("**Cache Hit Rates**")
+        if report["caches"]:
+            for name, counters in report["caches"].items():
+                rate = counters["hit_rate"]
+                st.metric(name.replace("_", " "), f"{rate:.0%}" if rate is not None else "n/a",
+                          help=f"{counters['hits']} hits, {counters['misses']} misses")
+        else:
+            st.caption("No cache lookups recorded.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        latency = report["retrieval_latency"]
+        st.markdown(f"**Retrieval Latency** ({latency['count']} searches)")
+        if latency["count"]:
+            st.caption(f"p50 {latency['p50']:.0f} ms · p90 {latency['p90']:.0f} ms · max {latency['max']:.0f} ms")
+            st.dataframe(pd.DataFrame(report["retrievals"])[["query", "wall_ms", "search_ms", "results"]], hide_index=True)
+    with col2:
+        memory = report["memory"]
+        st.markdown("**Memory**")
+        st.metric("Resident memory", f"{memory['current_rss_mb']:.0f} MB",
+                  help=f"Highest after a node of this run: {memory['peak_node_rss_mb'] or 0:.0f} MB")
+        if not nodes.empty:
+            st.line_chart(nodes.set_index("end_ms")["rss_mb"])
+    
+    recent = []
+    for rid in runs:
+        r = store.run_report(rid)
+        llm = get_metrics_registry().run_summary(rid)["totals"]
+        recent.append({
+            "run": rid,
+            "nodes": len(r["nodes"]),
+            "node time (s)": round(sum(n["wall_ms"] for n in r["nodes"]) / 1000, 2),
+            "llm calls": llm["calls"],
+            "retrieval p90 (ms)": r["retrieval_latency"]["p90"],
+            "peak rss (MB)": r["memory"]["peak_node_rss_mb"],
+        })
+    st.markdown("**Recent Runs**")
+    st.dataframe(pd.DataFrame(recent), hide_index=True)
+    if report["dropped_events"]:
+        st.caption(f"{report['dropped_events']} older events of this run were dropped")
 
 # --- Completion Phase ---
 
+def render_llm_metrics(run_id):
+    """Ollama server-side timing of the run's LLM calls, per node."""
+    if not run_id:
+        return
+    summary = get_metrics_registry().run_summary(run_id)
+    totals = summary["totals"]
+    if not totals["calls"]:
+        return
+    label = (f"⏱️ LLM Timing ({totals['calls']} calls, {totals['total_ms'] / 1000:.1f}s, "
+             f"{totals['bound'] or 'n/a'}-bound)")
+    with st.expander(label):
+        if totals["reloads"]:
+            st.warning(f"Ollama (re)loaded a model {totals['reloads']} time(s), {totals['load_ms'] / 1000:.1f}s in total")
+        st.dataframe([
+            {"node": node, **{k: v for k, v in stats.items() if k != "prefill_share"}}
+            for node, stats in summary["nodes"].items()
+        ])
+
 def render_completion_phase():
     st.markdown("## 🎯 Final Report")
     
@@ -310,6 +680,17 @@ def render_completion_phase():
                 
         st.markdown(parsed["response"], unsafe_allow_html=True)
         
+        grounding = st.session_state.research_state.get("source_grounding") or []
+        if grounding:
+            linked = [g for g in grounding if g["linked"]]
+            mean_score = sum(g["score"] for g in grounding) / len(grounding)
+            with st.expander(f"🔗 Source Grounding ({len(linked)}/{len(grounding)} sentences linked, mean score {mean_score:.2f})"):
+                for g in grounding:
+                    icon = "✅" if g["linked"] else "⚠️"
+                    st.markdown(f"{icon} `{g['score']:.2f}` {g['sentence']} — *{g['source']}*")
+        
+        render_llm_metrics(st.session_state.get("llm_metrics_run_id"))
+        
         st.divider()
         col1, col2 = st.columns(2)
         with col1:
@@ -321,8 +702,7 @@ def render_completion_phase():
             )
         with col2:
             if st.button("🔄 New Research"):
-                st.session_state.clear()
-                st.rerun()
+                start_new_research()
     else:
         st.error("No final answer generated.")
 
@@ -346,6 +726,9 @@ def main():
         render_research_phase()
     elif st.session_state.current_phase == "complete":
         render_completion_phase()
+    
+    if st.session_state.get("show_performance"):
+        render_performance_dashboard()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,663 @@
+"""
+End-to-end benchmark of the HITL nodes and the main research graph.
+
+Runs a fixed set of research scenarios against a synthetic Chroma knowledge base and
+the local Ollama stand-in (dev/mock_ollama_server.py), and reports per-node latency
+percentiles, LLM calls, prompt/output tokens and peak RSS as JSON. Web search
+scenarios use dev/mock_tavily_server.py.
+
+Usage:
+    python dev/benchmark.py run --kb-size 2000 --repeat 5 --output bench/base.json
+    python dev/benchmark.py run --time-scale 0 --scenarios single_pass_en   # orchestration overhead only
+    python dev/benchmark.py compare bench/base.json bench/new.json --threshold 0.1
+
+The synthetic KB is cached under .cache/benchmark_kb. `--embeddings hashing` (default)
+uses a bag-of-words hashing embedding so no model download is needed; `--embeddings model`
+uses the configured HuggingFace embedding model. `--ollama-host` benchmarks a real Ollama
+instead of the stand-in (LLM counters are then not available).
+
+`--cassette` records all LLM, embedding and web search traffic of the runs (e.g. against a
+real Ollama) to a cassette file, or replays it offline (`--cassette-mode replay`, optionally
+with the recorded latencies via `--replay-latency 1`), see src/cassette.py:
+    python dev/benchmark.py run --ollama-host http://gpu-box:11434 --cassette bench/real.cassette.gz --cassette-mode record
+    python dev/benchmark.py run --cassette bench/real.cassette.gz --replay-latency 1 --output bench/replay.json
+
+`imports` measures the startup cost: the import time of the app and the main modules, each
+in a fresh interpreter, the heavy dependencies (torch, Chroma, ...) they pull in and the
+packages the time goes to. `compare` flags slower imports and newly imported heavy modules:
+    python dev/benchmark.py imports --repeat 5 --output bench/imports.json
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from langchain_core.embeddings import Embeddings
+
+KB_CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache", "benchmark_kb")
+
+# Vocabulary of the synthetic knowledge base; scenario queries use the same terms
+TOPICS = {
+    "radon": "radon gas concentration becquerel indoor air basement limit exposure lung cancer measurement detector ventilation soil granite",
+    "groundwater": "groundwater aquifer nitrate contamination well sampling drinking water threshold monitoring recharge infiltration pesticide",
+    "noise": "noise decibel traffic exposure limit night residential barrier measurement sleep disturbance road railway aircraft",
+    "asbestos": "asbestos fibre removal building insulation exposure limit mesothelioma demolition protective equipment disposal inspection",
+    "particulate": "particulate matter pm10 pm2.5 fine dust air quality limit exceedance combustion traffic heating monitoring station",
+    "uv": "ultraviolet radiation uv index sunburn skin cancer exposure protection sunscreen ozone dosimetry outdoor workers",
+}
+FILLER = "the of and in for with regulation report study results guidance authority annual data value average"
+
+# Fixed research scenarios. `queries` are the knowledge base questions the stand-in returns.
+SCENARIOS = [
+    {
+        "name": "single_pass_en",
+        "user_query": "What are the radon limits for indoor air and how is radon measured?",
+        "human_feedback": "Focus on residential buildings and basement measurement.",
+        "queries": ["radon limit indoor air becquerel", "radon measurement detector basement",
+                    "radon exposure lung cancer", "radon ventilation soil granite"],
+    },
+    {
+        "name": "sectioned_de",
+        "user_query": "Welche Grenzwerte gelten für Nitrat im Grundwasser und wie wird überwacht?",
+        "human_feedback": "Bitte auch Pestizide und Brunnen berücksichtigen.",
+        "queries": ["groundwater nitrate threshold drinking water", "groundwater monitoring well sampling",
+                    "pesticide contamination aquifer", "groundwater recharge infiltration"],
+        "config": {"report_mode": "sectioned", "reflection_mode": "incremental"},
+    },
+    {
+        "name": "web_search_en",
+        "user_query": "How do particulate matter limits compare to traffic noise limits?",
+        "human_feedback": "Urban residential areas only.",
+        "queries": ["particulate matter pm2.5 limit exceedance", "traffic noise decibel night limit",
+                    "air quality monitoring station traffic"],
+        "config": {"enable_web_search": True},
+    },
+]
+
+HITL_NODES = ["detect_language", "generate_follow_up_questions", "analyse_feedback_and_follow_up",
+              "generate_knowledge_base_questions", "deduplicate_research_queries"]
+MAIN_NODES = ["retrieve_rag_documents", "summarize_query_research", "rerank_summaries", "web_search_node",
+              "generate_final_answer", "quality_prechecker", "quality_checker", "repair_report_sections",
+              "source_linker"]
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag-of-words feature hashing embedding: deterministic, model-free, similar texts stay similar."""
+
+    def __init__(self, size=384):
+        self.size = size
+
+    def _embed(self, text):
+        vector = np.zeros(self.size)
+        for word in re.findall(r"\w+", text.lower()):
+            digest = int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16)
+            vector[digest % self.size] += 1.0 if (digest >> 64) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def synthetic_chunks(size, seed=0):
+    """Deterministic synthetic chunks and metadata spread over TOPICS."""
+    rng = random.Random(seed)
+    topics = list(TOPICS.items())
+    filler = FILLER.split()
+    texts, metadatas = [], []
+    for i in range(size):
+        topic, vocabulary = topics[i % len(topics)]
+        words = vocabulary.split()
+        sentences = []
+        for _ in range(rng.randint(4, 8)):
+            sentence = [rng.choice(words if rng.random() < 0.6 else filler) for _ in range(rng.randint(8, 16))]
+            sentences.append(" ".join(sentence).capitalize() + f" {rng.randint(1, 500)} Bq/m3.")
+        texts.append(" ".join(sentences))
+        metadatas.append({"source": f"synthetic/{topic}_{i // 25:04d}.pdf", "page": i % 25 + 1, "topic": topic})
+    return texts, metadatas
+
+
+def build_synthetic_kb(size, embeddings_kind="hashing", seed=0):
+    """
+    Create (or reuse) a Chroma collection laid out like kb/database/<db>/default, so
+    `search_documents` can use it via `selected_database` (an absolute path).
+    """
+    from langchain_chroma import Chroma
+    from src.vector_db import DEFAULT_TENANT_ID, get_tenant_collection_name
+
+    embeddings_name = embeddings_kind if embeddings_kind == "hashing" else get_embedding_name()
+    db_dir = os.path.join(KB_CACHE_DIR, f"{embeddings_name.replace('/', '--')}--{size}--{seed}")
+    marker = os.path.join(db_dir, "benchmark_kb.json")
+    if os.path.exists(marker):
+        return db_dir
+
+    texts, metadatas = synthetic_chunks(size, seed)
+    tenant_dir = os.path.join(db_dir, DEFAULT_TENANT_ID)
+    os.makedirs(tenant_dir, exist_ok=True)
+    vectorstore = Chroma(
+        persist_directory=tenant_dir,
+        collection_name=get_tenant_collection_name(DEFAULT_TENANT_ID),
+        embedding_function=get_embeddings(embeddings_kind),
+        collection_metadata={"hnsw:space": "cosine", "normalize_embeddings": True},
+    )
+    start = time.perf_counter()
+    for i in range(0, size, 1000):
+        vectorstore.add_texts(texts[i:i + 1000], metadatas=metadatas[i:i + 1000], ids=[f"chunk-{j}" for j in range(i, min(i + 1000, size))])
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump({"size": size, "embeddings": embeddings_name, "seed": seed,
+                   "build_seconds": round(time.perf_counter() - start, 3)}, f)
+    return db_dir
+
+
+def get_embedding_name():
+    from src.configuration import get_config_instance
+    return get_config_instance().embedding_model
+
+
+_hashing_embeddings = HashingEmbeddings()
+
+
+def get_embeddings(kind):
+    if kind == "hashing":
+        return _hashing_embeddings
+    from src.vector_db import get_embedding_model
+    return get_embedding_model()
+
+
+class NodeTimer:
+    """Records the wall time of every node call (nodes run in LangGraph worker threads)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+
+    def wrap(self, name, fn):
+        @wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.samples.append((name, time.perf_counter() - start))
+        return timed
+
+    def take(self):
+        with self.lock:
+            samples, self.samples = self.samples, []
+        return samples
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile (q in 0..100) of a non-empty list."""
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarize_latencies(values):
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 6),
+        "p50": round(percentile(values, 50), 6),
+        "p90": round(percentile(values, 90), 6),
+        "p99": round(percentile(values, 99), 6),
+        "max": round(max(values), 6),
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def llm_counters(stats_url):
+    if not stats_url:
+        return None
+    import urllib.request
+    with urllib.request.urlopen(stats_url, timeout=10) as response:
+        stats = json.loads(response.read())
+    return {"llm_calls": stats["requests"], "prompt_tokens": stats["prompt_tokens"], "eval_tokens": stats["eval_tokens"]}
+
+
+def counter_delta(after, before):
+    if after is None or before is None:
+        return None
+    return {key: after[key] - before[key] for key in after}
+
+
+def knowledge_base_rules():
+    """Stand-in responses: each scenario's knowledge base questions as a numbered list."""
+    return [{
+        "match": r"knowledge base search query specialist.*" + re.escape(scenario["user_query"]),
+        "response": "\n".join(f"{i + 1}. {q}" for i, q in enumerate(scenario["queries"])),
+    } for scenario in SCENARIOS]
+
+
+def run_scenario(graph, scenario, checkpointer=None, run_id=0):
+    """One pass through the HITL nodes (as the app calls them) and the main graph."""
+    from src.configuration import get_config_instance
+    from src.state import ResearcherState
+
+    conf = get_config_instance()
+    hitl_state = {
+        "user_query": scenario["user_query"],
+        "current_position": 0,
+        "detected_language": "",
+        "additional_context": "",
+        "human_feedback": "",
+        "analysis": "",
+        "follow_up_questions": "",
+        "report_llm": conf.llm_model,
+        "summarization_llm": conf.llm_model,
+        "research_queries": [],
+        "max_search_queries": conf.max_search_queries,
+    }
+    config = {"configurable": {"report_llm": conf.llm_model, "summarization_llm": conf.llm_model,
+                               "max_search_queries": conf.max_search_queries}}
+
+    phases = {}
+    start = time.perf_counter()
+    hitl_state.update(graph.detect_language(hitl_state, None))
+    hitl_state.update(graph.generate_follow_up_questions(hitl_state, None))
+    hitl_state["human_feedback"] = scenario["human_feedback"]
+    hitl_state.update(graph.analyse_feedback_and_follow_up(hitl_state, None))
+    hitl_state.update(graph.generate_knowledge_base_questions(hitl_state, config))
+    hitl_state.update(graph.deduplicate_research_queries(hitl_state, config))
+    phases["hitl"] = time.perf_counter() - start
+
+    research_state = ResearcherState(
+        user_query=hitl_state["user_query"],
+        detected_language=hitl_state["detected_language"],
+        human_feedback=hitl_state["human_feedback"],
+        additional_context=hitl_state["additional_context"],
+        research_queries=hitl_state["research_queries"],
+        retrieved_documents=hitl_state.get("prefetched_documents") or {},
+        search_summaries={},
+        web_search_enabled=conf.enable_web_search,
+        internet_result=None,
+        final_answer="",
+        linked_final_answer=None,
+        source_grounding=[],
+        report_sections={},
+        quality_check=None,
+        quality_precheck=None,
+        reflection_count=0,
+        enable_quality_checker=conf.enable_quality_checker,
+        report_llm=conf.llm_model,
+        summarization_llm=conf.llm_model,
+    )
+    main_graph = graph.create_main_graph(checkpointer=checkpointer)
+    run_config = {"configurable": {"thread_id": f"benchmark-{scenario['name']}-{run_id}"}} if checkpointer else None
+    start = time.perf_counter()
+    result = main_graph.invoke(research_state, run_config)
+    phases["main"] = time.perf_counter() - start
+    if not result.get("final_answer"):
+        raise RuntimeError(f"Scenario {scenario['name']} produced no report")
+    return phases, len(hitl_state["research_queries"])
+
+
+def run_benchmark(args):
+    logging.basicConfig(level=logging.WARNING)
+    if args.embeddings == "hashing":
+        # Source linking and pre-checks use the stand-in embeddings; never wait for model downloads
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    # LLM and web search stand-ins; must be configured before the clients are created
+    stats_url = None
+    if args.ollama_host:
+        os.environ["OLLAMA_HOST"] = args.ollama_host
+    else:
+        from mock_ollama_server import start_mock_ollama_server, ModelProfile
+        profile = ModelProfile(prefill_tps=args.prefill_tps, decode_tps=args.decode_tps, slots=args.slots,
+                               load_latency=args.load_latency, output_tokens=args.output_tokens)
+        ollama_server, ollama_url = start_mock_ollama_server(default_profile=profile, responses=knowledge_base_rules(),
+                                                             time_scale=args.time_scale)
+        os.environ["OLLAMA_HOST"] = ollama_url
+        stats_url = f"{ollama_url}/stats"
+    from mock_tavily_server import start_mock_tavily_server
+    tavily_server, tavily_url = start_mock_tavily_server(delay=args.web_delay * args.time_scale)
+    os.environ["TAVILY_API_BASE_URL"] = tavily_url
+    os.environ.setdefault("TAVILY_API_KEY", "mock-key")
+
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.cassette import use_cassette
+
+    if args.embeddings == "hashing":
+        vector_db.get_embedding_model = lambda: _hashing_embeddings
+    conf = get_config_instance()
+    conf.selected_database = build_synthetic_kb(args.kb_size, args.embeddings, args.seed)
+    conf.web_search_cache_ttl = 0
+    if args.llm:
+        conf.llm_model = args.llm
+
+    timer = NodeTimer()
+    for name in HITL_NODES + MAIN_NODES:
+        setattr(graph, name, timer.wrap(name, getattr(graph, name)))
+
+    checkpointer = None
+    if args.checkpoint:
+        from src.checkpointing import get_checkpointer
+        checkpointer = get_checkpointer(os.path.join(tempfile.mkdtemp(prefix="benchmark_"), "checkpoints.sqlite"))
+
+    selected = [s for s in SCENARIOS if not args.scenarios or s["name"] in args.scenarios.split(",")]
+    if not selected:
+        raise SystemExit(f"No scenarios selected, available: {', '.join(s['name'] for s in SCENARIOS)}")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "kb_size": args.kb_size,
+            "embeddings": args.embeddings,
+            "llm": "cassette" if args.cassette and args.cassette_mode == "replay" else "ollama" if args.ollama_host else "mock",
+            "cassette": args.cassette,
+            "time_scale": None if args.ollama_host else args.time_scale,
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+            "checkpoint": args.checkpoint,
+        },
+        "scenarios": {},
+    }
+    all_nodes = {}
+    cassette = use_cassette(args.cassette, args.cassette_mode, args.replay_latency) if args.cassette else contextlib.nullcontext()
+    with cassette as active:
+        run_scenarios(args, graph, conf, selected, timer, checkpointer, stats_url, results, all_nodes)
+    if active is not None:
+        results["meta"]["cassette_stats"] = active.summary()
+    results["nodes"] = {name: summarize_latencies(values) for name, values in sorted(all_nodes.items())}
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    tavily_server.shutdown()
+    if not args.ollama_host:
+        ollama_server.shutdown()
+    return results
+
+
+def run_scenarios(args, graph, conf, selected, timer, checkpointer, stats_url, results, all_nodes):
+    """Run the selected scenarios (warmup + measured runs) and add their results to `results`."""
+    for scenario in selected:
+        print(f"Scenario {scenario['name']}: ", end="", flush=True)
+        defaults = {key: getattr(conf, key) for key in scenario.get("config", {})}
+        for key, value in scenario.get("config", {}).items():
+            setattr(conf, key, value)
+        phases, nodes, counters = {"hitl": [], "main": [], "total": []}, {}, []
+        try:
+            for run in range(args.warmup + args.repeat):
+                timer.take()
+                before = llm_counters(stats_url)
+                with contextlib.ExitStack() as stack:
+                    if not args.verbose:
+                        stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+                    run_phases, query_count = run_scenario(graph, scenario, checkpointer, run)
+                samples = timer.take()
+                print("." if run >= args.warmup else "w", end="", flush=True)
+                if run < args.warmup:
+                    continue
+                counters.append(counter_delta(llm_counters(stats_url), before))
+                for phase, seconds in run_phases.items():
+                    phases[phase].append(seconds)
+                phases["total"].append(sum(run_phases.values()))
+                for name, seconds in samples:
+                    nodes.setdefault(name, []).append(seconds)
+                    all_nodes.setdefault(name, []).append(seconds)
+        finally:
+            for key, value in defaults.items():
+                setattr(conf, key, value)
+        print()
+        results["scenarios"][scenario["name"]] = {
+            "research_queries": query_count,
+            "phases": {phase: summarize_latencies(values) for phase, values in phases.items()},
+            "nodes": {name: summarize_latencies(values) for name, values in sorted(nodes.items())},
+            # LLM counters are identical across runs with the stand-in; report the mean per run
+            "llm": {key: round(sum(c[key] for c in counters) / len(counters), 1) for key in counters[0]} if counters[0] else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+# Entry points timed by `imports`: each is imported in a fresh interpreter
+IMPORT_TARGETS = {
+    "src.utils": "import src.utils",
+    "src.vector_db": "import src.vector_db",
+    "src.graph": "import src.graph",
+    "app": ("import importlib.util\n"
+            "spec = importlib.util.spec_from_file_location('research_app', os.path.join(root, 'apps', 'app_v0_1g.py'))\n"
+            "spec.loader.exec_module(importlib.util.module_from_spec(spec))"),
+}
+# Dependencies that should only be imported once a research run needs them (see src/lazy_imports.py)
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "langchain_huggingface", "chromadb",
+                 "langchain_chroma", "langchain_community", "ollama", "tavily"]
+
+IMPORT_PROBE = """
+import json, os, sys, time
+root = sys.argv[1]
+sys.path.insert(0, root)
+start = time.perf_counter()
+{code}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}}))
+"""
+
+
+def measure_import(code):
+    """
+    Import time of `code` in a fresh interpreter (-X importtime).
+    Returns (seconds, heavy modules imported, self time in seconds per top-level package).
+    """
+    env = dict(os.environ, HF_HUB_OFFLINE="1", RESEARCH_LOG_LEVEL="warning")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_PROBE.format(code=code),
+                           PROJECT_ROOT, json.dumps(HEAVY_MODULES)],
+                          cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import failed: {proc.stderr.strip().splitlines()[-1:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    packages = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        match = re.match(r"import time:\s+(\d+) \|\s+\d+ \| +([\w.]+)", line)
+        if match:
+            package = match.group(2).split(".")[0]
+            packages[package] = packages.get(package, 0) + int(match.group(1)) / 1e6
+    return result["seconds"], result["heavy"], packages
+
+
+def run_import_benchmark(args):
+    targets = [t for t in IMPORT_TARGETS if not args.targets or t in args.targets.split(",")]
+    if not targets:
+        raise SystemExit(f"No import targets selected, available: {', '.join(IMPORT_TARGETS)}")
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "imports": {},
+    }
+    for target in targets:
+        measure_import(IMPORT_TARGETS[target])  # warm the file system cache and .pyc files
+        samples, heavy, packages = [], [], {}
+        for _ in range(args.repeat):
+            seconds, heavy, packages = measure_import(IMPORT_TARGETS[target])
+            samples.append(seconds)
+        top = sorted(packages.items(), key=lambda item: -item[1])[:10]
+        results["imports"][target] = {
+            "seconds": summarize_latencies(samples),
+            "heavy_modules": heavy,
+            "top_packages": {name: round(value, 4) for name, value in top},
+        }
+    return results
+
+
+def print_import_summary(results):
+    for target, stats in results["imports"].items():
+        heavy = ", ".join(stats["heavy_modules"]) or "none"
+        print(f"\n{target}: p50 {stats['seconds']['p50']:.3f}s, max {stats['seconds']['max']:.3f}s, heavy modules: {heavy}")
+        for package, seconds in stats["top_packages"].items():
+            print(f"  {package:<36} {seconds:.3f}s")
+
+
+def compare_results(base, new, threshold=0.1, min_seconds=0.005):
+    """
+    Compare two result files. Latencies (p50/p90), prompt tokens and peak RSS regress
+    when they grow by more than `threshold` (latencies also by more than `min_seconds`);
+    any additional LLM call is a regression.
+    Returns (regressions, improvements) as lists of message strings.
+    """
+    regressions, improvements = [], []
+
+    def check(label, old, value, relative=True, absolute=0.0):
+        if old is None or value is None:
+            return
+        change = (value - old) / old if old else (float("inf") if value > old else 0.0)
+        delta = value - old
+        line = f"{label}: {old:g} -> {value:g} ({change:+.1%})" if old else f"{label}: {old:g} -> {value:g}"
+        if (change > threshold if relative else delta > 0) and delta > absolute:
+            regressions.append(line)
+        elif (change < -threshold if relative else delta < 0) and -delta > absolute:
+            improvements.append(line)
+
+    for name, scenario in new.get("scenarios", {}).items():
+        old = base.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        for phase, stats in scenario["phases"].items():
+            for q in ("p50", "p90"):
+                check(f"{name} {phase} {q} [s]", old["phases"].get(phase, {}).get(q), stats[q], absolute=min_seconds)
+        for node, stats in scenario["nodes"].items():
+            for q in ("p50", "p90"):
+                check(f"{name} {node} {q} [s]", old["nodes"].get(node, {}).get(q), stats[q], absolute=min_seconds)
+        if scenario.get("llm") and old.get("llm"):
+            check(f"{name} llm_calls", old["llm"]["llm_calls"], scenario["llm"]["llm_calls"], relative=False)
+            check(f"{name} prompt_tokens", old["llm"]["prompt_tokens"], scenario["llm"]["prompt_tokens"])
+    for target, stats in new.get("imports", {}).items():
+        old = base.get("imports", {}).get(target)
+        if old is None:
+            continue
+        check(f"import {target} p50 [s]", old["seconds"]["p50"], stats["seconds"]["p50"], absolute=min_seconds)
+        for module in sorted(set(stats["heavy_modules"]) - set(old["heavy_modules"])):
+            regressions.append(f"import {target} now imports {module}")
+        for module in sorted(set(old["heavy_modules"]) - set(stats["heavy_modules"])):
+            improvements.append(f"import {target} no longer imports {module}")
+    check("peak_rss_mb", base.get("peak_rss_mb"), new.get("peak_rss_mb"))
+    return regressions, improvements
+
+
+def print_summary(results):
+    for name, scenario in results["scenarios"].items():
+        llm = scenario["llm"] or {}
+        print(f"\n{name}: total p50 {scenario['phases']['total']['p50']:.3f}s, p90 {scenario['phases']['total']['p90']:.3f}s, "
+              f"{llm.get('llm_calls', '-')} LLM calls, {llm.get('prompt_tokens', '-')} prompt tokens")
+        for node, stats in scenario["nodes"].items():
+            print(f"  {node:<36} n={stats['count']:<3} p50 {stats['p50']:.3f}s  p90 {stats['p90']:.3f}s  max {stats['max']:.3f}s")
+    print(f"\nPeak RSS: {results['peak_rss_mb']} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HITL and main research graphs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark scenarios")
+    run.add_argument("--output", help="Write results as JSON to this file")
+    run.add_argument("--scenarios", help="Comma separated scenario names (default: all)")
+    run.add_argument("--repeat", type=int, default=3, help="Measured runs per scenario")
+    run.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per scenario")
+    run.add_argument("--kb-size", type=int, default=2000, help="Chunks in the synthetic knowledge base")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--embeddings", choices=["hashing", "model"], default="hashing")
+    run.add_argument("--checkpoint", action="store_true", help="Run the main graph with the SQLite checkpointer")
+    run.add_argument("--ollama-host", help="Use this Ollama instead of the stand-in")
+    run.add_argument("--llm", help="Model name for all LLM calls (default: Configuration.llm_model)")
+    run.add_argument("--time-scale", type=float, default=0.1, help="Factor applied to the stand-in delays (0: none)")
+    run.add_argument("--prefill-tps", type=float, default=400.0)
+    run.add_argument("--decode-tps", type=float, default=25.0)
+    run.add_argument("--slots", type=int, default=1)
+    run.add_argument("--load-latency", type=float, default=2.0)
+    run.add_argument("--output-tokens", type=int, default=64)
+    run.add_argument("--web-delay", type=float, default=1.0, help="Seconds per mock web search request")
+    run.add_argument("--verbose", action="store_true", help="Show the pipeline output")
+    run.add_argument("--cassette", help="Record the LLM, embedding and web traffic to / replay it from this file")
+    run.add_argument("--cassette-mode", choices=["record", "replay"], default="replay")
+    run.add_argument("--replay-latency", type=float, default=0.0,
+                     help="Factor applied to the recorded latencies when replaying (0: none)")
+
+    imports = commands.add_parser("imports", help="Measure the import time of the app and the main modules")
+    imports.add_argument("--output", help="Write results as JSON to this file")
+    imports.add_argument("--targets", help=f"Comma separated targets (default: all of {', '.join(IMPORT_TARGETS)})")
+    imports.add_argument("--repeat", type=int, default=5, help="Measured imports per target")
+
+    compare = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    compare.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as regression")
+    compare.add_argument("--min-seconds", type=float, default=0.005, help="Ignore latency changes below this")
+
+    args = parser.parse_args(argv)
+    if args.command in ("run", "imports"):
+        if args.command == "run":
+            results = run_benchmark(args)
+            print_summary(results)
+        else:
+            results = run_import_benchmark(args)
+            print_import_summary(results)
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.base, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    regressions, improvements = compare_results(base, new, args.threshold, args.min_seconds)
+    print(f"Comparing {args.base} ({base['meta'].get('commit')}) -> {args.new} ({new['meta'].get('commit')})")
+    for line in improvements:
+        print(f"  improved:  {line}")
+    for line in regressions:
+        print(f"  REGRESSED: {line}")
+    print(f"{len(regressions)} regressions, {len(improvements)} improvements")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,440 @@
+"""
+Local stand-in for the Ollama API.
+
+Serves POST /api/chat and POST /api/generate (streamed and non-streamed, as used by
+`invoke_ollama` and `langchain_community.llms.Ollama`) plus GET /api/tags, /api/ps and
+/api/version, with a simple performance model per model:
+
+- load_latency: seconds to load a model that is not resident (honours keep_alive)
+- prefill_tps: prompt tokens processed per second before the first output token
+- decode_tps: output tokens generated per second
+- slots: requests a model serves in parallel (like OLLAMA_NUM_PARALLEL), others queue
+
+Responses are deterministic: requests with a JSON schema `format` get an instance of
+that schema (e.g. valid `DetectedLanguage`), quality checker prompts get a quality
+check JSON object, everything else gets canned filler text unless a configured
+response rule matches. Timing fields (load_duration, prompt_eval_count, ...) describe
+the modelled durations. GET /stats reports request counts, tokens and concurrency.
+
+Usage:
+    python dev/mock_ollama_server.py --port 11435 --decode-tps 30 --slots 2
+    python dev/mock_ollama_server.py --config dev/mock_ollama.json --time-scale 0.1
+    export OLLAMA_HOST=http://127.0.0.1:11435
+
+Config file (all keys optional):
+    {
+      "default": {"prefill_tps": 400, "decode_tps": 25, "slots": 1, "load_latency": 2.0},
+      "models": {"qwen3:1.7b": {"decode_tps": 60}, "gpt-oss:20b": {"decode_tps": 12, "slots": 2}},
+      "responses": [{"match": "radon", "response": "Radon is a radioactive gas ($model)."}],
+      "quality_score": 350,
+      "language": "English"
+    }
+Response templates may use $model, $digest and $prompt_tokens.
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+
+# Tokens are modelled as 4 characters, like src.utils.estimate_tokens
+CHARS_PER_TOKEN = 4
+DEFAULT_KEEP_ALIVE = 300.0
+
+
+@dataclass
+class ModelProfile:
+    prefill_tps: float = 400.0
+    decode_tps: float = 25.0
+    slots: int = 1
+    load_latency: float = 2.0
+    output_tokens: int = 64
+
+
+def count_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def parse_keep_alive(value):
+    """Seconds a model stays loaded; None means forever (negative keep_alive)."""
+    if value is None or value == "":
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        match = re.fullmatch(r"\s*(-?\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*", str(value))
+        if not match:
+            return DEFAULT_KEEP_ALIVE
+        seconds = float(match.group(1)) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}[match.group(2)]
+    return None if seconds < 0 else seconds
+
+
+def _resolve(schema, root):
+    while "$ref" in schema:
+        schema = root.get("$defs", {}).get(schema["$ref"].split("/")[-1], {})
+    return schema
+
+
+def fill_schema(schema, digest, language="English", name="value", root=None):
+    """Deterministic instance of a JSON schema (as produced by pydantic model_json_schema)."""
+    root = root or schema
+    schema = _resolve(schema, root)
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        return fill_schema(schema["anyOf"][0], digest, language, name, root)
+    if kind == "object" or "properties" in schema:
+        return {key: fill_schema(sub, digest, language, key, root) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        item_name = name[:-1] if name.endswith("s") else name
+        return [fill_schema(schema.get("items", {}), digest, language, f"{item_name} {i + 1}", root) for i in range(3)]
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return 0
+    if name == "language":
+        return language
+    return f"Mock {name} {digest}"
+
+
+def quality_check_result(score, with_sections=False):
+    result = {
+        "quality_score": score,
+        "is_accurate": score > 300,
+        "issues_found": "" if score > 300 else "Mock issues.",
+        "missing_elements": "",
+        "citation_issues": "",
+        "improvement_needed": score <= 300,
+        "improvement_suggestions": "" if score > 300 else "Mock improvement suggestions.",
+    }
+    if with_sections:
+        result["failing_sections"] = []
+    return result
+
+
+def filler_text(model, digest, tokens):
+    text = f"Mock response {digest} from {model}."
+    i = 1
+    while count_tokens(text) < tokens:
+        text += f" This is deterministic mock sentence {i} for benchmarking."
+        i += 1
+    return text
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    server_version = "MockOllama/0.1"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, payload):
+        line = json.dumps(payload).encode("utf-8") + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.rstrip("/")
+        if path == "/api/tags":
+            self._send_json(200, {"models": [server.model_info(name) for name in server.known_models()]})
+        elif path == "/api/ps":
+            with server.lock:
+                loaded = [name for name, expiry in server.loaded.items() if expiry is None or expiry > time.monotonic()]
+            self._send_json(200, {"models": [server.model_info(name) for name in loaded]})
+        elif path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-mock"})
+        elif path == "/stats":
+            with server.lock:
+                self._send_json(200, json.loads(json.dumps(server.stats)))
+        elif path in ("", "/"):
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        path = self.path.rstrip("/")
+        if path not in ("/api/chat", "/api/generate"):
+            self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        model = data.get("model")
+        if not model:
+            self._send_json(400, {"error": "model is required"})
+            return
+        chat = path == "/api/chat"
+        if chat:
+            messages = data.get("messages") or []
+            prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        else:
+            prompt = "\n".join(filter(None, [data.get("system"), data.get("prompt")]))
+        self.server.handle_completion(self, model, chat, prompt, data)
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, profiles=None, default_profile=None, responses=None,
+                 quality_score=350, language="English", time_scale=1.0):
+        super().__init__(address, MockOllamaHandler)
+        self.default_profile = default_profile or ModelProfile()
+        self.profiles = dict(profiles or {})
+        self.responses = [(re.compile(r["match"], re.IGNORECASE | re.DOTALL), r["response"]) for r in (responses or [])]
+        self.quality_score = quality_score
+        self.language = language
+        self.time_scale = time_scale
+        self.lock = threading.Lock()
+        self.slots = {}
+        self.loading = {}
+        self.loaded = {}
+        self.in_flight = 0
+        self.stats = {
+            "requests": 0, "aborted": 0, "loads": 0, "prompt_tokens": 0, "eval_tokens": 0,
+            "max_in_flight": 0, "endpoints": {}, "models": {},
+        }
+
+    def profile(self, model):
+        return self.profiles.get(model, self.default_profile)
+
+    def known_models(self):
+        with self.lock:
+            return sorted(set(self.profiles) | set(self.stats["models"]))
+
+    def model_info(self, name):
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return {
+            "name": name, "model": name, "modified_at": now_iso(), "size": 0, "digest": digest,
+            "details": {"format": "gguf", "family": "mock", "parameter_size": "0B", "quantization_level": "mock"},
+        }
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+    def _slot(self, model):
+        with self.lock:
+            if model not in self.slots:
+                self.slots[model] = threading.BoundedSemaphore(max(1, self.profile(model).slots))
+                self.loading[model] = threading.Lock()
+            return self.slots[model], self.loading[model]
+
+    def ensure_loaded(self, model, keep_alive):
+        """Load the model if it is not resident; returns the modelled load duration."""
+        _, loading = self._slot(model)
+        with loading:
+            with self.lock:
+                expiry = self.loaded.get(model, 0)
+                resident = model in self.loaded and (expiry is None or expiry > time.monotonic())
+            load = 0.0
+            if not resident:
+                load = self.profile(model).load_latency
+                self.sleep(load)
+                with self.lock:
+                    self.stats["loads"] += 1
+            with self.lock:
+                self.loaded[model] = None if keep_alive is None else time.monotonic() + keep_alive
+        return load
+
+    def render_response(self, model, prompt, data):
+        """Deterministic response text for a request."""
+        digest = hashlib.sha1(f"{model}\n{prompt}".encode("utf-8")).hexdigest()[:8]
+        fmt = data.get("format")
+        if isinstance(fmt, dict):
+            return json.dumps(fill_schema(fmt, digest, self.language))
+        if '"quality_score"' in prompt:
+            return json.dumps(quality_check_result(self.quality_score, "failing_sections" in prompt))
+        for pattern, template in self.responses:
+            if pattern.search(prompt):
+                return Template(template).safe_substitute(model=model, digest=digest, prompt_tokens=count_tokens(prompt))
+        text = filler_text(model, digest, self.profile(model).output_tokens)
+        return json.dumps({"response": text}) if fmt == "json" else text
+
+    def handle_completion(self, handler, model, chat, prompt, data):
+        started = time.monotonic()
+        profile = self.profile(model)
+        keep_alive = parse_keep_alive(data.get("keep_alive"))
+        stream = data.get("stream", True) is not False
+        endpoint = "/api/chat" if chat else "/api/generate"
+        key = "message" if chat else "response"
+
+        def content(text):
+            return {"role": "assistant", "content": text} if chat else text
+
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["endpoints"][endpoint] = self.stats["endpoints"].get(endpoint, 0) + 1
+            self.stats["models"][model] = self.stats["models"].get(model, 0) + 1
+            self.in_flight += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.in_flight)
+        slot, _ = self._slot(model)
+        try:
+            # Empty prompt: load (or with keep_alive 0 unload) the model only, as Ollama does
+            if not prompt.strip():
+                if keep_alive == 0:
+                    with self.lock:
+                        self.loaded.pop(model, None)
+                    load, reason = 0.0, "unload"
+                else:
+                    load, reason = self.ensure_loaded(model, keep_alive), "load"
+                handler._send_json(200, {
+                    "model": model, "created_at": now_iso(), key: content(""), "done": True,
+                    "done_reason": reason, "total_duration": int(load * 1e9), "load_duration": int(load * 1e9),
+                })
+                return
+
+            with slot:
+                queued = time.monotonic() - started
+                load = self.ensure_loaded(model, keep_alive)
+                prompt_tokens = count_tokens(prompt)
+                text = self.render_response(model, prompt, data)
+                pieces = [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+                done_reason = "stop"
+                num_predict = (data.get("options") or {}).get("num_predict")
+                if isinstance(num_predict, int) and 0 < num_predict < len(pieces) and not data.get("format"):
+                    pieces, done_reason = pieces[:num_predict], "length"
+                prefill = prompt_tokens / profile.prefill_tps
+                decode = len(pieces) / profile.decode_tps
+                self.sleep(prefill)
+
+                if stream:
+                    handler.send_response(200)
+                    handler.send_header("Content-Type", "application/x-ndjson")
+                    handler.send_header("Transfer-Encoding", "chunked")
+                    handler.end_headers()
+                    decode_start = time.monotonic()
+                    sent = 0
+                    while sent < len(pieces):
+                        # Send every token that is due, then wait for the next one
+                        if self.time_scale:
+                            elapsed = (time.monotonic() - decode_start) / self.time_scale
+                            due = min(len(pieces), max(sent + 1, int(elapsed * profile.decode_tps) + 1))
+                        else:
+                            due = len(pieces)
+                        handler._write_chunk({"model": model, "created_at": now_iso(),
+                                              key: content("".join(pieces[sent:due])), "done": False})
+                        sent = due
+                        if sent < len(pieces):
+                            wait = decode_start + sent / profile.decode_tps * self.time_scale - time.monotonic()
+                            if wait > 0:
+                                time.sleep(wait)
+                else:
+                    self.sleep(decode)
+
+                final = {
+                    "model": model, "created_at": now_iso(), key: content("" if stream else "".join(pieces)),
+                    "done": True, "done_reason": done_reason,
+                    "total_duration": int((queued / (self.time_scale or 1) + load + prefill + decode) * 1e9),
+                    "load_duration": int(load * 1e9),
+                    "prompt_eval_count": prompt_tokens,
+                    "prompt_eval_duration": int(prefill * 1e9),
+                    "eval_count": len(pieces),
+                    "eval_duration": int(decode * 1e9),
+                }
+                if not chat:
+                    final["context"] = []
+                if stream:
+                    handler._write_chunk(final)
+                    handler.wfile.write(b"0\r\n\r\n")
+                else:
+                    handler._send_json(200, final)
+                with self.lock:
+                    self.stats["prompt_tokens"] += prompt_tokens
+                    self.stats["eval_tokens"] += len(pieces)
+                    if keep_alive == 0:
+                        self.loaded.pop(model, None)
+        except (BrokenPipeError, ConnectionResetError):
+            with self.lock:
+                self.stats["aborted"] += 1
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def start_mock_ollama_server(host="127.0.0.1", port=0, profiles=None, default_profile=None,
+                             responses=None, quality_score=350, language="English", time_scale=1.0):
+    """
+    Start the stand-in in a background thread.
+
+    Args:
+        profiles: {model name: ModelProfile} for models that differ from default_profile
+        responses: List of {"match": regex, "response": template} rules checked against the prompt
+        time_scale: Factor applied to all modelled delays (0 answers immediately)
+
+    Returns:
+        Tuple of (server, base_url). Call server.shutdown() to stop it.
+    """
+    server = MockOllamaServer((host, port), profiles=profiles, default_profile=default_profile,
+                              responses=responses, quality_score=quality_score, language=language,
+                              time_scale=time_scale)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def load_config(path=None, overrides=None):
+    """
+    Read a config file into keyword arguments for start_mock_ollama_server.
+    `overrides` replace fields of the default profile, which per-model profiles extend.
+    """
+    config = {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    default = ModelProfile(**{**config.get("default", {}), **(overrides or {})})
+    return {
+        "default_profile": default,
+        "profiles": {name: replace(default, **values) for name, values in config.get("models", {}).items()},
+        "responses": config.get("responses", []),
+        "quality_score": config.get("quality_score", 350),
+        "language": config.get("language", "English"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Ollama API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--config", help="JSON file with model profiles and response rules")
+    parser.add_argument("--prefill-tps", type=float, help="Default prompt tokens per second")
+    parser.add_argument("--decode-tps", type=float, help="Default output tokens per second")
+    parser.add_argument("--slots", type=int, help="Default parallel requests per model")
+    parser.add_argument("--load-latency", type=float, help="Default model load time in seconds")
+    parser.add_argument("--output-tokens", type=int, help="Default length of filler responses")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Factor applied to all delays")
+    args = parser.parse_args()
+
+    overrides = {field: getattr(args, field) for field in asdict(ModelProfile()) if getattr(args, field) is not None}
+    kwargs = load_config(args.config, overrides)
+    server, url = start_mock_ollama_server(args.host, args.port, time_scale=args.time_scale, **kwargs)
+    print(f"Mock Ollama listening on {url} ({kwargs['default_profile']}, time scale {args.time_scale})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
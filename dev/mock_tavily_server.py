@@ -0,0 +1,125 @@
+"""
+Local stand-in for the Tavily search API.
+
+Serves POST /search with deterministic results after a configurable delay, so web
+search can be exercised and timed without network access or an API key. Besides its
+own results, every query returns one shared page under a query-specific tracking URL
+(to exercise URL deduplication). GET /stats reports request counts and concurrency.
+
+Usage:
+    python dev/mock_tavily_server.py --port 8765 --delay 1.0
+    export TAVILY_API_BASE_URL=http://127.0.0.1:8765 TAVILY_API_KEY=dummy
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_results(query, max_results=3, include_raw_content=False, raw_content_chars=4000):
+    """Deterministic fake results for a query."""
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+    results = []
+    for i in range(max_results):
+        result = {
+            "title": f"Result {i+1} for {query}",
+            "url": f"https://example.org/{digest}/{i+1}?utm_source=mock",
+            "content": f"Mock snippet {i+1} about {query}.",
+            "score": round(1.0 - i * 0.1, 2),
+        }
+        if include_raw_content:
+            result["raw_content"] = (f"Raw content {i+1} about {query}. " * 200)[:raw_content_chars]
+        results.append(result)
+    # Every query also finds the same page, under a different tracking URL
+    shared = {
+        "title": "Shared reference page",
+        "url": f"https://www.example.org/shared/?utm_campaign={digest}#top",
+        "content": "Mock snippet of the shared reference page.",
+        "score": 0.5,
+    }
+    if include_raw_content:
+        shared["raw_content"] = ("Shared raw content. " * 400)[:raw_content_chars * 2]
+    return results + [shared]
+
+
+class MockTavilyHandler(BaseHTTPRequestHandler):
+    server_version = "MockTavily/0.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/search":
+            self._send_json(404, {"detail": f"Unknown endpoint {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        query = data.get("query", "")
+
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+            self.server.stats["queries"].append(query)
+            self.server.in_flight += 1
+            self.server.stats["max_in_flight"] = max(self.server.stats["max_in_flight"], self.server.in_flight)
+
+        time.sleep(self.server.delay)
+        with self.server.stats_lock:
+            self.server.in_flight -= 1
+        self._send_json(200, {
+            "query": query,
+            "results": make_results(
+                query,
+                max_results=data.get("max_results") or 5,
+                include_raw_content=bool(data.get("include_raw_content")),
+            ),
+            "response_time": self.server.delay,
+        })
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.server.stats_lock:
+                self._send_json(200, dict(self.server.stats))
+        else:
+            self._send_json(404, {"detail": f"Unknown endpoint {self.path}"})
+
+
+def start_mock_tavily_server(host="127.0.0.1", port=0, delay=1.0):
+    """
+    Start the stand-in in a background thread.
+
+    Returns:
+        Tuple of (server, base_url). Call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), MockTavilyHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.stats = {"requests": 0, "queries": [], "max_in_flight": 0}
+    server.in_flight = 0
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Tavily API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=1.0, help="Seconds to wait before answering")
+    args = parser.parse_args()
+
+    server, url = start_mock_tavily_server(args.host, args.port, args.delay)
+    print(f"Mock Tavily listening on {url} (delay {args.delay}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import copy
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    import benchmark
+
+    print("Testing the synthetic knowledge base...")
+    texts, metadatas = benchmark.synthetic_chunks(12, seed=1)
+    assert (texts, metadatas) == benchmark.synthetic_chunks(12, seed=1), "synthetic chunks are not deterministic"
+    assert {m["topic"] for m in metadatas} == set(benchmark.TOPICS)
+    emb = benchmark.HashingEmbeddings()
+    radon = emb.embed_query("radon measurement basement")
+    assert sum(a * b for a, b in zip(radon, emb.embed_query("radon basement measurement detector"))) > \
+        sum(a * b for a, b in zip(radon, emb.embed_query("traffic noise decibel night")))
+    assert benchmark.percentile([1, 2, 3, 4], 50) == 2.5 and benchmark.percentile([5], 99) == 5
+
+    print("Testing a benchmark run...")
+    out_dir = tempfile.mkdtemp(prefix="benchmark_")
+    base_path = os.path.join(out_dir, "base.json")
+    assert benchmark.main(["run", "--kb-size", "60", "--repeat", "2", "--warmup", "0", "--time-scale", "0",
+                           "--scenarios", "single_pass_en", "--output", base_path]) == 0
+    with open(base_path) as f:
+        base = json.load(f)
+    scenario = base["scenarios"]["single_pass_en"]
+    assert scenario["phases"]["total"]["count"] == 2
+    for node in ("detect_language", "generate_knowledge_base_questions", "retrieve_rag_documents",
+                 "summarize_query_research", "generate_final_answer", "source_linker"):
+        assert node in scenario["nodes"], f"{node} was not timed"
+    assert scenario["research_queries"] == 5, scenario["research_queries"]
+    assert scenario["llm"]["llm_calls"] > 5 and scenario["llm"]["prompt_tokens"] > 0, scenario["llm"]
+    assert base["peak_rss_mb"] > 0 and base["meta"]["kb_size"] == 60
+
+    print("Testing compare mode...")
+    assert benchmark.main(["compare", base_path, base_path]) == 0
+    slower = copy.deepcopy(base)
+    slower["scenarios"]["single_pass_en"]["nodes"]["retrieve_rag_documents"]["p50"] += 1.0
+    slower["scenarios"]["single_pass_en"]["llm"]["llm_calls"] += 1
+    regressions, improvements = benchmark.compare_results(base, slower)
+    assert any("retrieve_rag_documents p50" in r for r in regressions), regressions
+    assert any("llm_calls" in r for r in regressions), regressions
+    assert not improvements
+    new_path = os.path.join(out_dir, "new.json")
+    with open(new_path, "w") as f:
+        json.dump(slower, f)
+    assert benchmark.main(["compare", base_path, new_path]) == 1
+    _, improvements = benchmark.compare_results(slower, base)
+    assert len(improvements) == 2, improvements
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
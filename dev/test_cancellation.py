@@ -0,0 +1,159 @@
+import sys
+import os
+import json
+import time
+import select
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Minimal slow Ollama stand-in: /api/chat waits before answering (prefill), /api/generate
+# streams one token per TOKEN_DELAY. Prompts containing "fast" are answered at once.
+PREFILL_DELAY = 5.0
+TOKEN_DELAY = 0.2
+disconnects = []
+
+
+class SlowOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _client_gone(self, timeout):
+        """Wait up to timeout; True if the client closed the connection meanwhile."""
+        readable, _, _ = select.select([self.connection], [], [], timeout)
+        return bool(readable) and not self.connection.recv(1, 0x2)  # MSG_PEEK
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        started = time.monotonic()
+        prompt = json.dumps(data)
+        fast = "fast" in prompt
+        if not fast and self._client_gone(PREFILL_DELAY if self.path == "/api/chat" else 0):
+            disconnects.append((self.path, time.monotonic() - started))
+            return
+        if data.get("stream") is False:
+            body = json.dumps({"model": data["model"], "message": {"role": "assistant", "content": "tok0"}, "done": True}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i in range(1 if fast else 50):
+                key = "message" if self.path == "/api/chat" else "response"
+                content = {"role": "assistant", "content": f"tok{i} "} if key == "message" else f"tok{i} "
+                line = json.dumps({"model": data["model"], key: content, "done": False}).encode() + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+                if not fast and self._client_gone(TOKEN_DELAY):
+                    disconnects.append((self.path, time.monotonic() - started))
+                    return
+            key = "message" if self.path == "/api/chat" else "response"
+            last = json.dumps({"model": data["model"], key: {"role": "assistant", "content": ""} if key == "message" else "", "done": True}).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(last), last))
+        except (BrokenPipeError, ConnectionResetError):
+            disconnects.append((self.path, time.monotonic() - started))
+
+
+def cancel_after(token, delay):
+    threading.Timer(delay, token.cancel).start()
+
+
+try:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowOllamaHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    from src.cancellation import CancellationToken, ResearchCancelled, cancellation_scope
+    from src.utils import invoke_ollama
+    from src.rag_helpers import source_summarizer_ollama
+    # The Ollama clients are imported on first use; keep that out of the timed abort windows
+    import ollama
+    import langchain_community.llms
+
+    print("Testing invoke_ollama abort during prefill...")
+    token = CancellationToken()
+    cancel_after(token, 0.3)
+    start = time.monotonic()
+    try:
+        with cancellation_scope(token):
+            invoke_ollama("slow-model", "system", "slow question")
+        raise AssertionError("invoke_ollama was not cancelled")
+    except ResearchCancelled:
+        elapsed = time.monotonic() - start
+    print(f"  cancelled after {elapsed:.2f}s")
+    assert elapsed < 1.0, f"invoke_ollama took {elapsed:.2f}s to cancel"
+    time.sleep(0.3)
+    assert any(p == "/api/chat" and t < 1.0 for p, t in disconnects), f"server did not see the abort: {disconnects}"
+
+    print("Testing invoke_ollama without a token...")
+    assert invoke_ollama("fast-model", "system", "fast question").startswith("tok0")
+
+    print("Testing summarizer abort while decoding...")
+    disconnects.clear()
+    token = CancellationToken()
+    cancel_after(token, 0.5)
+    start = time.monotonic()
+    try:
+        with cancellation_scope(token):
+            source_summarizer_ollama("slow topic", "some context", "English", "", llm_model="slow-model")
+        raise AssertionError("summarizer was not cancelled")
+    except ResearchCancelled:
+        elapsed = time.monotonic() - start
+    print(f"  cancelled after {elapsed:.2f}s")
+    assert elapsed < 1.0, f"summarizer took {elapsed:.2f}s to cancel"
+    time.sleep(0.6)
+    assert any(p == "/api/generate" and t < 1.5 for p, t in disconnects), f"server did not see the abort: {disconnects}"
+
+    print("Testing cancellation of a graph run with partial state...")
+    import src.graph as graph
+    from langchain_core.documents import Document
+
+    graph.search_documents = lambda query, k=3, language="English": [
+        Document(page_content=f"context for {query}", metadata={"source": "a.pdf", "chunk_id": f"{query}-1"})
+    ]
+    main = graph.create_main_graph()
+    token = CancellationToken()
+    cancel_after(token, 0.5)
+    start = time.monotonic()
+    try:
+        main.invoke({
+            "user_query": "topic",
+            "research_queries": ["fast topic", "slow topic", "another topic"],
+            "web_search_enabled": False,
+            "enable_quality_checker": False,
+            "reflection_count": 0,
+            "summarization_llm": "slow-model",
+        }, {"configurable": {"cancellation_token": token}})
+        raise AssertionError("graph run was not cancelled")
+    except ResearchCancelled as e:
+        elapsed = time.monotonic() - start
+        partial = e.partial
+    print(f"  cancelled after {elapsed:.2f}s")
+    assert elapsed < 1.0, f"graph run took {elapsed:.2f}s to cancel"
+    assert list(partial.get("search_summaries", {})) == ["fast topic"], partial
+
+    print("Testing that a cancelled token skips nodes...")
+    try:
+        main.invoke({"user_query": "topic", "research_queries": ["fast topic"]}, {"configurable": {"cancellation_token": token}})
+        raise AssertionError("cancelled token did not stop the run")
+    except ResearchCancelled:
+        pass
+
+    server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,120 @@
+import sys
+import os
+import time
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    from mock_tavily_server import start_mock_tavily_server
+    ollama_server, ollama_url = start_mock_ollama_server(
+        default_profile=ModelProfile(load_latency=0, prefill_tps=20000, decode_tps=2000), time_scale=1
+    )
+    tavily_server, tavily_url = start_mock_tavily_server(delay=0.05)
+    os.environ["OLLAMA_HOST"] = ollama_url
+    os.environ["TAVILY_API_BASE_URL"] = tavily_url
+    os.environ["TAVILY_API_KEY"] = "mock-key"
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.cassette import (Cassette, CassetteMiss, use_cassette, get_cassette, wrap_embeddings,
+                              request_key, encode_vectors, decode_vectors)
+    from src.utils import stream_ollama, invoke_ollama
+    from src.llm_metrics import metrics_run, get_metrics_registry
+    from src.perf_metrics import get_performance_store
+
+    cassette_dir = tempfile.mkdtemp(prefix="cassettes_")
+    path = os.path.join(cassette_dir, "run.cassette.gz")
+
+    print("Testing the cassette format...")
+    assert request_key("llm", {"a": 1, "b": 2}) == request_key("llm", {"b": 2, "a": 1})
+    vectors = [[0.25, -1.0, 3.5], [0.0, 2.0, 1.0]]
+    assert decode_vectors(encode_vectors(vectors)) == vectors
+    assert get_cassette() is None, "cassettes are off by default"
+
+    embedding_calls = []
+
+    def embedding_factory():
+        embedding_calls.append(1)
+        return benchmark.HashingEmbeddings()
+
+    conf = get_config_instance()
+    vector_db.get_embedding_model = lambda: wrap_embeddings("hashing", embedding_factory)
+    conf.selected_database = benchmark.build_synthetic_kb(60)
+    state = {
+        "user_query": "radon limits", "detected_language": "English",
+        "summarization_llm": "mock", "report_llm": "mock",
+        "research_queries": ["radon limit basement", "radon measurement detector"],
+        "web_search_enabled": True, "enable_quality_checker": True, "reflection_count": 0,
+    }
+
+    print("Recording a research run...")
+    with use_cassette(path, "record") as recording, metrics_run("recorded"):
+        streamed = "".join(stream_ollama("mock", "system", "stream this"))
+        start = time.perf_counter()
+        recorded = graph.create_main_graph().invoke(dict(state))
+        recorded_seconds = time.perf_counter() - start
+    kinds = recording.summary()["kinds"]
+    for kind in ("llm", "summarizer", "web_search", "embedding"):
+        assert kinds.get(kind), f"no {kind} traffic recorded: {kinds}"
+    assert embedding_calls, "embeddings were not recorded through the model"
+    assert os.path.getsize(path) > 0
+
+    print("Replaying it without Ollama, Tavily or the embedding model...")
+    ollama_server.shutdown()
+    tavily_server.shutdown()
+    os.environ["OLLAMA_HOST"] = "http://127.0.0.1:9"
+    del os.environ["TAVILY_API_KEY"]
+    embedding_calls.clear()
+    for replay_latency in (0.0, 1.0):
+        with use_cassette(path, "replay", replay_latency) as replay, metrics_run(f"replay-{replay_latency}"):
+            assert "".join(stream_ollama("mock", "system", "stream this")) == streamed
+            start = time.perf_counter()
+            replayed = graph.create_main_graph().invoke(dict(state))
+            seconds = time.perf_counter() - start
+        assert replayed["final_answer"] == recorded["final_answer"]
+        assert replayed["internet_result"] == recorded["internet_result"]
+        assert replay.stats["misses"] == 0 and replay.stats["replayed"] == len(replay.entries), replay.summary()
+        if replay_latency:
+            assert seconds >= 0.5 * recorded_seconds, (seconds, recorded_seconds)
+        else:
+            assert seconds < recorded_seconds, (seconds, recorded_seconds)
+    assert not embedding_calls, "the embedding model was loaded during replay"
+    caches = get_performance_store().run_report("replay-0.0")["caches"]
+    assert caches["vectorstore"]["misses"] <= 1 and caches["vectorstore"]["hits"] > 0, caches
+    with use_cassette(path, "replay"):
+        wrapper = wrap_embeddings("hashing", embedding_factory)
+        assert wrap_embeddings("hashing", embedding_factory) is wrapper
+        assert wrap_embeddings("other", embedding_factory) is not wrapper
+    with use_cassette(path, "replay"):
+        assert wrap_embeddings("hashing", embedding_factory) is not wrapper, "wrappers are per cassette"
+    recorded_llm = get_metrics_registry().run_summary("recorded")["totals"]
+    replayed_llm = get_metrics_registry().run_summary("replay-0.0")["totals"]
+    assert replayed_llm["eval_count"] == recorded_llm["eval_count"] > 0, "server timings are not replayed"
+
+    print("Testing requests missing from the cassette...")
+    with use_cassette(path, "replay"):
+        try:
+            invoke_ollama("mock", "system", "a prompt that was never recorded")
+            raise AssertionError("expected a cassette miss")
+        except Exception as e:
+            assert isinstance(e.__cause__, CassetteMiss), repr(e)
+
+    print("Testing the configuration switch...")
+    conf.cassette_mode, conf.cassette_path = "replay", path
+    assert get_cassette().mode == "replay" and len(get_cassette().entries) == len(Cassette(path).entries)
+    conf.cassette_mode, conf.cassette_path = "off", None
+    assert get_cassette() is None
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
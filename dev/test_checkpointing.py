@@ -0,0 +1,157 @@
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import src.graph as graph
+    from src.checkpointing import CompactSqliteSaver, get_checkpointer, get_session_config, list_research_sessions
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    from langchain_core.documents import Document
+    import sqlite3
+
+    QUERIES = ["radon limits", "radon measurement", "radon remediation"]
+    calls = {"retrieve": 0, "summarize": 0, "report": 0, "precheck": 0}
+    fail = {"precheck": False, "summarize": False}
+
+    # Stand-ins for the LLM/RAG nodes; large documents make the checkpoint size visible
+    def fake_retrieve(state, config):
+        calls["retrieve"] += 1
+        return {"retrieved_documents": {
+            q: [Document(page_content=f"{q} chunk {i} " + "text " * 2000, metadata={"source": f"{i}.pdf"}) for i in range(5)]
+            for q in state["research_queries"]
+        }}
+
+    def fake_summarize(state, config):
+        calls["summarize"] += 1
+        if fail["summarize"]:
+            raise TimeoutError("Ollama timed out during summarization")
+        return {"search_summaries": {
+            q: [Document(page_content=f"summary of {q}", metadata={"position": 1})] for q in state["research_queries"]
+        }}
+
+    def fake_report(state, config):
+        calls["report"] += 1
+        return {"final_answer": "report based on " + ", ".join(sorted(state["search_summaries"]))}
+
+    def fake_precheck(state, config):
+        calls["precheck"] += 1
+        if fail["precheck"]:
+            raise TimeoutError("Ollama timed out during quality check")
+        return {"quality_precheck": {"verdict": "pass"}, "quality_check": {"is_accurate": True}}
+
+    graph.retrieve_rag_documents = fake_retrieve
+    graph.summarize_query_research = fake_summarize
+    graph.generate_final_answer = fake_report
+    graph.quality_prechecker = fake_precheck
+    graph.source_linker = lambda state, config: {"linked_final_answer": state["final_answer"]}
+
+    def initial_state():
+        return {
+            "user_query": "radon",
+            "research_queries": QUERIES,
+            "web_search_enabled": False,
+            "enable_quality_checker": True,
+            "reflection_count": 0,
+        }
+
+    tmp_dir = tempfile.mkdtemp(prefix="checkpoints_")
+    saver = get_checkpointer(os.path.join(tmp_dir, "checkpoints.sqlite"))
+    main = graph.create_main_graph(checkpointer=saver)
+
+    print("Testing resume after a failure in the quality check...")
+    config = get_session_config("session-a")
+    fail["precheck"] = True
+    try:
+        main.invoke(initial_state(), config)
+        raise AssertionError("expected the quality check to fail")
+    except TimeoutError:
+        pass
+    assert main.get_state(config).next, "failed run should have pending nodes"
+    sessions = list_research_sessions(main)
+    assert [s["session_id"] for s in sessions] == ["session-a"], sessions
+    assert sessions[0]["user_query"] == "radon"
+
+    fail["precheck"] = False
+    result = main.invoke(None, config)
+    assert result["linked_final_answer"].startswith("report based on"), result.get("linked_final_answer")
+    assert calls == {"retrieve": 1, "summarize": 1, "report": 1, "precheck": 2}, f"completed nodes were re-run: {calls}"
+    assert not main.get_state(config).next
+    assert list_research_sessions(main) == [], "completed session listed as resumable"
+
+    print("Testing resume after a failure inside the RAG branch...")
+    config = get_session_config("session-b")
+    fail["summarize"] = True
+    try:
+        main.invoke(initial_state(), config)
+        raise AssertionError("expected summarization to fail")
+    except TimeoutError:
+        pass
+    fail["summarize"] = False
+    before = dict(calls)
+    result = main.invoke(None, config)
+    assert result["final_answer"], "resumed run did not finish"
+    assert calls["retrieve"] == before["retrieve"], "retrieval was re-run on resume"
+    assert calls["summarize"] == before["summarize"] + 1
+
+    print("Testing restored documents...")
+    docs = main.get_state(config).values["retrieved_documents"]["radon limits"]
+    assert isinstance(docs[0], Document) and docs[0].page_content.startswith("radon limits chunk 0")
+    assert docs[0].metadata == {"source": "0.pdf"}
+
+    print("Testing compact checkpoint format...")
+    # Reopening the database resolves references without the in-memory cache
+    fresh = CompactSqliteSaver(sqlite3.connect(os.path.join(tmp_dir, "checkpoints.sqlite"), check_same_thread=False))
+    reopened = graph.create_main_graph(checkpointer=fresh).get_state(config).values
+    assert reopened["retrieved_documents"]["radon measurement"][4].page_content.startswith("radon measurement chunk 4")
+
+    plain_path = os.path.join(tmp_dir, "plain.sqlite")
+    plain = graph.create_main_graph(checkpointer=SqliteSaver(sqlite3.connect(plain_path, check_same_thread=False)))
+    plain.invoke(initial_state(), get_session_config("plain"))
+    compact_path = os.path.join(tmp_dir, "compact.sqlite")
+    compact = graph.create_main_graph(checkpointer=get_checkpointer(compact_path))
+    compact.invoke(initial_state(), get_session_config("compact"))
+
+    def payload_size(path):
+        conn = sqlite3.connect(path)
+        size = 0
+        for table, column in (("checkpoints", "checkpoint"), ("writes", "value"), ("checkpoint_documents", "content")):
+            try:
+                size += conn.execute(f"SELECT COALESCE(SUM(LENGTH({column})), 0) FROM {table}").fetchone()[0]
+            except sqlite3.OperationalError:
+                pass
+        conn.close()
+        return size
+
+    plain_size, compact_size = payload_size(plain_path), payload_size(compact_path)
+    print(f"  plain: {plain_size / 1024:.0f} KiB, compact: {compact_size / 1024:.0f} KiB")
+    assert compact_size < plain_size / 3, "compact checkpoints are not smaller"
+    conn = sqlite3.connect(compact_path)
+    stored = conn.execute("SELECT COUNT(*) FROM checkpoint_documents").fetchone()[0]
+    assert stored == len(QUERIES) * 6, f"expected {len(QUERIES) * 6} unique documents, got {stored}"
+
+    print("Testing old sessions are pruned with their documents...")
+    pruned_path = os.path.join(tmp_dir, "pruned.sqlite")
+    pruned = graph.create_main_graph(checkpointer=get_checkpointer(pruned_path, max_sessions=0))
+    pruned.invoke(initial_state(), get_session_config("old-shared"))
+    pruned.invoke({**initial_state(), "research_queries": ["radon in water"]}, get_session_config("old-own"))
+    pruned.invoke(initial_state(), get_session_config("recent"))
+    assert pruned.checkpointer.prune_sessions(1) == 2
+    conn = sqlite3.connect(pruned_path)
+    threads = [row[0] for row in conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+    assert threads == ["recent"], threads
+    stored = conn.execute("SELECT COUNT(*) FROM checkpoint_documents").fetchone()[0]
+    assert stored == len(QUERIES) * 6, f"documents of the recent session must be kept, got {stored}"
+    conn.close()
+    fresh = CompactSqliteSaver(sqlite3.connect(pruned_path, check_same_thread=False))
+    restored = graph.create_main_graph(checkpointer=fresh).get_state(get_session_config("recent")).values
+    assert restored["retrieved_documents"]["radon limits"][0].page_content.startswith("radon limits chunk 0")
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,89 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from langchain_core.documents import Document
+    from src.configuration import get_config_instance
+    from src.context_compression import compress_documents
+    from src.document_store import store_documents
+    from src.utils import estimate_tokens
+
+    embeddings = benchmark.HashingEmbeddings()
+    query = "radon limit for basements"
+    relevant = [
+        "The radon limit for basements is 300 Bq per cubic metre.",
+        "Basements above the radon limit need sealing and ventilation.",
+    ]
+    filler = [
+        f"The committee meeting number {i} discussed the annual budget and catering arrangements." for i in range(8)
+    ]
+    documents = [
+        Document(page_content=" ".join(filler[:4] + [relevant[0]] + filler[4:6]),
+                 metadata={"source": "/kb/guideline.pdf", "page": 3}),
+        Document(page_content=" ".join(filler[6:] + [relevant[1], relevant[0]]),
+                 metadata={"source": "/kb/handbook.pdf", "page": 7}),
+        Document(page_content=" ".join(filler[:3]), metadata={"source": "/kb/minutes.pdf"}),
+    ]
+
+    print("Testing that the relevant sentences are kept...")
+    budget = 35
+    compressed = compress_documents(query, documents, token_budget=budget, embeddings=embeddings)
+    kept_text = " ".join(d.page_content for d in compressed)
+    for sentence in relevant:
+        assert sentence in kept_text, (sentence, kept_text)
+    assert kept_text.count(relevant[0]) == 1, "repeated sentences are kept once"
+    assert not any(f in kept_text for f in filler), kept_text
+    assert sum(estimate_tokens(s) for s in relevant) <= budget
+
+    print("Testing attribution and metadata...")
+    sources = [d.metadata["source"] for d in compressed]
+    assert sources == ["/kb/guideline.pdf", "/kb/handbook.pdf"], sources
+    assert compressed[0].page_content == relevant[0] and compressed[0].metadata["page"] == 3
+    assert all(d.metadata["compressed"] for d in compressed)
+    assert compressed[0].metadata["original_tokens"] == estimate_tokens(documents[0].page_content)
+
+    print("Testing the gap marker and the budget...")
+    wide = compress_documents(query, documents, token_budget=60, embeddings=embeddings)
+    assert sum(estimate_tokens(d.page_content.replace("[...]", "")) for d in wide) <= 60
+    assert wide[0].page_content == f"{filler[0]} [...] {relevant[0]}", wide[0].page_content
+    assert compress_documents(query, documents, token_budget=10_000, embeddings=embeddings) == documents
+    assert compress_documents(query, [], embeddings=embeddings) == []
+
+    print("Testing compression inside summarize_query_research...")
+    conf = get_config_instance()
+    vector_db.get_embedding_model = lambda: embeddings
+    conf.enable_context_compression, conf.context_compression_token_budget = True, budget
+    contexts = {}
+
+    def fake_summarizer(user_query, context_documents, **kwargs):
+        contexts[user_query] = context_documents
+        return f"Summary of {user_query}"
+
+    real_summarizer = graph.source_summarizer_ollama
+    graph.source_summarizer_ollama = fake_summarizer
+    try:
+        state = {"retrieved_documents": {query: store_documents(documents)}, "detected_language": "English"}
+        result = graph.summarize_query_research(state, None)
+        assert contexts[query] == compressed, contexts[query]
+        conf.enable_context_compression = False
+        graph.summarize_query_research(state, None)
+        assert [d.page_content for d in contexts[query]] == [d.page_content for d in documents]
+    finally:
+        graph.source_summarizer_ollama = real_summarizer
+    assert query in result["search_summaries"]
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
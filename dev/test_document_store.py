@@ -0,0 +1,107 @@
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+try:
+    import src.document_store as document_store
+    from src.document_store import DocumentStore, store_documents, load_documents, get_document_id
+    from langchain_core.documents import Document
+
+    print("Testing content addressing...")
+    store = DocumentStore(max_documents=3)
+    a = Document(page_content="alpha", metadata={"source": "a.pdf", "score": 0.9})
+    a_again = Document(page_content="alpha", metadata={"source": "a.pdf", "score": 0.4})
+    chunk = Document(page_content="beta", metadata={"source": "b.pdf", "chunk_id": "chroma-1"})
+    assert store.put(a) == store.put(a_again), "score must not change the content address"
+    assert store.put(chunk) == "chroma-1", "knowledge base chunks are addressed by chunk id"
+    assert len(store) == 2
+    assert "score" not in store.get(get_document_id(a)).metadata
+
+    print("Testing eviction and loader fallback...")
+    for i in range(3):
+        store.put(Document(page_content=f"filler {i}"))
+    assert "chroma-1" not in store
+    store.add_loader(lambda ids: {i: Document(page_content="reloaded", metadata={"chunk_id": i}) for i in ids if i == "chroma-1"})
+    assert store.get("chroma-1").page_content == "reloaded"
+    assert store.get("unknown") is None
+
+    print("Testing references...")
+    refs = store_documents([a, chunk])
+    assert refs[0]["score"] == 0.9 and refs[1]["score"] is None
+    assert [d.page_content for d in load_documents(refs)] == ["alpha", "beta"]
+    assert load_documents([a])[0] is a, "plain Documents are passed through"
+
+    print("Testing the research graph on references...")
+    import src.graph as graph
+    from src.checkpointing import get_checkpointer, get_session_config
+
+    queries = ["radon limits", "radon measurement"]
+    summarized_inputs = []
+
+    def fake_search(query, k=3, language="English"):
+        # The same chunk is returned for every query, it must be stored once
+        return [Document(page_content=f"chunk for {query}", metadata={"source": "q.pdf", "chunk_id": f"{query}-1", "score": 0.8}),
+                Document(page_content="shared chunk", metadata={"source": "shared.pdf", "chunk_id": "shared-1", "score": 0.7})]
+
+    def fake_summarizer(user_query, context_documents, **kwargs):
+        summarized_inputs.append([d.page_content for d in context_documents])
+        return f"summary of {user_query}"
+
+    reports = []
+    def fake_llm(model, system_prompt, user_prompt, output_format=None):
+        reports.append(user_prompt)
+        return "final report"
+
+    fail = {"linker": True}
+    def fake_linker(state, config):
+        if fail["linker"]:
+            raise TimeoutError("interrupted")
+        docs = [d for refs in state["retrieved_documents"].values() for d in load_documents(refs)]
+        return {"linked_final_answer": f"{state['final_answer']} ({len(docs)} chunks)"}
+
+    graph.search_documents = fake_search
+    graph.source_summarizer_ollama = fake_summarizer
+    graph.invoke_ollama = fake_llm
+    graph.source_linker = fake_linker
+
+    saver = get_checkpointer(os.path.join(tempfile.mkdtemp(prefix="docstore_"), "checkpoints.sqlite"))
+    main = graph.create_main_graph(checkpointer=saver)
+    config = get_session_config("docstore")
+    state = {
+        "user_query": "radon",
+        "research_queries": queries,
+        "web_search_enabled": False,
+        "enable_quality_checker": False,
+        "reflection_count": 0,
+    }
+    try:
+        main.invoke(state, config)
+        raise AssertionError("expected the source linker to fail")
+    except TimeoutError:
+        pass
+
+    values = main.get_state(config).values
+    for field in ("retrieved_documents", "search_summaries"):
+        for refs in values[field].values():
+            assert all(isinstance(r, dict) and set(r) == {"doc_id", "score"} for r in refs), f"{field} holds {refs}"
+    assert values["retrieved_documents"]["radon limits"][0]["score"] == 0.8
+    assert values["retrieved_documents"]["radon limits"][1]["doc_id"] == values["retrieved_documents"]["radon measurement"][1]["doc_id"]
+    assert summarized_inputs == [["chunk for radon limits", "shared chunk"], ["chunk for radon measurement", "shared chunk"]]
+    assert "summary of radon limits" in reports[0] and "summary of radon measurement" in reports[0]
+
+    print("Testing resume with an empty document store (new process)...")
+    document_store._store = None
+    document_store.get_document_store().add_loader(saver.load_documents)
+    fail["linker"] = False
+    result = main.invoke(None, config)
+    assert result["linked_final_answer"] == "final report (4 chunks)", result["linked_final_answer"]
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,85 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    server, url = start_mock_ollama_server(default_profile=ModelProfile(load_latency=0, prefill_tps=1e6, decode_tps=1e6),
+                                           time_scale=0)
+    os.environ["OLLAMA_HOST"] = url
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import src.graph as graph
+    from src.configuration import get_config_instance
+
+    conf = get_config_instance()
+    state = {
+        "user_query": "radon limits in basements",
+        "detected_language": "English",
+        "human_feedback": "Focus on Germany and on measurement methods",
+        "additional_context": "AI Follow-up Questions:\n1. Which country?",
+        "report_llm": "mock-report",
+    }
+
+    def requests():
+        return server.stats["requests"]
+
+    print("Testing the fused turn (one LLM call)...")
+    conf.enable_fused_hitl_turn = True
+    before = requests()
+    result = graph.analyse_feedback_and_follow_up(dict(state), None)
+    assert requests() - before == 1, "the fused turn made more than one LLM call"
+    assert result["analysis"].startswith("Mock analysis "), result
+    questions = result["follow_up_questions"].splitlines()
+    assert len(questions) == 3 and all(q.startswith(f"{i + 1}. Mock follow_up_question {i + 1}")
+                                       for i, q in enumerate(questions)), questions
+    assert result["additional_context"] == (
+        f"{state['additional_context']}\n\nHuman Feedback Analysis:\n{result['analysis']}"
+        f"\n\nAI Follow-up Questions:\n{result['follow_up_questions']}"
+    )
+    assert result["current_position"] == "analyse_feedback_and_follow_up"
+
+    print("Testing the two-call path (disabled, or no feedback)...")
+    conf.enable_fused_hitl_turn = False
+    before = requests()
+    legacy = graph.analyse_feedback_and_follow_up(dict(state), None)
+    assert requests() - before == 2, requests() - before
+    assert legacy["analysis"] and legacy["follow_up_questions"]
+    assert legacy["current_position"] == "analyse_feedback_and_follow_up"
+    conf.enable_fused_hitl_turn = True
+    before = requests()
+    no_feedback = graph.analyse_feedback_and_follow_up({**state, "human_feedback": "  "}, None)
+    assert requests() - before == 1, "without feedback only the follow-up questions are generated"
+    assert no_feedback["analysis"] == "No human feedback provided for analysis."
+
+    print("Testing the fallback when the fused response does not validate...")
+    real_invoke = graph.invoke_ollama
+    fused_calls = []
+
+    def empty_questions(model, system_prompt, user_prompt, output_format=None):
+        result = real_invoke(model, system_prompt, user_prompt, output_format)
+        if output_format is not None and output_format.__name__ == "HitlTurn":
+            fused_calls.append(model)
+            result.follow_up_questions = ["  ", ""]
+        return result
+
+    graph.invoke_ollama = empty_questions
+    try:
+        before = requests()
+        fallback = graph.analyse_feedback_and_follow_up(dict(state), None)
+    finally:
+        graph.invoke_ollama = real_invoke
+    assert fused_calls == ["mock-report"]
+    assert requests() - before == 3, "expected the fused call plus the two-call fallback"
+    assert fallback["follow_up_questions"] and "Mock follow_up_question" not in fallback["follow_up_questions"]
+
+    server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
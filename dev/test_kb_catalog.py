@@ -0,0 +1,102 @@
+import sys
+import os
+import json
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    import src.kb_catalog as kb_catalog
+    from src.kb_catalog import KBCatalog
+
+    def write(path, content=b"%PDF-1.4\n"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    base = tempfile.mkdtemp(prefix="kb_catalog_")
+    first, second = os.path.join(base, "db_files"), os.path.join(base, "kb_files")
+    report_2023 = write(os.path.join(first, "2023", "report.pdf"))
+    report_2024 = write(os.path.join(first, "2024", "report.pdf"))
+    shadowed = write(os.path.join(second, "2024", "report.pdf"))
+    other_report = write(os.path.join(second, "other", "report.pdf"))
+    only_here = write(os.path.join(second, "notes.txt"), b"notes")
+    write(os.path.join(second, ".hidden.pdf"))
+    catalog_path = os.path.join(base, "kb_catalog.json")
+
+    warnings, page_counts = [], []
+
+    class RecordingLog:
+        def warning(self, msg, **fields):
+            warnings.append((msg, fields))
+
+        def __getattr__(self, name):
+            return lambda msg, **fields: None
+
+    kb_catalog.log = RecordingLog()
+    real_count_pages = kb_catalog._count_pages
+    kb_catalog._count_pages = lambda path: page_counts.append(path) or real_count_pages(path)
+    kb_catalog.REFRESH_INTERVAL = 0
+
+    print("Testing the catalog build...")
+    catalog = KBCatalog([first, second], catalog_path)
+    catalog.build()
+    assert sorted(catalog.entries) == ["2023/report.pdf", "2024/report.pdf", "notes.txt", "other/report.pdf"]
+    assert catalog.entries["2024/report.pdf"]["path"] == report_2024, "earlier roots win for the same relative path"
+    assert catalog.entries["notes.txt"]["pages"] is None and catalog.entries["notes.txt"]["size"] == 5
+    assert sorted(page_counts) == sorted([report_2023, report_2024, only_here, other_report]), page_counts
+    messages = [(msg, fields.get("file")) for msg, fields in warnings]
+    assert ("KB source file shadowed by an earlier root", "2024/report.pdf") in messages, messages
+    assert [f for m, f in messages if m.startswith("KB source files share a basename")] == ["report.pdf", "report.pdf"]
+
+    print("Testing resolution by relative path with the basename as fallback...")
+    assert catalog.resolve(source="/old/host/kb/files/2024/report.pdf")["path"] == report_2024
+    assert catalog.resolve(source="C:\\kb\\files\\2023\\report.pdf")["path"] == report_2023
+    assert catalog.resolve(source="other/report.pdf")["path"] == other_report
+    assert catalog.resolve(source="report.pdf")["path"] == report_2023, "a bare filename resolves to the first file"
+    assert catalog.resolve(source="/elsewhere/unknown/report.pdf")["path"] == report_2023
+    assert catalog.resolve(source="ignored.pdf", path="/x/other/report.pdf")["path"] == other_report, "path wins"
+    assert catalog.resolve(source="notes.txt")["path"] == only_here
+    assert catalog.resolve(source="missing.pdf") is None and catalog.resolve() is None
+
+    print("Testing that the catalog is rebuilt only when the directory signature changes...")
+    builds = []
+    real_build = catalog.build
+    catalog.build = lambda signature=None: builds.append(1) or real_build(signature)
+    page_counts.clear()
+    for _ in range(3):
+        catalog.refresh()
+    assert builds == [] and page_counts == [], "unchanged directories must not trigger a rebuild"
+    added = write(os.path.join(first, "2025", "summary.pdf"))
+    assert catalog.resolve(source="summary.pdf")["path"] == added
+    assert builds == [1] and page_counts == [added], "only the new file is opened again"
+    os.utime(report_2023, (1, 1))
+    catalog.refresh()
+    assert builds == [1], "file changes without a directory change are not checked"
+    kb_catalog.REFRESH_INTERVAL = 3600
+    write(os.path.join(second, "late.pdf"))
+    assert catalog.resolve(source="late.pdf") is None, "checked at most every REFRESH_INTERVAL seconds"
+    catalog.refresh(force=True)
+    assert catalog.resolve(source="late.pdf") is not None and builds == [1, 1]
+
+    print("Testing persistence...")
+    loaded = KBCatalog([first, second], catalog_path)
+    assert loaded.load() and loaded.entries == catalog.entries and loaded.basenames == catalog.basenames
+    assert loaded.resolve(source="/old/2024/report.pdf")["path"] == report_2024
+    assert not KBCatalog([second, first], catalog_path).load(), "other roots need a new catalog"
+    with open(catalog_path) as f:
+        data = json.load(f)
+    data["version"] = 1
+    with open(catalog_path, "w") as f:
+        json.dump(data, f)
+    assert not KBCatalog([first, second], catalog_path).load(), "catalogs of an older version are rebuilt"
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
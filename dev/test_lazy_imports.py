@@ -0,0 +1,67 @@
+import sys
+import os
+import json
+import copy
+import tempfile
+import subprocess
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    import benchmark
+    from src.lazy_imports import lazy_import, is_imported, import_times
+
+    print("Testing lazy modules...")
+    assert not is_imported("wave"), "pick a stdlib module nothing imports for this test"
+    wave = lazy_import("wave")
+    assert not is_imported("wave") and "not loaded" in repr(wave)
+    assert wave.WAVE_FORMAT_PCM == 1
+    assert is_imported("wave") and "wave" in import_times()
+    assert "WAVE_FORMAT_PCM" in dir(wave)
+    missing = lazy_import("no_such_module_here")
+    try:
+        missing.anything
+        raise AssertionError("expected an ImportError on first use")
+    except ImportError:
+        pass
+
+    print("Testing that the graph and the app do not import heavy dependencies...")
+    code = ("import sys, json; sys.path.insert(0, sys.argv[1]); import src.graph; "
+            "from src.utils import clear_cuda_memory; clear_cuda_memory(); "
+            "print(json.dumps([m for m in json.loads(sys.argv[2]) if m in sys.modules]))")
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    proc = subprocess.run([sys.executable, "-c", code, root, json.dumps(benchmark.HEAVY_MODULES)],
+                          capture_output=True, text=True, timeout=300, env=dict(os.environ, HF_HUB_OFFLINE="1"))
+    assert proc.returncode == 0, proc.stderr
+    assert json.loads(proc.stdout.strip().splitlines()[-1]) == [], proc.stdout
+
+    print("Testing the import benchmark...")
+    out_dir = tempfile.mkdtemp(prefix="imports_")
+    base_path = os.path.join(out_dir, "base.json")
+    assert benchmark.main(["imports", "--targets", "src.graph,app", "--repeat", "1", "--output", base_path]) == 0
+    with open(base_path) as f:
+        base = json.load(f)
+    for target in ("src.graph", "app"):
+        stats = base["imports"][target]
+        assert stats["seconds"]["count"] == 1 and stats["seconds"]["p50"] > 0
+        assert stats["heavy_modules"] == [], stats
+    assert "langgraph" in base["imports"]["src.graph"]["top_packages"], base["imports"]["src.graph"]
+    assert "streamlit" in base["imports"]["app"]["top_packages"]
+
+    slower = copy.deepcopy(base)
+    slower["imports"]["src.graph"]["seconds"]["p50"] += 1.0
+    slower["imports"]["app"]["heavy_modules"] = ["torch"]
+    regressions, improvements = benchmark.compare_results(base, slower)
+    assert any("import src.graph p50" in r for r in regressions), regressions
+    assert "import app now imports torch" in regressions and not improvements, regressions
+    _, improvements = benchmark.compare_results(slower, base)
+    assert "import app no longer imports torch" in improvements, improvements
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,101 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    profiles = {
+        # 400 prompt chars = 100 tokens in 0.1s, 200 output tokens per second
+        "timed-model": ModelProfile(prefill_tps=1000, decode_tps=200, slots=1, load_latency=0.6, output_tokens=40),
+    }
+    server, url = start_mock_ollama_server(profiles=profiles,
+                                           default_profile=ModelProfile(load_latency=0, prefill_tps=1e6, decode_tps=1e6))
+    os.environ["OLLAMA_HOST"] = url
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.cancellation import CancellationToken, cancellation_scope
+    from src.llm_metrics import OllamaMetrics, metrics_run, get_metrics_registry, summarize_metrics
+    from src.utils import invoke_ollama_with_metrics, invoke_ollama, stream_ollama, DetectedLanguage
+    from src.rag_helpers import source_summarizer_ollama_with_metrics
+
+    registry = get_metrics_registry()
+
+    print("Testing metrics from a raw response...")
+    m = OllamaMetrics.from_response({"model": "m", "prompt_eval_count": 200, "prompt_eval_duration": 500_000_000,
+                                     "eval_count": 50, "eval_duration": 2_000_000_000, "load_duration": 3_000_000_000,
+                                     "total_duration": 5_600_000_000})
+    assert m.prefill_tps == 400 and m.decode_tps == 25 and m.reloaded and m.total_ms == 5600
+    assert OllamaMetrics.from_response({"eval_count": 1}).prefill_tps is None
+    assert summarize_metrics([m])["bound"] == "decode" and summarize_metrics([])["bound"] is None
+
+    print("Testing invoke_ollama (cold and warm model)...")
+    with metrics_run("direct"):
+        cold = invoke_ollama_with_metrics("timed-model", "", "x" * 400)
+        warm = invoke_ollama_with_metrics("timed-model", "", "x" * 400)
+        parsed = invoke_ollama_with_metrics("any-model", "Detect the language.", "text", output_format=DetectedLanguage)
+    assert isinstance(cold.output, str) and cold.output
+    assert cold.metrics.model == "timed-model" and cold.metrics.reloaded and not warm.metrics.reloaded
+    assert cold.metrics.prompt_eval_count == 100 and cold.metrics.eval_count > 0, cold.metrics
+    assert 900 <= cold.metrics.prefill_tps <= 1100 and 180 <= cold.metrics.decode_tps <= 220, cold.metrics.to_dict()
+    assert isinstance(parsed.output, DetectedLanguage)
+    assert len(registry.calls("direct")) == 3
+    assert invoke_ollama("any-model", "s", "plain call") and len(registry.calls("default")) >= 1
+
+    print("Testing the streamed paths (cancellation scope, stream_ollama)...")
+    with metrics_run("streamed"), cancellation_scope(CancellationToken()):
+        streamed = invoke_ollama_with_metrics("timed-model", "", "x" * 400)
+    assert streamed.metrics.eval_count > 0, streamed.metrics
+    with metrics_run("streamed"):
+        assert "".join(stream_ollama("timed-model", "", "x" * 400))
+    assert [c.eval_count > 0 for c in registry.calls("streamed")] == [True, True]
+
+    print("Testing the summarizer (invoke and streamed)...")
+    with metrics_run("summaries"):
+        summary = source_summarizer_ollama_with_metrics("radon", "Radon is a gas.", "English", "", llm_model="timed-model")
+        with cancellation_scope(CancellationToken()):
+            streamed_summary = source_summarizer_ollama_with_metrics("radon", "Radon is a gas.", "English", "",
+                                                                     llm_model="timed-model")
+    assert "Mock response" in summary.output
+    for result in (summary, streamed_summary):
+        assert result.metrics.prompt_eval_count > 0 and result.metrics.eval_count > 0, result.metrics
+        assert result.metrics.eval_ms > 0 and result.metrics.model == "timed-model"
+
+    print("Testing per-node aggregation of a research run...")
+    conf = get_config_instance()
+    vector_db.get_embedding_model = lambda: benchmark.HashingEmbeddings()
+    conf.selected_database = benchmark.build_synthetic_kb(60)
+    conf.enable_quality_prechecks = False
+    with metrics_run("run-1"):
+        graph.create_main_graph().invoke({
+            "user_query": "radon limits", "detected_language": "English",
+            "summarization_llm": "mock", "report_llm": "mock",
+            "research_queries": ["radon limit basement", "radon measurement detector"],
+            "web_search_enabled": False, "enable_quality_checker": True, "reflection_count": 0,
+        })
+    summary = registry.run_summary("run-1")
+    nodes = summary["nodes"]
+    assert nodes["summarize_query_research"]["calls"] == 2, nodes
+    assert nodes["generate_final_answer"]["calls"] >= 1 and nodes["quality_checker"]["calls"] >= 1, nodes
+    assert summary["totals"]["calls"] == sum(n["calls"] for n in nodes.values())
+    assert summary["totals"]["eval_count"] > 0 and summary["models"]["mock"]["calls"] == summary["totals"]["calls"]
+
+    print("Testing the bounded run history...")
+    registry.max_runs = 3
+    for i in range(5):
+        registry.record(OllamaMetrics(model="m"), run_id=f"bulk-{i}")
+    assert registry.runs() == ["bulk-2", "bulk-3", "bulk-4"], registry.runs()
+
+    server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
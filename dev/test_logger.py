@@ -0,0 +1,131 @@
+import sys
+import os
+import json
+import time
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    ollama_server, ollama_url = start_mock_ollama_server(default_profile=ModelProfile(load_latency=0), time_scale=0)
+    os.environ["OLLAMA_HOST"] = ollama_url
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.pop("RESEARCH_LOG_LEVEL", None)
+    os.environ.pop("RESEARCH_LOG_FILE", None)
+
+    import benchmark
+    import src.logger as logger
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.llm_metrics import metrics_run
+    from src.logger import configure_logging, flush_logs, get_logger, log_debug, LogWriter
+
+    log_dir = tempfile.mkdtemp(prefix="logs_")
+    log_path = os.path.join(log_dir, "research.jsonl")
+
+    def read_records(path=log_path):
+        flush_logs()
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    print("Testing the configured level applies from the first logger...")
+    conf = get_config_instance()
+    logger._level_configured = False
+    conf.log_level = "warning"
+    assert not get_logger("early").is_enabled("info") and get_logger("early").is_enabled("warning")
+    conf.log_level = "info"
+
+    print("Testing level gating...")
+    configure_logging(level="info", path=log_path, console_level="off")
+    log = get_logger("test")
+    assert log is get_logger("test")
+    log.debug("hidden", value=1)
+    log_debug("debug step", {"a": 1})
+    log.info("Retrieved documents", query="radon", results=3)
+    log.warning("Slow search", ms=1200)
+    records = read_records()
+    assert [r["msg"] for r in records] == ["Retrieved documents", "Slow search"], records
+    assert records[0]["level"] == "info" and records[0]["logger"] == "test"
+    assert records[0]["query"] == "radon" and records[0]["results"] == 3
+    assert records[0]["thread"] == "MainThread" and "run" in records[0] and "node" in records[0]
+    with open(log_path, encoding="utf-8") as f:
+        assert ": " not in f.readline(), "records should be compact JSON"
+
+    # A disabled level costs about as much as a function call
+    start = time.perf_counter()
+    for _ in range(100000):
+        log.debug("hot path", value=1)
+    per_call_us = (time.perf_counter() - start) / 100000 * 1e6
+    assert per_call_us < 5, f"disabled debug logging took {per_call_us:.2f} us per call"
+
+    print("Testing log_debug at debug level...")
+    configure_logging(level="debug", path=log_path, console_level="off")
+    log_debug("debug step", {"a": 1, "when": object()})
+    record = read_records()[-1]
+    assert record["logger"] == "debug" and record["msg"] == "debug step" and record["data"]["a"] == 1
+
+    print("Testing rotation...")
+    rotate_path = os.path.join(log_dir, "rotate.jsonl")
+    configure_logging(level="info", path=rotate_path, max_bytes=2000, backups=2, console_level="off")
+    for i in range(200):
+        log.info("Rotating", i=i, padding="x" * 50)
+    flush_logs()
+    files = sorted(os.listdir(log_dir))
+    assert files == ["research.jsonl", "rotate.jsonl", "rotate.jsonl.1", "rotate.jsonl.2"], files
+    for name in files[1:]:
+        assert os.path.getsize(os.path.join(log_dir, name)) <= 2000
+    assert read_records(rotate_path)[-1]["i"] == 199
+    # The size limit counts bytes, not characters
+    wide_path = os.path.join(log_dir, "wide.jsonl")
+    configure_logging(level="info", path=wide_path, max_bytes=2000, backups=1, console_level="off")
+    for i in range(100):
+        log.info("Rotating", i=i, padding="\u00e4" * 150)
+    flush_logs()
+    for name in ("wide.jsonl", "wide.jsonl.1"):
+        assert os.path.getsize(os.path.join(log_dir, name)) <= 2000, name
+    assert sorted(os.listdir(log_dir)) == files + ["wide.jsonl", "wide.jsonl.1"]
+
+    print("Testing the bounded queue...")
+    slow = LogWriter(os.path.join(log_dir, "slow.jsonl"), console_level=logger.LEVELS["off"], queue_size=10)
+    original_write = slow._write
+    slow._write = lambda record: (time.sleep(0.01), original_write(record))
+    start = time.perf_counter()
+    for i in range(500):
+        slow.put({"ts": time.time(), "level": 20, "logger": "slow", "msg": "Flood", "i": i})
+    assert time.perf_counter() - start < 0.5, "putting records blocked the caller"
+    assert slow.dropped > 0
+    slow.close()
+    with open(os.path.join(log_dir, "slow.jsonl"), encoding="utf-8") as f:
+        written = [json.loads(line) for line in f]
+    assert any(r["msg"] == "Log records dropped" for r in written), written[:3]
+
+    print("Testing records of a graph run...")
+    configure_logging(level="debug", path=log_path, console_level="off")
+    vector_db.get_embedding_model = lambda: benchmark.HashingEmbeddings()
+    conf.selected_database = benchmark.build_synthetic_kb(60)
+    with metrics_run("logged-run"):
+        graph.create_main_graph().invoke({
+            "user_query": "radon limits", "detected_language": "English",
+            "summarization_llm": "mock", "report_llm": "mock",
+            "research_queries": ["radon limit basement", "radon measurement detector"],
+            "web_search_enabled": False, "enable_quality_checker": True, "reflection_count": 0,
+        })
+    records = [r for r in read_records() if r["run"] == "logged-run"]
+    assert any(r["msg"] == "Retrieving documents" and r["node"] == "retrieve_rag_documents" for r in records), records[:5]
+    searches = [r for r in records if r["msg"] == "Executing similarity search"]
+    assert searches and all(r["level"] == "debug" and r["k"] for r in searches), searches
+    checks = [r for r in records if r["msg"] in ("Pre-check verdict", "Quality check result")]
+    assert checks and all(r["level"] == "info" for r in checks), "quality results are logged at the default level"
+
+    configure_logging(level="info", console_level="info")
+    ollama_server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,74 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    server, url = start_mock_ollama_server(
+        default_profile=ModelProfile(load_latency=0, prefill_tps=1e6, decode_tps=1e6),
+        responses=[{"match": "unanswerable query", "response": ""},
+                   {"match": "TURNS TO FOLD", "response": "The user wants radon limits for basements ($model)."}],
+        time_scale=0,
+    )
+    os.environ["OLLAMA_HOST"] = url
+
+    import src.memory as memory_module
+    from src.memory import ConversationMemory
+    from src.utils import estimate_tokens
+
+    def long_turn(i):
+        return f"Turn {i}: " + " ".join(["the basement radon measurement was taken over several weeks"] * 6)
+
+    print("Testing rendering below the budget...")
+    memory = ConversationMemory("radon limits", "summary-model", max_tokens=300, keep_turns=2)
+    memory.add_turn("assistant", "AI Follow-up Questions:\n1. Which country?")
+    memory.add_turn("user", "   ")
+    memory.add_turn("user", "Germany")
+    assert len(memory.turns) == 2, "empty turns are ignored"
+    assert memory.render() == "Assistant: AI Follow-up Questions:\n1. Which country?\n\nUser: Germany"
+    assert not memory.needs_compaction() and memory.schedule_compaction() is None
+
+    print("Testing background compaction stays within max_tokens...")
+    for i in range(8):
+        memory.add_turn("user" if i % 2 else "assistant", long_turn(i))
+    assert estimate_tokens(memory.render()) > memory.max_tokens and memory.needs_compaction()
+    pending = memory.schedule_compaction()
+    assert pending is not None
+    memory.wait(30)
+    assert pending.result() is True
+    rendered = memory.render()
+    assert estimate_tokens(rendered) <= memory.max_tokens, estimate_tokens(rendered)
+    assert rendered.startswith("Summary of earlier conversation:\nThe user wants radon limits for basements (summary-model).")
+    assert long_turn(6) in rendered and long_turn(7) in rendered, "the latest turns stay verbatim"
+    assert long_turn(5) not in rendered
+    assert memory._folded == len(memory.turns) - memory.keep_turns
+    assert server.stats["models"].get("summary-model") == 1, server.stats["models"]
+
+    print("Testing memories share the compaction worker...")
+    other = ConversationMemory("radon limits", "summary-model", max_tokens=100, keep_turns=1)
+    for i in range(4):
+        other.add_turn("user", long_turn(i))
+    assert other.schedule_compaction() is not None
+    other.wait(30)
+    assert not hasattr(other, "_executor") and not hasattr(memory, "_executor")
+    assert memory_module._compaction_executor._max_workers == 2
+    assert not other.compact(), "nothing left to fold"
+
+    print("Testing a failed compaction keeps the turns...")
+    broken = ConversationMemory("unanswerable query", "summary-model", max_tokens=50, keep_turns=1)
+    for i in range(3):
+        broken.add_turn("user", long_turn(i))
+    assert broken.compact() is False
+    assert broken.summary == "" and broken._folded == 0 and long_turn(0) in broken.render()
+
+    server.shutdown()
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+import json
+import threading
+import urllib.request
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+
+    profiles = {
+        "timed-model": ModelProfile(prefill_tps=1000, decode_tps=100, slots=1, load_latency=0.5, output_tokens=40),
+        "parallel-model": ModelProfile(prefill_tps=1000, decode_tps=100, slots=2, load_latency=0, output_tokens=40),
+    }
+    server, url = start_mock_ollama_server(
+        profiles=profiles,
+        default_profile=ModelProfile(load_latency=0, prefill_tps=1e6, decode_tps=1e6),
+        responses=[{"match": "canned question", "response": "Canned answer from $model."}],
+    )
+    os.environ["OLLAMA_HOST"] = url
+    # Source linking falls back to plain output without the embedding model; don't wait for downloads
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    print(f"Mock Ollama running at {url}")
+
+    from ollama import Client
+    from src.utils import invoke_ollama, DetectedLanguage, KnowledgeBaseQuestions
+    from src.rag_helpers import source_summarizer_ollama
+
+    print("Testing structured and canned responses...")
+    detected = invoke_ollama("any-model", "Detect the language.", "Wie hoch ist der Grenzwert?", output_format=DetectedLanguage)
+    assert detected.language == "English", detected
+    questions = invoke_ollama("any-model", "system", "question", output_format=KnowledgeBaseQuestions)
+    assert len(questions.queries) == 3 and questions.queries[0] != questions.queries[1], questions
+    assert invoke_ollama("any-model", "system", "a canned question") == "Canned answer from any-model."
+    first = invoke_ollama("any-model", "system", "same prompt")
+    assert first == invoke_ollama("any-model", "system", "same prompt"), "responses are not deterministic"
+
+    print("Testing the quality checker JSON...")
+    import src.graph as graph
+    result = graph.quality_checker({
+        "final_answer": "report", "user_query": "query", "search_summaries": {},
+        "enable_quality_checker": True, "reflection_count": 0, "report_llm": "any-model",
+    }, {})
+    assert result["quality_check"]["is_accurate"] is True and result["quality_check"]["quality_score"] == 350, result
+
+    print("Testing the summarizer (/api/generate)...")
+    summary = source_summarizer_ollama("radon", "Radon is a gas.", "English", "", llm_model="any-model")
+    assert "Mock response" in summary, summary
+
+    print("Testing load latency, throughput and timing fields...")
+    client = Client(host=url)
+    start = time.perf_counter()
+    response = client.chat(model="timed-model", messages=[{"role": "user", "content": "x" * 400}])
+    cold = time.perf_counter() - start
+    assert response.load_duration == int(0.5e9), response.load_duration
+    assert response.prompt_eval_count == 100 and response.prompt_eval_duration == int(0.1e9)
+    assert response.eval_count >= 40 and response.eval_duration == int(response.eval_count / 100 * 1e9)
+    start = time.perf_counter()
+    chunks = list(client.chat(model="timed-model", messages=[{"role": "user", "content": "x" * 400}], stream=True))
+    warm = time.perf_counter() - start
+    print(f"  cold: {cold:.2f}s, warm (streamed, {len(chunks)} chunks): {warm:.2f}s")
+    assert cold > warm + 0.4, "model load latency was not applied once"
+    assert 0.45 < warm < 0.9, f"expected ~0.1s prefill + ~0.45s decode, got {warm:.2f}s"
+    assert len(chunks) > 5 and chunks[-1].done and chunks[-1].load_duration == 0
+
+    print("Testing parallel slots...")
+    def run_batch(model, n=4):
+        threads = [threading.Thread(target=client.generate, kwargs={"model": model, "prompt": f"p{i}"}) for i in range(n)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start
+    client.generate(model="timed-model", prompt="")  # load request, already resident
+    serial, parallel = run_batch("timed-model"), run_batch("parallel-model")
+    print(f"  1 slot: {serial:.2f}s, 2 slots: {parallel:.2f}s")
+    assert parallel < serial * 0.7, "requests were not served in parallel"
+    assert [m.model for m in client.list().models] == ["any-model", "parallel-model", "timed-model"]
+
+    print("Testing a full research run against the mock...")
+    from src.configuration import get_config_instance
+    from langchain_core.documents import Document
+    get_config_instance().enable_quality_prechecks = False
+    graph.search_documents = lambda query, k=3, language="English": [
+        Document(page_content=f"Context about {query}.", metadata={"source": "a.pdf", "chunk_id": f"{query}-1"})
+    ]
+    result = graph.create_main_graph().invoke({
+        "user_query": "radon limits",
+        "research_queries": ["radon limits", "radon measurement"],
+        "web_search_enabled": False,
+        "enable_quality_checker": True,
+        "reflection_count": 0,
+        "summarization_llm": "any-model",
+        "report_llm": "any-model",
+    })
+    assert result["final_answer"] and result["quality_check"]["is_accurate"], result.get("quality_check")
+    stats = json.loads(urllib.request.urlopen(f"{url}/stats").read())
+    assert stats["endpoints"]["/api/chat"] > 0 and stats["endpoints"]["/api/generate"] > 0, stats
+
+    server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
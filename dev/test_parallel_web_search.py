@@ -0,0 +1,73 @@
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Timing of the simulated stages (seconds)
+WEB_DELAY = 1.0
+RAG_DELAY = 1.0
+
+try:
+    from mock_tavily_server import start_mock_tavily_server
+    server, url = start_mock_tavily_server(delay=WEB_DELAY)
+    os.environ["TAVILY_API_BASE_URL"] = url
+    os.environ.setdefault("TAVILY_API_KEY", "mock-key")
+    import tempfile
+    os.environ["WEB_SEARCH_CACHE_DIR"] = tempfile.mkdtemp(prefix="web_search_cache_")
+    print(f"Mock Tavily running at {url}")
+
+    import src.graph as graph
+    from src.configuration import get_config_instance
+    from langchain_core.documents import Document
+
+    get_config_instance().enable_web_search = True
+
+    # Only the RAG/LLM stages are replaced by timed stand-ins; web search goes through
+    # the real web_search_node -> tavily_search -> TavilyClient against the mock server.
+    def fake_retrieve(state, config):
+        time.sleep(RAG_DELAY / 2)
+        return {"retrieved_documents": {state["user_query"]: [Document(page_content="doc", metadata={"source": "a.pdf"})]}}
+
+    def fake_summarize(state, config):
+        time.sleep(RAG_DELAY / 2)
+        return {"search_summaries": {state["user_query"]: [Document(page_content="summary")]}}
+
+    def fake_report(state, config):
+        assert state.get("internet_result"), "web search result did not reach generate_final_answer"
+        return {"final_answer": "report"}
+
+    graph.retrieve_rag_documents = fake_retrieve
+    graph.summarize_query_research = fake_summarize
+    graph.generate_final_answer = fake_report
+    graph.quality_prechecker = lambda state, config: {"quality_precheck": {"verdict": "pass"}, "quality_check": {"is_accurate": True}}
+    graph.source_linker = lambda state, config: {"linked_final_answer": state["final_answer"]}
+
+    main = graph.create_main_graph()
+
+    start = time.perf_counter()
+    result = main.invoke({
+        "user_query": "radon limits",
+        "research_queries": ["radon limits"],
+        "web_search_enabled": True,
+        "enable_quality_checker": True,
+        "reflection_count": 0,
+    })
+    elapsed = time.perf_counter() - start
+
+    sequential = WEB_DELAY + RAG_DELAY
+    print(f"Elapsed: {elapsed:.2f}s (sequential would be >= {sequential:.2f}s)")
+    print(f"Overlap: {sequential - elapsed:.2f}s")
+    assert "Mock snippet" in result["internet_result"], "web search result missing"
+    assert server.stats["requests"] == 1, f"expected 1 web request, got {server.stats['requests']}"
+    assert elapsed < sequential - 0.5 * min(WEB_DELAY, RAG_DELAY), "web search did not overlap with the RAG branch"
+
+    server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
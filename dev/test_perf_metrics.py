@@ -0,0 +1,80 @@
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    from mock_tavily_server import start_mock_tavily_server
+    ollama_server, ollama_url = start_mock_ollama_server(default_profile=ModelProfile(load_latency=0), time_scale=0)
+    tavily_server, tavily_url = start_mock_tavily_server(delay=0)
+    os.environ["OLLAMA_HOST"] = ollama_url
+    os.environ["TAVILY_API_BASE_URL"] = tavily_url
+    os.environ.setdefault("TAVILY_API_KEY", "mock-key")
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ["WEB_SEARCH_CACHE_DIR"] = tempfile.mkdtemp(prefix="web_cache_")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.llm_metrics import metrics_run
+    from src.perf_metrics import PerformanceStore, get_performance_store, summarize_latencies, current_rss_mb
+
+    print("Testing the store...")
+    store = PerformanceStore(max_runs=2)
+    store.record_node("a", 100.0, 5.0, run_id="r1")
+    store.record_cache("x", hits=3, misses=1, run_id="r1")
+    store.record_cache("x", hits=0, misses=0, run_id="r1")
+    store.record_retrieval("q", 12.0, 8.0, 3, 3, run_id="r1")
+    report = store.run_report("r1")
+    assert report["caches"]["x"] == {"hits": 3, "misses": 1, "hit_rate": 0.75}, report["caches"]
+    assert report["nodes"][0]["node"] == "a" and report["nodes"][0]["rss_mb"] > 0
+    assert report["retrieval_latency"]["p50"] == 12.0
+    store.record_node("b", 0, 1, run_id="r2")
+    store.record_node("c", 0, 1, run_id="r3")
+    assert store.runs() == ["r2", "r3"] and store.run_report("r1") is None
+    assert summarize_latencies([30, 10, 20])["p50"] == 20 and summarize_latencies([])["count"] == 0
+    assert current_rss_mb() > 0
+
+    print("Testing a recorded research run...")
+    conf = get_config_instance()
+    vector_db.get_embedding_model = lambda: benchmark.HashingEmbeddings()
+    conf.selected_database = benchmark.build_synthetic_kb(60)
+    conf.enable_quality_prechecks = False
+    assert not conf.enable_tracing, "the dashboard data must not depend on tracing"
+    for run_id in ("run-1", "run-2"):
+        with metrics_run(run_id):
+            graph.create_main_graph().invoke({
+                "user_query": "radon limits", "detected_language": "English",
+                "summarization_llm": "mock", "report_llm": "mock",
+                "research_queries": ["radon limit basement", "radon measurement detector"],
+                "web_search_enabled": True, "enable_quality_checker": True, "reflection_count": 0,
+            })
+    report = get_performance_store().run_report("run-2")
+    names = [n["node"] for n in report["nodes"]]
+    for name in ("retrieve_rag_documents", "summarize_query_research", "web_search_node", "generate_final_answer", "quality_checker"):
+        assert name in names, names
+    offsets = [n["offset_ms"] for n in report["nodes"]]
+    assert all(o >= 0 for o in offsets) and all(n["wall_ms"] >= 0 for n in report["nodes"])
+    assert report["retrieval_latency"]["count"] == 2 and report["retrievals"][0]["search_ms"] <= report["retrievals"][0]["wall_ms"]
+    caches = report["caches"]
+    assert caches["retrieved_documents"]["hits"] > 0, caches
+    assert caches["chunk_embeddings"]["hit_rate"] > 0, caches
+    assert caches["web_search"]["hits"] == 3, caches  # user query + 2 research queries
+    assert caches["llm_model"]["hit_rate"] == 1.0, caches
+    assert report["llm_models"]["mock"]["calls"] > 0 and report["llm_models"]["mock"]["decode_tps"]
+    assert report["memory"]["peak_node_rss_mb"] > 0
+    assert get_performance_store().run_report("run-1")["caches"]["web_search"]["misses"] == 3
+
+    ollama_server.shutdown()
+    tavily_server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
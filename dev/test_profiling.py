@@ -0,0 +1,94 @@
+import sys
+import os
+import json
+import pstats
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    ollama_server, ollama_url = start_mock_ollama_server(default_profile=ModelProfile(load_latency=0), time_scale=0)
+    os.environ["OLLAMA_HOST"] = ollama_url
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.pop("RESEARCH_PROFILE", None)
+    profile_root = tempfile.mkdtemp(prefix="profiles_")
+    os.environ["RESEARCH_PROFILE_DIR"] = profile_root
+
+    import benchmark
+    import tracemalloc
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.llm_metrics import metrics_run
+    from src.profiling import profile_block, profiled, get_profile_targets, get_profile_dir
+
+    conf = get_config_instance()
+
+    @profiled
+    def build_prompt(n):
+        return "\n".join(f"Query {i}: " + "x" * 200 for i in range(n))
+
+    print("Testing that profiling is off by default...")
+    assert get_profile_targets() is None
+    assert build_prompt(10).startswith("Query 0")
+    assert not os.listdir(profile_root) and not tracemalloc.is_tracing()
+
+    print("Testing the environment switch...")
+    os.environ["RESEARCH_PROFILE"] = "build_prompt"
+    with metrics_run("env-run"):
+        build_prompt(5000)
+    run_dir = os.path.join(profile_root, "env-run")
+    files = sorted(os.listdir(run_dir))
+    assert any(f.endswith("_build_prompt.prof") for f in files) and "summary.jsonl" in files, files
+    prof = next(f for f in files if f.endswith(".prof"))
+    stats = pstats.Stats(os.path.join(run_dir, prof))
+    assert any(func[2] == "build_prompt" for func in stats.stats), "build_prompt missing from the profile"
+    alloc = open(os.path.join(run_dir, prof.replace(".prof", ".alloc.txt"))).read()
+    assert "test_profiling.py" in alloc, alloc
+    entry = json.loads(open(os.path.join(run_dir, "summary.jsonl")).readline())
+    assert entry["target"] == "build_prompt" and entry["traced_peak_kb"] > 500 and entry["allocations"], entry
+    assert not tracemalloc.is_tracing(), "tracemalloc was left running"
+    os.environ["RESEARCH_PROFILE"] = "0"
+    conf.enable_profiling = True
+    assert get_profile_targets() is None, "RESEARCH_PROFILE=0 should override the configuration"
+    os.environ.pop("RESEARCH_PROFILE")
+
+    print("Testing nested blocks...")
+    conf.profile_targets = "outer,build_prompt"
+    with metrics_run("nested"):
+        with profile_block("outer"):
+            build_prompt(10)
+    entries = [json.loads(line) for line in open(os.path.join(get_profile_dir("nested"), "summary.jsonl"))]
+    inner, outer = entries
+    assert inner["target"] == "build_prompt" and inner["note"].startswith("nested in outer") and "profile" not in inner
+    assert outer["target"] == "outer" and outer["note"] is None and os.path.exists(outer["profile"])
+
+    print("Testing profiled graph nodes...")
+    vector_db.get_embedding_model = lambda: benchmark.HashingEmbeddings()
+    conf.selected_database = benchmark.build_synthetic_kb(60)
+    conf.enable_quality_prechecks = False
+    conf.profile_targets = "retrieve_rag_documents,generate_final_answer_prompt"
+    with metrics_run("graph-run"):
+        graph.create_main_graph().invoke({
+            "user_query": "radon limits", "detected_language": "English",
+            "summarization_llm": "mock", "report_llm": "mock",
+            "research_queries": ["radon limit basement", "radon measurement detector"],
+            "web_search_enabled": False, "enable_quality_checker": True, "reflection_count": 0,
+        })
+    entries = [json.loads(line) for line in open(os.path.join(get_profile_dir("graph-run"), "summary.jsonl"))]
+    assert sorted(e["target"] for e in entries) == ["generate_final_answer_prompt", "retrieve_rag_documents"], entries
+    assert all(e["note"] is None and os.path.exists(e["profile"]) for e in entries)
+    retrieve = pstats.Stats(next(e["profile"] for e in entries if e["target"] == "retrieve_rag_documents"))
+    assert any(func[2] == "search_documents" for func in retrieve.stats)
+
+    conf.enable_profiling = False
+    ollama_server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
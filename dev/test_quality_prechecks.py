@@ -0,0 +1,129 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from langchain_core.documents import Document
+    from src.configuration import get_config_instance
+    from src.document_store import store_documents
+    from src.quality_prechecks import (run_prechecks, check_numbers, check_sections, check_language,
+                                       check_citations, extract_numbers)
+
+    embeddings = benchmark.HashingEmbeddings()
+    vector_db.get_embedding_model = lambda: embeddings
+    titles = ["Introduction", "Findings"]
+    summaries = [
+        "The reference level for radon in homes is 300 Bq per cubic metre [Source_radon_guideline.pdf]. "
+        "Long-term measurements over 3 months give the most reliable average [Source_radon_guideline.pdf].",
+        "About 1,5 percent of the houses exceeded 1000 Bq per cubic metre in the survey [Source_survey_2019.pdf].",
+    ]
+    good_report = (
+        "# Introduction\n"
+        "The reference level for radon in homes is 300 Bq per cubic metre [Source_radon_guideline.pdf].\n\n"
+        "# Findings\n"
+        "Long-term measurements over 3 months give the most reliable average [Source_radon_guideline.pdf]. "
+        "About 1.5 percent of the houses exceeded 1000 Bq per cubic metre in the survey [Source_survey_2019.pdf].\n\n"
+        "Information Fidelity Score: 95/100"
+    )
+
+    def check(report, language="English"):
+        return run_prechecks(report, summaries, titles, language, embeddings=embeddings)
+
+    print("Testing the individual checks...")
+    assert extract_numbers("Score 7, section 2.1, 300 Bq, 1,000 homes. Information Fidelity Score: 95") == \
+        ["2.1", "300", "1,000"]
+    numbers = check_numbers("300 Bq, 1.5 percent, 1000 homes and 450 Bq", "\n".join(summaries))
+    assert numbers["ungrounded"] == ["450"] and numbers["total"] == 4 and numbers["score"] == 0.75, numbers
+    assert check_sections("# Introduction\ntext\n## findings\ntext", titles)["passed"]
+    assert check_sections("# Introduction\ntext", titles) == {"passed": False, "missing": ["Findings"], "heading_count": 1}
+    assert check_sections("# Einleitung\n# Ergebnisse", titles)["passed"], "translated headings are accepted"
+    assert check_language(good_report, "English") == {"passed": True, "guessed": "English"}
+    assert check_language("Too short to tell.", "English")["passed"] is None
+    assert check_citations(good_report, "\n".join(summaries)) == {"passed": True, "cited": 2, "unknown": []}
+    assert check_citations("no sources cited here", "cited [Source_a.pdf]")["passed"] is False
+    assert check_citations("[Source_a.pdf]", "nothing cited")["passed"] is None
+
+    print("Testing a clean report passes...")
+    result = check(good_report)
+    assert result["verdict"] == "pass", result
+    assert result["issues"] == [] and result["grounding"]["share"] == 1.0, result
+
+    print("Testing missing sections are flagged...")
+    result = check(good_report.replace("# Findings\n", ""))
+    assert result["verdict"] == "fail" and result["sections"]["missing"] == ["Findings"]
+    assert "Missing report sections: Findings" in result["issues"]
+
+    print("Testing missing and unknown citations are flagged...")
+    uncited = good_report.replace(" [Source_radon_guideline.pdf]", "").replace(" [Source_survey_2019.pdf]", "")
+    result = check(uncited)
+    assert result["verdict"] == "borderline" and result["citations"]["passed"] is False, result
+    assert "The report does not cite any of its sources" in result["issues"]
+    result = check(good_report.replace("[Source_survey_2019.pdf]", "[Source_invented_study.pdf]"))
+    assert result["verdict"] == "borderline" and result["citations"]["unknown"] == ["invented_study.pdf"], result
+    assert "Citations not found in any source summary: invented_study.pdf" in result["issues"]
+
+    print("Testing the report language is flagged...")
+    german = ("# Introduction\nDer Referenzwert für Radon in der Wohnung ist 300 Bq und das ist nicht zu hoch für die "
+              "meisten Häuser [Source_radon_guideline.pdf].\n# Findings\nDie Messung mit einem Detektor ist für drei "
+              "Monate zu empfehlen und die Werte sind mit der Umfrage von den Ämtern zu vergleichen.")
+    result = check(german)
+    assert result["language"] == {"passed": False, "guessed": "German"}, result
+    assert "Report appears to be written in German instead of English" in result["issues"]
+    assert result["verdict"] == "fail" and result["grounding"]["share"] < 0.4, "fails for its ungrounded claims"
+    assert check(german, "German")["language"]["passed"] is True
+    grounded = run_prechecks(german, summaries, titles, "English", grounding_threshold=-1.0, embeddings=embeddings)
+    assert grounded["verdict"] == "borderline", "the language guess alone goes to the LLM checker"
+
+    print("Testing ungrounded numbers...")
+    result = check(good_report.replace("300 Bq", "450 Bq").replace("1000 Bq", "2500 Bq"))
+    assert result["verdict"] == "fail" and result["numbers"]["ungrounded"] == ["2500", "450"], result
+
+    print("Testing the pre-check node...")
+    conf = get_config_instance()
+    conf.enable_quality_prechecks = True
+    conf.report_structure = "# Introduction\n- overview\n# Findings\n- results"
+    state = {
+        "final_answer": "<think>draft</think>\n" + good_report,
+        "search_summaries": {"radon": store_documents([Document(page_content=s) for s in summaries])},
+        "detected_language": "English",
+        "reflection_count": 0,
+    }
+    passed = graph.quality_prechecker(state, None)
+    assert passed["quality_check"] == {"is_accurate": True, "source": "precheck"} and passed["reflection_count"] == 1
+    assert graph.precheck_router({**state, **passed}) == "source_linker"
+    failed = graph.quality_prechecker({**state, "final_answer": good_report.replace("# Findings\n", "")}, None)
+    assert failed["quality_check"]["failing_sections"] == [
+        {"section": "Findings", "issues": "This section is missing from the report."}]
+    assert graph.precheck_router({**state, **failed}) == "generate_final_answer"
+    borderline = graph.quality_prechecker({**state, "final_answer": uncited}, None)
+    assert "quality_check" not in borderline and graph.precheck_router({**state, **borderline}) == "quality_checker"
+    conf.enable_quality_prechecks = False
+    assert graph.quality_prechecker(state, None) == {"quality_precheck": {"verdict": "skipped"}}
+
+    print("Testing the regenerated report sees the pre-check issues...")
+    prompts = []
+    real_invoke = graph.invoke_ollama
+    graph.invoke_ollama = lambda model, system_prompt, user_prompt, **kwargs: prompts.append(user_prompt) or "report"
+    try:
+        conf.report_mode = "single_pass"
+        graph.generate_final_answer({**state, "user_query": "radon"}, None)
+        graph.generate_final_answer({**state, **failed, "user_query": "radon"}, None)
+    finally:
+        graph.invoke_ollama = real_invoke
+    assert "failed the quality check" not in prompts[0]
+    assert "failed the quality check" in prompts[1] and "Missing report sections: Findings" in prompts[1], prompts[1]
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,83 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import numpy as np
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.similarity import deduplicate_queries, cluster_by_similarity, normalize_rows
+
+    class CountingEmbeddings(benchmark.HashingEmbeddings):
+        batches = []
+
+        def embed_documents(self, texts):
+            self.batches.append(list(texts))
+            return super().embed_documents(texts)
+
+    embeddings = CountingEmbeddings()
+
+    print("Testing clustering...")
+    vectors = normalize_rows([[1, 0], [0.99, 0.1], [0, 1], [0.1, 0.99]])
+    assert cluster_by_similarity(vectors, 0.9) == [(0, [1]), (2, [3])]
+    assert cluster_by_similarity(vectors, 0.999) == [(0, []), (1, []), (2, []), (3, [])]
+
+    print("Testing that near-duplicate queries are dropped...")
+    queries = [
+        "radon limits in basements",
+        "Radon limits in basements?",
+        "radon measurement detector calibration",
+        "radon limits in basements",
+        "",
+        "calibration of radon measurement detector",
+    ]
+    kept, dropped = deduplicate_queries(queries, threshold=0.85, embeddings=embeddings)
+    assert kept == ["radon limits in basements", "radon measurement detector calibration"], kept
+    assert len(embeddings.batches) == 1 and len(embeddings.batches[0]) == 4, "embedded in one batch without exact repeats"
+    by_query = {d["query"]: d for d in dropped}
+    assert by_query["Radon limits in basements?"]["duplicate_of"] == "radon limits in basements"
+    assert by_query["calibration of radon measurement detector"]["duplicate_of"] == "radon measurement detector calibration"
+    assert by_query["radon limits in basements"] == {"query": "radon limits in basements",
+                                                     "duplicate_of": "radon limits in basements", "similarity": 1.0}
+    assert all(0.85 <= d["similarity"] <= 1.0 for d in dropped), dropped
+    assert deduplicate_queries(["only one", "only one"], embeddings=embeddings) == \
+        (["only one"], [{"query": "only one", "duplicate_of": "only one", "similarity": 1.0}])
+    assert len(embeddings.batches) == 1, "a single unique query is not embedded"
+
+    print("Testing the HITL node...")
+    conf = get_config_instance()
+    vector_db.get_embedding_model = lambda: embeddings
+    conf.enable_query_dedup, conf.query_dedup_threshold = True, 0.85
+    state = {
+        "user_query": "radon limits in basements",
+        "research_queries": queries[:3],
+        "prefetched_documents": {q: [{"id": q}] for q in queries[:3]},
+    }
+    result = graph.deduplicate_research_queries(state, None)
+    assert result["research_queries"] == ["radon limits in basements", "radon measurement detector calibration"]
+    assert [d["duplicate_of"] for d in result["dropped_queries"]] == ["radon limits in basements"]
+    assert set(result["prefetched_documents"]) == set(result["research_queries"]), "prefetch of dropped queries kept"
+
+    conf.enable_query_dedup = False
+    assert graph.deduplicate_research_queries(state, None) == {"research_queries": queries[:3], "dropped_queries": []}
+    conf.enable_query_dedup = True
+
+    def broken_model():
+        raise RuntimeError("embedding model unavailable")
+
+    vector_db.get_embedding_model = broken_model
+    assert graph.deduplicate_research_queries(state, None)["research_queries"] == queries[:3], "failure keeps all queries"
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,120 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    titles = ["Introduction", "Main Body", "Key Takeaways", "Conclusion"]
+    server, url = start_mock_ollama_server(
+        # Section bodies take ~0.3s to decode, four slots so concurrency is only bounded by the app
+        default_profile=ModelProfile(load_latency=0, prefill_tps=1e6, decode_tps=60, slots=4),
+        responses=[{"match": f"Your section: {t}\n", "response": f"## {t}\nBody of {t} written by $model. "
+                                                                   f"It covers {t.lower()} in detail."}
+                   for t in titles],
+    )
+    os.environ["OLLAMA_HOST"] = url
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    import src.report_sections as report_sections
+    from langchain_core.documents import Document
+    from src.configuration import get_config_instance, DEFAULT_REPORT_STRUCTURE
+    from src.document_store import store_documents
+    from src.utils import ReportCoherence, SectionTransition
+    from src.report_sections import (parse_report_structure, split_report_into_sections, stitch_sections,
+                                     route_summaries_to_sections, apply_coherence_pass)
+
+    embeddings = benchmark.HashingEmbeddings()
+    vector_db.get_embedding_model = lambda: embeddings
+
+    print("Testing the report structure...")
+    sections = parse_report_structure(DEFAULT_REPORT_STRUCTURE)
+    assert [s["title"] for s in sections] == titles
+    assert sections[0]["guidance"].startswith("- Brief overview") and sections[0]["guidance"].count("\n") == 1
+    bodies = {t: f"Text of {t}.\n\nSecond paragraph." for t in titles}
+    report = stitch_sections(bodies)
+    assert report.startswith("# Introduction\n\nText of Introduction.")
+    assert split_report_into_sections(report, titles) == bodies
+    assert split_report_into_sections("Preamble\n## main body\nOnly this\n### Sub\nmore", titles) == \
+        {"Main Body": "Only this\n### Sub\nmore"}
+
+    print("Testing routing of summaries to sections...")
+    route_sections = [{"title": "Measurement", "guidance": "radon detector measurement calibration"},
+                      {"title": "Limits", "guidance": "legal radon limit values reference level"}]
+    summaries = [{"query": "radon detector calibration", "summary": "Detector measurement and calibration."},
+                 {"query": "radon reference level", "summary": "The legal limit values and the reference level."},
+                 {"query": "radon detector limit", "summary": "Measurement against the limit values."}]
+    routed = route_summaries_to_sections(route_sections, summaries, min_per_section=1, threshold=0.99,
+                                         embeddings=embeddings)
+    assert routed["Measurement"][0] == 0 and routed["Limits"][0] == 1, routed
+    assert sorted(set(routed["Measurement"]) | set(routed["Limits"])) == [0, 1, 2], "every summary is routed"
+    everything = route_summaries_to_sections(route_sections, summaries, min_per_section=1, threshold=-1.0,
+                                             embeddings=embeddings)
+    assert everything == {"Measurement": [0, 1, 2], "Limits": [0, 1, 2]}
+
+    class BrokenEmbeddings(benchmark.HashingEmbeddings):
+        def embed_documents(self, texts):
+            raise RuntimeError("embedding failed")
+
+    assert route_summaries_to_sections(route_sections, summaries, embeddings=BrokenEmbeddings()) == everything
+
+    print("Testing the coherence pass...")
+    real_invoke = report_sections.invoke_ollama
+    report_sections.invoke_ollama = lambda **kwargs: ReportCoherence(transitions=[
+        SectionTransition(section="Introduction", transition="Ignored for the first section."),
+        SectionTransition(section="Conclusion", transition="Taken together, these points lead to the conclusion."),
+        SectionTransition(section="Unknown", transition="Ignored."),
+    ])
+    try:
+        coherent = apply_coherence_pass(bodies, "radon", "English", "mock")
+    finally:
+        report_sections.invoke_ollama = real_invoke
+    assert coherent["Introduction"] == bodies["Introduction"] and coherent["Main Body"] == bodies["Main Body"]
+    assert coherent["Conclusion"] == f"Taken together, these points lead to the conclusion.\n\n{bodies['Conclusion']}"
+    assert apply_coherence_pass({"Introduction": "x"}, "radon", "English", "mock") == {"Introduction": "x"}
+
+    print("Testing sectioned generation with the mock Ollama server...")
+    conf = get_config_instance()
+    conf.report_structure = DEFAULT_REPORT_STRUCTURE
+    conf.report_mode, conf.report_max_parallel_sections = "sectioned", 2
+    state = {
+        "user_query": "radon limits in basements",
+        "detected_language": "English",
+        "report_llm": "section-model",
+        "search_summaries": {s["query"]: store_documents([Document(page_content=s["summary"])]) for s in summaries},
+    }
+    result = graph.generate_final_answer(state, None)
+    assert list(result["report_sections"]) == titles
+    for title in titles:
+        body = result["report_sections"][title]
+        assert body.startswith(f"Body of {title} written by section-model."), body
+        assert f"## {title}" not in body, "the repeated heading is dropped"
+    assert result["final_answer"] == stitch_sections(result["report_sections"])
+    assert server.stats["max_in_flight"] == 2, server.stats["max_in_flight"]
+
+    print("Testing the single-pass fallback...")
+    real_generate = report_sections.generate_sections_parallel
+
+    def broken_generate(*args, **kwargs):
+        raise RuntimeError("section generation failed")
+
+    report_sections.generate_sections_parallel = broken_generate
+    try:
+        fallback = graph.generate_final_answer(state, None)
+    finally:
+        report_sections.generate_sections_parallel = real_generate
+    assert "report_sections" not in fallback and fallback["final_answer"].startswith("Mock response")
+    conf.report_mode = "single_pass"
+
+    server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
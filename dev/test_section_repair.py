@@ -0,0 +1,86 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    server, url = start_mock_ollama_server(
+        default_profile=ModelProfile(load_latency=0, prefill_tps=1e6, decode_tps=1e6),
+        responses=[
+            {"match": "Your section: Main Body\n.*Issues to fix.*Previous version of this section:\nOld main body",
+             "response": "Repaired main body by $model [Source_radon.pdf]."},
+            {"match": "Your section: Conclusion\n.*This section is missing from the report",
+             "response": "New conclusion by $model."},
+            {"match": "Report structure to follow:",
+             "response": "<think>plan</think>\n# Introduction\nRewritten introduction.\n\n# Main Body\nRewritten main body."},
+        ],
+        time_scale=0,
+    )
+    os.environ["OLLAMA_HOST"] = url
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance, DEFAULT_REPORT_STRUCTURE
+    from src.report_sections import stitch_sections
+
+    vector_db.get_embedding_model = lambda: benchmark.HashingEmbeddings()
+    conf = get_config_instance()
+    conf.report_structure, conf.report_mode = DEFAULT_REPORT_STRUCTURE, "single_pass"
+    titles = ["Introduction", "Main Body", "Key Takeaways", "Conclusion"]
+    old_sections = {t: f"Old {t.lower()}." for t in titles}
+    base_state = {
+        "user_query": "radon limits in basements",
+        "detected_language": "English",
+        "report_llm": "repair-model",
+        "search_summaries": {},
+        "report_sections": old_sections,
+        "final_answer": stitch_sections(old_sections),
+    }
+
+    def requests():
+        return server.stats["requests"]
+
+    print("Testing that only the failing section is regenerated...")
+    state = {**base_state, "quality_check": {
+        "is_accurate": False,
+        "failing_sections": [{"section": "## main body ", "issues": "Claims lack citations."}, "not a dict",
+                             {"section": "Unknown Section", "issues": "Ignored."}],
+        "citation_issues": "Cite the radon guideline.",
+    }}
+    before = requests()
+    result = graph.repair_report_sections(state, None)
+    assert requests() - before == 1, "only one section should be regenerated"
+    assert result["report_sections"]["Main Body"] == "Repaired main body by repair-model [Source_radon.pdf]."
+    for title in ("Introduction", "Key Takeaways", "Conclusion"):
+        assert result["report_sections"][title] == old_sections[title], "unchanged sections are reused"
+    assert list(result["report_sections"]) == titles
+    assert result["final_answer"] == stitch_sections(result["report_sections"])
+
+    print("Testing sections missing from the report...")
+    partial = {t: old_sections[t] for t in titles[:3]}
+    state = {**base_state, "report_sections": {}, "final_answer": "<think>x</think>\n" + stitch_sections(partial),
+             "quality_check": {"is_accurate": False, "failing_sections": []}}
+    before = requests()
+    result = graph.repair_report_sections(state, None)
+    assert requests() - before == 1
+    assert {t: result["report_sections"][t] for t in titles[:3]} == partial, "sections are recovered from the answer"
+    assert result["report_sections"]["Conclusion"] == "New conclusion by repair-model."
+
+    print("Testing the full regeneration fallback...")
+    state = {**base_state, "quality_check": {"is_accurate": False, "failing_sections": [{"section": "Elsewhere"}]}}
+    result = graph.repair_report_sections(state, None)
+    assert "Rewritten introduction." in result["final_answer"]
+    assert result["report_sections"] == {"Introduction": "Rewritten introduction.", "Main Body": "Rewritten main body."}, \
+        "the sections of the previous report must not be kept"
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
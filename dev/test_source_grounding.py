@@ -0,0 +1,139 @@
+import sys
+import os
+import tempfile
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    import src.kb_catalog as kb_catalog
+    from langchain_core.documents import Document
+    from src.configuration import get_config_instance
+    from src.document_store import store_documents
+    from src.rag_helpers import link_sources_by_embedding, linkify_sources
+
+    class CountingEmbeddings(benchmark.HashingEmbeddings):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def embed_documents(self, texts):
+            self.batches.append(len(texts))
+            return super().embed_documents(texts)
+
+    # A catalog over a temporary source directory, so links resolve to real files
+    files_dir = tempfile.mkdtemp(prefix="grounding_files_")
+    for name in ("radon_guideline.pdf", "survey.pdf"):
+        with open(os.path.join(files_dir, name), "wb") as f:
+            f.write(b"%PDF-1.4\n")
+    catalog = kb_catalog.KBCatalog([files_dir], os.path.join(files_dir, "kb_catalog.json"))
+    catalog.build()
+    kb_catalog._catalogs["grounding-test-db"] = catalog
+    guideline_path = os.path.join(files_dir, "radon_guideline.pdf")
+    survey_path = os.path.join(files_dir, "survey.pdf")
+
+    chunks = [
+        Document(page_content="The reference level for radon in homes is 300 Bq per cubic metre of indoor air.",
+                 metadata={"source": "/original/location/radon_guideline.pdf", "chunk_id": "guideline-1"}),
+        Document(page_content="The national survey measured radon in twelve thousand basements over one winter.",
+                 metadata={"source": "survey.pdf", "chunk_id": "survey-1"}),
+    ]
+    report = (
+        "# Findings\n"
+        "The reference level for radon in homes is 300 Bq per cubic metre of indoor air.\n"
+        "The national survey measured radon in twelve thousand basements [survey.pdf].\n"
+        "Bananas are a popular fruit in many tropical countries around the world."
+    )
+
+    print("Testing grounding and source links...")
+    embeddings = CountingEmbeddings()
+    vector_db._chunk_embeddings["guideline-1"] = embeddings.embed_query(chunks[0].page_content)
+    linked, grounding = link_sources_by_embedding(report, chunks + [chunks[0]], threshold=0.6, embeddings=embeddings,
+                                                  selected_database="grounding-test-db")
+    assert embeddings.batches == [1, 3], "only the uncached chunk and the sentences are embedded, one batch each"
+    assert [g["source"] for g in grounding] == ["radon_guideline.pdf", "survey.pdf", grounding[2]["source"]]
+    assert [g["linked"] for g in grounding] == [True, True, False], grounding
+    assert grounding[0]["score"] > 0.99 and grounding[2]["score"] < 0.6
+    assert grounding[0]["path"] == guideline_path, "paths resolve through the KB catalog"
+    lines = linked.splitlines()
+    assert lines[0] == "# Findings"
+    assert lines[1] == ("The reference level for radon in homes is 300 Bq per cubic metre of indoor air "
+                        f"[radon_guideline.pdf]({guideline_path}).")
+    assert lines[2] == report.splitlines()[2], "a sentence citing its source is not linked twice"
+    assert lines[3] == report.splitlines()[3]
+    assert link_sources_by_embedding(report, [], embeddings=embeddings) == (report, [])
+
+    print("Testing citation links...")
+    assert linkify_sources("See [survey.pdf] and [done.pdf](x).", selected_database="grounding-test-db",
+                           documents=chunks) == f"See [survey.pdf]({survey_path}) and [done.pdf](x)."
+
+    print("Testing the source linker node...")
+    conf = get_config_instance()
+    conf.source_link_threshold = 0.6
+    vector_db.get_embedding_model = lambda: benchmark.HashingEmbeddings()
+    state = {
+        "final_answer": report,
+        "retrieved_documents": {"radon": store_documents(chunks)},
+        "selected_database": "grounding-test-db",
+    }
+    result = graph.source_linker(state, None)
+    assert f"[radon_guideline.pdf]({guideline_path})" in result["linked_final_answer"]
+    assert f"[survey.pdf]({survey_path})" in result["linked_final_answer"], "existing citations become links"
+    assert [g["linked"] for g in result["source_grounding"]] == [True, True, False]
+
+    def broken_model():
+        raise RuntimeError("embedding model unavailable")
+
+    vector_db.get_embedding_model = broken_model
+    vector_db._chunk_embeddings.clear()
+    result = graph.source_linker(state, None)
+    assert result["source_grounding"] == [] and f"[survey.pdf]({survey_path})" in result["linked_final_answer"]
+
+    print("Testing the chunk embedding cache...")
+
+    class FakeVectorstore:
+        def get(self, ids, include):
+            return {"ids": ids, "embeddings": [[float(len(chunk_id))] for chunk_id in ids]}
+
+    def chunk(chunk_id):
+        return Document(page_content=chunk_id, id=chunk_id)
+
+    store = FakeVectorstore()
+    vector_db.CHUNK_EMBEDDING_CACHE_SIZE = 2
+    vector_db.cache_chunk_embeddings(store, [chunk("a"), chunk("b")])
+    assert vector_db.get_cached_chunk_embeddings([chunk("a"), chunk("x")]) == [[1.0], None]
+    vector_db.cache_chunk_embeddings(store, [chunk("c")])
+    assert list(vector_db._chunk_embeddings) == ["a", "c"], "the least recently used chunk is evicted"
+
+    vector_db.CHUNK_EMBEDDING_CACHE_SIZE = 100
+    errors = []
+
+    def fill(worker):
+        try:
+            for i in range(300):
+                vector_db.cache_chunk_embeddings(store, [chunk(f"{worker}-{i}")])
+                vector_db.get_cached_chunk_embeddings([chunk(f"{worker}-{i // 2}")])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=fill, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == [] and len(vector_db._chunk_embeddings) == 100, (errors, len(vector_db._chunk_embeddings))
+    vector_db._chunk_embeddings.clear()
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,120 @@
+import sys
+import os
+import json
+import time
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import src.graph as graph
+    import src.utils as utils
+    from langchain_core.documents import Document
+    from src.utils import extract_streamed_json_list
+
+    print("Testing partial input...")
+    assert extract_streamed_json_list('', "queries") == []
+    assert extract_streamed_json_list('{"analysis": "radon', "queries") == []
+    assert extract_streamed_json_list('{"queries": [', "queries") == []
+    assert extract_streamed_json_list('{"queries": ["a", "b", "c', "queries") == ["a", "b"]
+    assert extract_streamed_json_list('{"queries" :\n [ "a" , "b"]', "queries") == ["a", "b"]
+    assert extract_streamed_json_list('{"queries": ["a"], "other": ["x"]}', "queries") == ["a"]
+    assert extract_streamed_json_list('{"other": ["x"], "queries": ["a"]}', "queries") == ["a"]
+
+    print("Testing escaped input...")
+    assert extract_streamed_json_list(r'{"queries": ["say \"hi\"", "back\\slash", "tab\t", "x\"', "queries") == \
+        ['say "hi"', "back\\slash", "tab\t"]
+    quoted = json.dumps({"analysis": 'The answer should look like "queries": ["decoy"]', "queries": ["real one", "two"]})
+    assert '\\"queries\\": [' in quoted
+    assert extract_streamed_json_list(quoted, "queries") == ["real one", "two"]
+    # Cut inside the analysis: the escaped key must not start the list
+    cut = quoted[:quoted.index("decoy") + 8]
+    assert extract_streamed_json_list(cut, "queries") == [], extract_streamed_json_list(cut, "queries")
+    # Every prefix yields a prefix of the final list
+    for end in range(len(quoted) + 1):
+        items = extract_streamed_json_list(quoted[:end], "queries")
+        assert items == ["real one", "two"][:len(items)], (end, items)
+
+    print("Testing retrieval starts while the queries are streamed...")
+    response = json.dumps({"analysis": 'Compare "queries": ["decoy query"] with national limits.',
+                           "queries": ["radon limit germany", "radon measurement"]})
+    searched = []
+    searched_lock = threading.Lock()
+    seen_during_stream = []
+
+    def fake_stream(model, system_prompt, user_prompt, format=None):
+        for i in range(0, len(response), 7):
+            with searched_lock:
+                seen_during_stream.append(list(searched))
+            time.sleep(0.005)
+            yield response[i:i + 7]
+
+    def fake_search(query, k=3, language="English"):
+        with searched_lock:
+            searched.append(query)
+        return [Document(page_content=f"About {query}", metadata={"source": f"/kb/{query}.pdf"})]
+
+    real_stream, real_search = utils.stream_ollama, graph.search_documents
+    utils.stream_ollama, graph.search_documents = fake_stream, fake_search
+    try:
+        result = graph.generate_knowledge_base_questions_single_pass({
+            "user_query": "radon limits", "detected_language": "English", "max_search_queries": 3,
+            "report_llm": "mock",
+        }, None)
+    finally:
+        utils.stream_ollama, graph.search_documents = real_stream, real_search
+    assert result["research_queries"] == ["radon limits", "radon limit germany", "radon measurement"], result
+    assert "decoy query" not in searched, searched
+    assert "radon limit germany" in seen_during_stream[-1], "retrieval did not start before the stream ended"
+    assert set(result["prefetched_documents"]) == set(result["research_queries"])
+    assert result["additional_context"].startswith("Compare ")
+
+    print("Testing that the HITL context is kept without additional queries...")
+    stream_calls = []
+
+    def counting_stream(*args, **kwargs):
+        stream_calls.append(1)
+        yield from fake_stream(*args, **kwargs)
+
+    searched.clear()
+    utils.stream_ollama, graph.search_documents = counting_stream, fake_search
+    try:
+        single = graph.generate_knowledge_base_questions_single_pass({
+            "user_query": "radon limits", "detected_language": "English", "max_search_queries": 1,
+            "report_llm": "mock", "additional_context": "User: focus on Germany",
+        }, None)
+    finally:
+        utils.stream_ollama, graph.search_documents = real_stream, real_search
+    assert stream_calls == [] and searched == ["radon limits"]
+    assert single["research_queries"] == ["radon limits"]
+    assert single["additional_context"] == "User: focus on Germany", single["additional_context"]
+
+    print("Testing a truncated stream falls back to the original query...")
+    truncated = response[:response.index("radon measurement") + 5]
+
+    def truncated_stream(model, system_prompt, user_prompt, format=None):
+        yield truncated
+
+    searched.clear()
+    utils.stream_ollama, graph.search_documents = truncated_stream, fake_search
+    try:
+        fallback = graph.generate_knowledge_base_questions_single_pass({
+            "user_query": "radon limits", "detected_language": "English", "max_search_queries": 3,
+            "report_llm": "mock", "additional_context": "User: focus on Germany",
+        }, None)
+    finally:
+        utils.stream_ollama, graph.search_documents = real_stream, real_search
+    assert fallback["research_queries"] == ["radon limits"], fallback["research_queries"]
+    assert list(fallback["prefetched_documents"]) == ["radon limits"]
+    assert fallback["additional_context"] == "User: focus on Germany"
+
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,115 @@
+import sys
+import os
+import json
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    from mock_tavily_server import start_mock_tavily_server
+    ollama_server, ollama_url = start_mock_ollama_server(default_profile=ModelProfile(load_latency=0), time_scale=0)
+    tavily_server, tavily_url = start_mock_tavily_server(delay=0)
+    os.environ["OLLAMA_HOST"] = ollama_url
+    os.environ["TAVILY_API_BASE_URL"] = tavily_url
+    os.environ.setdefault("TAVILY_API_KEY", "mock-key")
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.graph as graph
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.tracing import span, trace_run, get_default_tracer, NULL_SPAN
+    from src.web_search import search_web
+
+    conf = get_config_instance()
+    vector_db.get_embedding_model = lambda: benchmark.HashingEmbeddings()
+    conf.selected_database = benchmark.build_synthetic_kb(60)
+    conf.enable_quality_prechecks = False
+
+    print("Testing that tracing is off by default...")
+    with span("ignored") as s:
+        assert s is NULL_SPAN
+    with trace_run("off") as tracer:
+        assert tracer is None
+    assert len(get_default_tracer()) == 0
+
+    print("Testing a traced research run...")
+    trace_dir = tempfile.mkdtemp(prefix="traces_")
+    conf.enable_tracing = True
+    conf.trace_dir = trace_dir
+    state = {"user_query": "radon limits in basements", "summarization_llm": "mock", "report_llm": "mock"}
+    state.update(graph.detect_language(state, None))  # HITL phase, before the run
+    with trace_run("run-1") as tracer:
+        with span("main_graph", "graph"):
+            graph.create_main_graph().invoke({
+                **state,
+                "research_queries": ["radon limit basement", "radon measurement detector"],
+                "web_search_enabled": False,
+                "enable_quality_checker": True,
+                "reflection_count": 0,
+            })
+        try:
+            with span("failing_step"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+    spans = [s.to_dict() for s in tracer.spans()]
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+    for name in ("detect_language", "retrieve_rag_documents", "summarize_query_research", "generate_final_answer",
+                 "quality_checker", "source_linker", "invoke_ollama", "source_summarizer_ollama",
+                 "similarity_search", "embed_texts"):
+        assert name in by_name, f"no {name} span, got {sorted(by_name)}"
+    assert by_name["detect_language"][0]["category"] == "node"
+    assert len(by_name["similarity_search"]) == 2 and by_name["similarity_search"][0]["attributes"]["results"] == 3
+    llm = by_name["invoke_ollama"][0]
+    assert llm["attributes"]["input_tokens"] > 0 and llm["attributes"]["output_tokens"] > 0 and llm["attributes"]["model"] == "mock"
+    assert by_name["source_summarizer_ollama"][0]["attributes"]["output_tokens"] > 0
+    assert all(s["wall_ms"] >= 0 and s["cpu_ms"] >= 0 for s in spans)
+    assert by_name["failing_step"][0]["error"] == "ValueError: boom"
+    assert by_name["source_linker"][0]["attributes"]["embedding_cache_hits"] >= 1, "chunk embeddings from retrieval were not reused"
+
+    print("Testing span nesting across graph threads...")
+    ids = {s["span_id"]: s for s in spans}
+    retrieve = by_name["retrieve_rag_documents"][0]
+    assert all(s["parent_id"] == retrieve["span_id"] for s in by_name["similarity_search"])
+    assert ids[retrieve["parent_id"]]["name"] == "main_graph", "node span is not a child of the run span"
+    assert any(ids.get(s["parent_id"], {}).get("name") == "summarize_query_research" for s in by_name["source_summarizer_ollama"])
+
+    print("Testing the exported files...")
+    files = os.listdir(trace_dir)
+    assert len(files) == 1 and files[0].endswith("_run-1.jsonl"), files
+    with open(os.path.join(trace_dir, files[0])) as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == len(spans)
+    chrome = tracer.to_chrome_trace()
+    complete = [e for e in chrome["traceEvents"] if e["ph"] == "X"]
+    assert len(complete) == len(spans) and all(e["dur"] >= 0 and e["tid"] >= 1 for e in complete)
+    path = tracer.export(os.path.join(trace_dir, "run.trace.json"), fmt="chrome")
+    with open(path) as f:
+        assert json.load(f)["traceEvents"]
+    summary = tracer.summary()
+    assert summary["similarity_search"]["count"] == 2 and summary["failing_step"]["errors"] == 1
+
+    print("Testing web search cache hits...")
+    cache_dir = tempfile.mkdtemp(prefix="web_cache_")
+    get_default_tracer().drain()
+    for _ in range(2):
+        search_web(["radon", "radon basement"], cache_dir=cache_dir)
+    web_spans = [s.attributes for s in get_default_tracer().drain() if s.name == "search_web"]
+    assert web_spans[0]["cache_hits"] == 0 and web_spans[0]["cache_misses"] == 2, web_spans
+    assert web_spans[1]["cache_hits"] == 2, web_spans
+
+    conf.enable_tracing = False
+    ollama_server.shutdown()
+    tavily_server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,94 @@
+import sys
+import os
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+try:
+    from mock_ollama_server import start_mock_ollama_server, ModelProfile
+    ollama_server, ollama_url = start_mock_ollama_server(default_profile=ModelProfile(load_latency=1.0), time_scale=1)
+    os.environ["OLLAMA_HOST"] = ollama_url
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    import benchmark
+    import src.vector_db as vector_db
+    from src.configuration import get_config_instance
+    from src.warmup import ResourceWarmer, get_compiled_graphs
+    from src.utils import invoke_ollama_with_metrics
+    from src.llm_metrics import metrics_run
+    from src.perf_metrics import get_performance_store
+    from src.cassette import use_cassette
+
+    constructed = []
+
+    class StandInEmbeddings(benchmark.HashingEmbeddings):
+        def __init__(self, model_name, model_kwargs=None):
+            if model_name == "broken-model":
+                raise RuntimeError("model files not found")
+            constructed.append(model_name)
+            super().__init__()
+
+    vector_db.huggingface_embeddings_class = lambda: StandInEmbeddings
+    conf = get_config_instance()
+    conf.embedding_model = "stand-in-model"
+    conf.selected_database = benchmark.build_synthetic_kb(60)
+
+    print("Testing that compiled graphs are shared...")
+    graphs = get_compiled_graphs()
+    assert graphs is get_compiled_graphs() and set(graphs) == {"hitl", "main"}
+    checkpoint_db = os.path.join(tempfile.mkdtemp(prefix="warmup_"), "checkpoints.sqlite")
+    persisted = get_compiled_graphs(checkpoint_db, checkpointing=True)
+    assert persisted["main"] is not graphs["main"] and persisted["main"].checkpointer is not None
+    assert graphs["main"].checkpointer is None
+
+    print("Testing a warm-up...")
+    warmer = ResourceWarmer(conf.selected_database, "stand-in-model", ["warm-model", "warm-model", None],
+                            keep_alive="10m").start()
+    assert warmer.wait(60), warmer.status()
+    assert warmer.ready, warmer.status()
+    steps = {step["step"]: step for step in warmer.status()}
+    assert list(steps) == ["graphs", "embedding_model", "vector_index", "ollama:warm-model"], list(steps)
+    assert all(step["state"] == "ready" and step["ms"] is not None for step in steps.values()), steps
+    assert steps["ollama:warm-model"]["detail"].startswith("loaded in"), steps["ollama:warm-model"]
+    assert constructed == ["stand-in-model"]
+
+    print("Testing that the first run finds everything loaded...")
+    result = invoke_ollama_with_metrics("warm-model", "system", "first question")
+    assert not result.metrics.reloaded, result.metrics
+    with metrics_run("after-warmup"):
+        docs = vector_db.search_documents("radon limit basement", k=3)
+        vector_db.search_documents("radon measurement detector", k=3)
+    assert len(docs) == 3
+    assert constructed == ["stand-in-model"], "the embedding model was loaded again"
+    caches = get_performance_store().run_report("after-warmup")["caches"]
+    assert caches["vectorstore"]["hits"] == 2 and caches["vectorstore"]["misses"] == 0, caches
+
+    print("Testing failed and skipped steps...")
+    broken = ResourceWarmer(conf.selected_database, "broken-model", []).start()
+    assert broken.wait(60) and not broken.ready
+    steps = {step["step"]: step for step in broken.status()}
+    assert steps["embedding_model"]["state"] == "failed" and "model files" in steps["embedding_model"]["detail"]
+    assert steps["vector_index"]["state"] == "skipped" and steps["graphs"]["state"] == "ready"
+    missing = ResourceWarmer("no-such-database", "stand-in-model", []).start()
+    assert missing.wait(60) and missing.ready
+    assert {s["step"]: s["state"] for s in missing.status()}["vector_index"] == "skipped"
+
+    cassette_path = os.path.join(tempfile.mkdtemp(prefix="warmup_"), "warmup.cassette.gz")
+    with use_cassette(cassette_path, "record"):
+        invoke_ollama_with_metrics("warm-model", "system", "recorded question")
+    with use_cassette(cassette_path, "replay"):
+        replayed = ResourceWarmer(conf.selected_database, "stand-in-model", ["warm-model"]).start()
+        assert replayed.wait(60) and replayed.ready
+    states = {s["step"]: s["state"] for s in replayed.status()}
+    assert states == {"graphs": "ready", "embedding_model": "skipped", "vector_index": "skipped",
+                      "ollama:warm-model": "skipped"}, states
+
+    ollama_server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
@@ -0,0 +1,91 @@
+import sys
+import os
+import time
+import tempfile
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+DELAY = 0.5
+QUERIES = ["radon limits", "radon measurement", "radon remediation", "radon health effects"]
+
+try:
+    from mock_tavily_server import start_mock_tavily_server
+    server, url = start_mock_tavily_server(delay=DELAY)
+    os.environ["TAVILY_API_BASE_URL"] = url
+    os.environ.setdefault("TAVILY_API_KEY", "mock-key")
+    cache_dir = tempfile.mkdtemp(prefix="web_search_cache_")
+
+    from src.web_search import search_web, canonicalize_url, trim_to_token_budget, format_web_results, WebSearchCache
+    from src.utils import estimate_tokens
+
+    print("Testing canonicalize_url...")
+    assert canonicalize_url("http://www.Example.org/a/?utm_source=x&b=2&a=1#frag") == "https://example.org/a?a=1&b=2"
+    assert canonicalize_url("https://example.org/a") == canonicalize_url("https://example.org/a/?fbclid=123")
+    assert canonicalize_url("https://example.org/a?page=2") != canonicalize_url("https://example.org/a?page=3")
+
+    print("Testing trim_to_token_budget...")
+    text = "Sentence number one. " * 200
+    trimmed = trim_to_token_budget(text, 50)
+    assert estimate_tokens(trimmed) <= 51, f"trimmed text too long: {estimate_tokens(trimmed)} tokens"
+    assert trim_to_token_budget("short", 50) == "short"
+
+    print("Testing concurrent multi-query search...")
+    start = time.perf_counter()
+    results = search_web(QUERIES, max_results=3, raw_content_tokens=100, max_concurrency=4,
+                         cache_ttl=3600, cache_dir=cache_dir)
+    elapsed = time.perf_counter() - start
+    print(f"  {len(results)} results in {elapsed:.2f}s (sequential would be >= {len(QUERIES) * DELAY:.2f}s)")
+    assert server.stats["requests"] == len(QUERIES), f"expected {len(QUERIES)} requests, got {server.stats['requests']}"
+    assert server.stats["max_in_flight"] > 1, "queries were not searched concurrently"
+    assert elapsed < len(QUERIES) * DELAY * 0.75, "multi-query search was not concurrent"
+
+    print("Testing URL dedup...")
+    shared = [r for r in results if "shared" in r["url"]]
+    assert len(shared) == 1, f"shared page not deduplicated: {len(shared)} copies"
+    assert shared[0]["queries"] == QUERIES, f"shared page queries: {shared[0]['queries']}"
+    assert len(results) == len(QUERIES) * 3 + 1
+
+    print("Testing raw content budget...")
+    assert all(estimate_tokens(r["raw_content"]) <= 101 for r in results), "raw content exceeds the token budget"
+    formatted = format_web_results(results)
+    assert "Mock snippet" in formatted and "Excerpt:" in formatted
+
+    print("Testing on-disk cache...")
+    start = time.perf_counter()
+    cached = search_web(QUERIES, max_results=3, raw_content_tokens=100, cache_ttl=3600, cache_dir=cache_dir)
+    assert server.stats["requests"] == len(QUERIES), "cached queries were searched again"
+    assert len(cached) == len(results)
+    assert time.perf_counter() - start < DELAY, "cached search was not served from disk"
+    # Different parameters are a different cache entry; cache files are read and written off the event loop
+    cache_threads = []
+    real_get, real_set = WebSearchCache.get, WebSearchCache.set
+    WebSearchCache.get = lambda self, key: cache_threads.append(threading.current_thread().name) or real_get(self, key)
+    WebSearchCache.set = lambda self, key, response: cache_threads.append(threading.current_thread().name) or \
+        real_set(self, key, response)
+    try:
+        search_web(QUERIES[:1], max_results=5, cache_ttl=3600, cache_dir=cache_dir)
+    finally:
+        WebSearchCache.get, WebSearchCache.set = real_get, real_set
+    assert server.stats["requests"] == len(QUERIES) + 1
+    assert len(cache_threads) == 2 and "web-search-loop" not in cache_threads, cache_threads
+
+    print("Testing cache expiry...")
+    time.sleep(1.1)
+    search_web(QUERIES[:1], max_results=3, raw_content_tokens=100, cache_ttl=1, cache_dir=cache_dir)
+    assert server.stats["requests"] == len(QUERIES) + 2, "expired cache entry was used"
+
+    print("Testing tavily_search over the shared client...")
+    from src.utils import tavily_search
+    response = tavily_search("uncached query", max_results=2)
+    assert len(response["results"]) == 3  # 2 + shared page
+
+    server.shutdown()
+    print("ALL TESTS PASSED")
+except Exception as e:
+    print(f"TEST FAILED: {e}")
+    import traceback
+    traceback.print_exc()
+    sys.exit(1)
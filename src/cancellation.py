@@ -0,0 +1,214 @@
+import socket
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import wait, FIRST_COMPLETED
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+from src.logger import get_logger
+
+log = get_logger("cancellation")
+
+# How often blocking waits re-check the token (seconds)
+POLL_INTERVAL = 0.1
+
+
+class ResearchCancelled(BaseException):
+    """
+    Raised when a research run is cancelled. Derives from BaseException (like
+    asyncio.CancelledError) so the `except Exception` fallbacks in the nodes do not
+    swallow it. `partial` holds the state update a node had completed when cancelled.
+    """
+
+    def __init__(self, reason: str = "Research cancelled", partial: Optional[Dict[str, Any]] = None):
+        super().__init__(reason)
+        self.partial = partial or {}
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation flag shared by all work of one research run.
+
+    Long-running calls check `raise_if_cancelled()` between steps and register abort
+    callbacks (e.g. closing an HTTP connection) with `on_cancel`, which run immediately
+    when `cancel()` is called.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_handle = 0
+        self._lock = threading.Lock()
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Research cancelled") -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                log.warning("Cancellation callback failed", error=str(e))
+
+    def raise_if_cancelled(self, partial: Optional[Dict[str, Any]] = None) -> None:
+        if self._event.is_set():
+            raise ResearchCancelled(self.reason or "Research cancelled", partial)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or timeout; returns True if cancelled."""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback: Callable[[], None]) -> int:
+        """Register an abort callback; runs right away if already cancelled. Returns a handle."""
+        with self._lock:
+            if not self._event.is_set():
+                handle = self._next_handle
+                self._next_handle += 1
+                self._callbacks[handle] = callback
+                return handle
+        callback()
+        return -1
+
+    def remove_callback(self, handle: int) -> None:
+        with self._lock:
+            self._callbacks.pop(handle, None)
+
+
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "cancellation_token", default=None
+)
+
+
+def get_cancellation_token(config: Optional[Dict[str, Any]] = None) -> Optional[CancellationToken]:
+    """Token of the current run: from the RunnableConfig if given, else from the active scope."""
+    if config:
+        token = (config.get("configurable") or {}).get("cancellation_token")
+        if token is not None:
+            return token
+    return _current_token.get()
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]):
+    """Make `token` the current token for helpers that are not passed a config (invoke_ollama, ...)."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def check_cancelled(partial: Optional[Dict[str, Any]] = None) -> None:
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled(partial)
+
+
+def cancellable_node(node: Callable) -> Callable:
+    """Graph node wrapper: runs the node in the scope of the run's token and skips it if already cancelled."""
+    @wraps(node)
+    def wrapper(state, config=None):
+        token = get_cancellation_token(config)
+        if token is None:
+            return node(state, config)
+        with cancellation_scope(token):
+            token.raise_if_cancelled()
+            return node(state, config)
+    return wrapper
+
+
+def submit_in_scope(executor, fn: Callable, *args, **kwargs):
+    """executor.submit that carries the current cancellation scope into the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def wait_for_futures(futures, token: Optional[CancellationToken] = None) -> None:
+    """
+    Wait for all futures; on cancellation cancel the ones not started yet and raise.
+    Running ones abort through their own token checks.
+    """
+    token = token or _current_token.get()
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=POLL_INTERVAL if token else None, return_when=FIRST_COMPLETED)
+        if token is not None and token.cancelled:
+            for future in pending:
+                future.cancel()
+            token.raise_if_cancelled()
+
+
+def run_cancellable(fn: Callable, *args, **kwargs):
+    """
+    Run a blocking call in a helper thread and return its result, or raise
+    ResearchCancelled as soon as the current token is cancelled (the call itself
+    is expected to stop at its next token check).
+    """
+    token = _current_token.get()
+    if token is None:
+        return fn(*args, **kwargs)
+    result: Dict[str, Any] = {}
+    done = threading.Event()
+    context = contextvars.copy_context()
+
+    def target():
+        try:
+            result["value"] = context.run(fn, *args, **kwargs)
+        except BaseException as e:
+            result["error"] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=target, name="cancellable-call", daemon=True).start()
+    while not done.wait(POLL_INTERVAL):
+        token.raise_if_cancelled()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+class ConnectionAborter:
+    """
+    Collects the sockets an httpx client opens (via the httpcore trace extension) so an
+    in-flight request can be aborted from another thread, even while waiting for the
+    first byte of the response. Closing the httpx client alone does not interrupt a
+    blocked read.
+    """
+
+    def __init__(self):
+        self._sockets = []
+        self._aborted = False
+        self._lock = threading.Lock()
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete" and info.get("return_value") is not None:
+            sock = info["return_value"].get_extra_info("socket")
+            if sock is not None:
+                with self._lock:
+                    self._sockets.append(sock)
+                    aborted = self._aborted
+                if aborted:
+                    # Connected after abort() ran
+                    self.abort()
+
+    def request_hook(self, request) -> None:
+        """httpx event hook ("request") that enables the socket trace."""
+        request.extensions["trace"] = self._trace
+
+    def abort(self) -> None:
+        with self._lock:
+            self._aborted = True
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
@@ -0,0 +1,280 @@
+import os
+import gzip
+import json
+import time
+import base64
+import atexit
+import asyncio
+import hashlib
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+CASSETTE_VERSION = 1
+MODES = ("off", "record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """A replayed run made a request that is not on the cassette."""
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    payload = json.dumps([kind, request], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def encode_vectors(vectors) -> Dict[str, Any]:
+    """Embeddings as base64 float32 (about a third of the size of JSON floats)."""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    return {"shape": list(matrix.shape), "b64": base64.b64encode(matrix.tobytes()).decode("ascii")}
+
+
+def decode_vectors(data: Dict[str, Any]) -> List[Any]:
+    matrix = np.frombuffer(base64.b64decode(data["b64"]), dtype=np.float32).reshape(data["shape"])
+    return matrix.tolist()
+
+
+class Cassette:
+    """
+    Recorded LLM, embedding and web search traffic of research runs.
+
+    The file is gzipped JSON lines: a header, then one entry per request with the request
+    key (a hash of kind and request), a short description, the response and the latency.
+    Identical requests are replayed in the order they were recorded; the last recording
+    is repeated once they are used up.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", replay_latency: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.entries: List[Dict[str, Any]] = []
+        self.stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        self._by_key: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if mode == "replay" or os.path.exists(path):
+            self.load()
+
+    def load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        if not lines or lines[0].get("version") != CASSETTE_VERSION:
+            raise ValueError(f"{self.path} is not a version {CASSETTE_VERSION} cassette")
+        for entry in lines[1:]:
+            self._add(entry)
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        self.entries.append(entry)
+        self._by_key.setdefault(entry["key"], []).append(entry)
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self.entries)
+            self._dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                "entries": len(entries)}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def record(self, kind: str, key: str, describe: Dict[str, Any], response: Any, latency_ms: float) -> None:
+        with self._lock:
+            self._add({"kind": kind, "key": key, "request": describe, "response": response,
+                       "latency_ms": round(latency_ms, 3)})
+            self.stats["recorded"] += 1
+            self._dirty = True
+
+    def lookup(self, kind: str, key: str, describe: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            recorded = self._by_key.get(key)
+            if not recorded:
+                self.stats["misses"] += 1
+                raise CassetteMiss(f"No recorded {kind} response on {os.path.basename(self.path)} for {describe}")
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            self.stats["replayed"] += 1
+            return recorded[min(served, len(recorded) - 1)]
+
+    def delay(self, entry: Dict[str, Any]) -> float:
+        return entry["latency_ms"] / 1000 * self.replay_latency
+
+    def summary(self) -> Dict[str, Any]:
+        kinds: Dict[str, int] = {}
+        for entry in self.entries:
+            kinds[entry["kind"]] = kinds.get(entry["kind"], 0) + 1
+        return {"path": self.path, "mode": self.mode, "entries": len(self.entries), "kinds": kinds, **self.stats}
+
+
+_active: Optional[Cassette] = None
+_configured: Optional[Cassette] = None
+_active_lock = threading.Lock()
+
+
+def _cassette_settings():
+    """Mode, path and latency scale from RESEARCH_CASSETTE_MODE/RESEARCH_CASSETTE or the configuration."""
+    from src.configuration import get_config_instance
+    conf = get_config_instance()
+    mode = (os.environ.get("RESEARCH_CASSETTE_MODE") or conf.cassette_mode or "off").lower()
+    path = os.environ.get("RESEARCH_CASSETTE") or conf.cassette_path
+    if mode not in MODES:
+        raise ValueError(f"Unknown cassette mode: {mode} (expected one of {', '.join(MODES)})")
+    return mode, path, float(conf.cassette_replay_latency or 0)
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The cassette requests go through: the one of use_cassette(), else the configured one (None if off)."""
+    global _configured
+    if _active is not None:
+        return _active
+    mode, path, replay_latency = _cassette_settings()
+    if mode == "off":
+        return None
+    if not path:
+        raise ValueError(f"Cassette mode '{mode}' needs a cassette path (cassette_path or RESEARCH_CASSETTE)")
+    with _active_lock:
+        if _configured is None or (_configured.path, _configured.mode) != (path, mode):
+            if _configured is not None:
+                _configured.save()
+            _configured = Cassette(path, mode, replay_latency)
+            if mode == "record":
+                atexit.register(_configured.save)
+        _configured.replay_latency = replay_latency
+        return _configured
+
+
+def is_replaying() -> bool:
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == "replay"
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", replay_latency: float = 0.0):
+    """Record or replay all LLM, embedding and web search requests of the block (all threads)."""
+    global _active
+    cassette = Cassette(path, mode, replay_latency)
+    with _active_lock:
+        previous, _active = _active, cassette
+    try:
+        yield cassette
+    finally:
+        with _active_lock:
+            _active = previous
+        if mode == "record":
+            cassette.save()
+
+
+def _wait(seconds: float) -> None:
+    if seconds <= 0:
+        return
+    from src.cancellation import get_cancellation_token
+    token = get_cancellation_token()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.wait(seconds)
+        token.raise_if_cancelled()
+
+
+def through_cassette(kind: str, request: Dict[str, Any], call: Callable[[], Any],
+                     describe: Optional[Dict[str, Any]] = None,
+                     encode: Callable[[Any], Any] = None, decode: Callable[[Any], Any] = None) -> Any:
+    """
+    Run `call()` through the active cassette: recorded in record mode, served from the
+    cassette (after the recorded latency times replay_latency) in replay mode.
+    `request` identifies the call; `describe` is the short form stored on the cassette.
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return call()
+    key = request_key(kind, request)
+    describe = describe or {}
+    if cassette.mode == "replay":
+        entry = cassette.lookup(kind, key, describe)
+        _wait(cassette.delay(entry))
+        return decode(entry["response"]) if decode else entry["response"]
+    start = time.perf_counter()
+    result = call()
+    cassette.record(kind, key, describe, encode(result) if encode else result, (time.perf_counter() - start) * 1000)
+    return result
+
+
+async def through_cassette_async(kind: str, request: Dict[str, Any], call: Callable[[], Any],
+                                 describe: Optional[Dict[str, Any]] = None) -> Any:
+    """Async variant of through_cassette for coroutine calls (`call` returns an awaitable)."""
+    cassette = get_cassette()
+    if cassette is None:
+        return await call()
+    key = request_key(kind, request)
+    describe = describe or {}
+    if cassette.mode == "replay":
+        entry = cassette.lookup(kind, key, describe)
+        await asyncio.sleep(cassette.delay(entry))
+        return entry["response"]
+    start = time.perf_counter()
+    result = await call()
+    cassette.record(kind, key, describe, result, (time.perf_counter() - start) * 1000)
+    return result
+
+
+class CassetteEmbeddings(Embeddings):
+    """
+    Embeddings whose requests go through the active cassette. The wrapped model is only
+    created on first use, so a replayed run never loads it.
+    """
+
+    def __init__(self, model_name: str, factory: Callable[[], Embeddings]):
+        self.model_name = model_name
+        self._factory = factory
+        self._model: Optional[Embeddings] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self) -> Embeddings:
+        with self._lock:
+            if self._model is None:
+                self._model = self._factory()
+            return self._model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = list(texts)
+        return through_cassette(
+            "embedding", {"model": self.model_name, "texts": texts}, lambda: self.model.embed_documents(texts),
+            describe={"model": self.model_name, "texts": len(texts)}, encode=encode_vectors, decode=decode_vectors
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        return through_cassette(
+            "embedding", {"model": self.model_name, "query": text}, lambda: [self.model.embed_query(text)],
+            describe={"model": self.model_name, "query": text[:80]}, encode=encode_vectors, decode=decode_vectors
+        )[0]
+
+
+# One wrapper per cassette and model name, so callers that cache by embeddings instance
+# (e.g. src.vector_db.open_vectorstore) get the same object on every call
+_wrappers: "weakref.WeakKeyDictionary[Cassette, Dict[str, CassetteEmbeddings]]" = weakref.WeakKeyDictionary()
+_wrappers_lock = threading.Lock()
+
+
+def wrap_embeddings(model_name: str, factory: Callable[[], Embeddings]) -> Embeddings:
+    """The model from `factory`, behind the cassette when recording or replaying."""
+    cassette = get_cassette()
+    if cassette is None:
+        return factory()
+    with _wrappers_lock:
+        wrappers = _wrappers.setdefault(cassette, {})
+        if model_name not in wrappers:
+            wrappers[model_name] = CassetteEmbeddings(model_name, factory)
+        return wrappers[model_name]
@@ -0,0 +1,292 @@
+import os
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.configuration import get_config_instance
+from src.document_store import get_document_id, get_document_store, is_document_ref
+from src.logger import get_logger
+
+log = get_logger("checkpointing")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CHECKPOINT_DB = os.path.join(PROJECT_ROOT, '.cache', 'research_checkpoints.sqlite')
+
+DOC_REF_KEY = "__doc_ref__"
+DOCUMENT_CACHE_SIZE = 5000
+
+
+def _collect_documents(obj: Any, found: Dict[str, Optional[Document]]) -> None:
+    """Collect Documents and document store references (as id -> None) contained in obj."""
+    if isinstance(obj, Document):
+        found[get_document_id(obj)] = obj
+    elif is_document_ref(obj):
+        found.setdefault(obj["doc_id"], None)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _collect_documents(value, found)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _collect_documents(value, found)
+
+
+def _replace_documents(obj: Any) -> Any:
+    if isinstance(obj, Document):
+        return {DOC_REF_KEY: get_document_id(obj)}
+    if isinstance(obj, dict):
+        return {k: _replace_documents(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_replace_documents(v) for v in obj]
+    if isinstance(obj, tuple):
+        return tuple(_replace_documents(v) for v in obj)
+    return obj
+
+
+class DocumentRefSerializer(JsonPlusSerializer):
+    """
+    Checkpoint serializer that stores `Document` objects by reference.
+
+    Every Document inside a checkpoint or pending write is replaced by {"__doc_ref__": id}.
+    The documents themselves are stored once in the `checkpoint_documents` table by
+    `CompactSqliteSaver`, so documents that every checkpoint of a run carries are not
+    duplicated per checkpoint. (Research state normally holds document store references
+    already; their documents are persisted in the same table.)
+    """
+
+    def __init__(self, saver: "CompactSqliteSaver"):
+        super().__init__()
+        self.saver = saver
+        self._cache: "OrderedDict[str, Document]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        return super().dumps_typed(_replace_documents(obj))
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        return self._resolve(super().loads_typed(data))
+
+    def _resolve(self, obj: Any) -> Any:
+        if isinstance(obj, dict):
+            if len(obj) == 1 and DOC_REF_KEY in obj:
+                return self._load_document(obj[DOC_REF_KEY])
+            return {k: self._resolve(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self._resolve(v) for v in obj]
+        if isinstance(obj, tuple):
+            return tuple(self._resolve(v) for v in obj)
+        return obj
+
+    def _load_document(self, doc_id: str) -> Document:
+        with self._cache_lock:
+            doc = self._cache.get(doc_id)
+            if doc is not None:
+                self._cache.move_to_end(doc_id)
+                return doc
+        # Called from within the saver's locked cursor, so the connection is used directly
+        row = self.saver.conn.execute(
+            "SELECT content, metadata FROM checkpoint_documents WHERE id = ?", (doc_id,)
+        ).fetchone()
+        if row is None:
+            log.warning("Checkpoint document is missing", doc_id=doc_id)
+            return Document(page_content="", metadata={"missing_document": doc_id})
+        doc = Document(page_content=row[0], metadata=json.loads(row[1]))
+        self.remember(doc_id, doc)
+        return doc
+
+    def is_known(self, doc_id: str) -> bool:
+        with self._cache_lock:
+            return doc_id in self._cache
+
+    def remember(self, doc_id: str, doc: Document) -> None:
+        with self._cache_lock:
+            self._cache[doc_id] = doc
+            self._cache.move_to_end(doc_id)
+            while len(self._cache) > DOCUMENT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def forget(self, doc_ids: Sequence[str]) -> None:
+        with self._cache_lock:
+            for doc_id in doc_ids:
+                self._cache.pop(doc_id, None)
+
+
+class CompactSqliteSaver(SqliteSaver):
+    """
+    SqliteSaver that stores documents once per content address (see DocumentRefSerializer).
+    It also persists the document store entries referenced by checkpoints and serves as
+    fallback loader of the document store, so a run can be resumed in a new process.
+    The sessions referencing each document are recorded, so prune_sessions() can delete
+    the documents of old sessions together with their checkpoints.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        super().__init__(conn)
+        self.serde = DocumentRefSerializer(self)
+        self._linked: Dict[str, set] = {}
+        get_document_store().add_loader(self.load_documents)
+
+    def load_documents(self, doc_ids: List[str]) -> Dict[str, Document]:
+        """Persisted documents by id (document store loader)."""
+        found = {}
+        with self.cursor(transaction=False) as cur:
+            for start in range(0, len(doc_ids), 500):
+                batch = doc_ids[start:start + 500]
+                rows = cur.execute(
+                    f"SELECT id, content, metadata FROM checkpoint_documents WHERE id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for doc_id, content, metadata in rows:
+                    found[doc_id] = Document(page_content=content, metadata=json.loads(metadata))
+        return found
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_documents (id TEXT PRIMARY KEY, content TEXT, metadata TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_document_sessions "
+            "(thread_id TEXT, doc_id TEXT, PRIMARY KEY (thread_id, doc_id))"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS checkpoint_document_sessions_doc ON checkpoint_document_sessions (doc_id)"
+        )
+        self.conn.commit()
+
+    def _store_documents(self, obj: Any, config: Dict[str, Any]) -> None:
+        """Persist the documents of obj before the checkpoint that references them."""
+        found: Dict[str, Optional[Document]] = {}
+        _collect_documents(obj, found)
+        thread_id = str(config["configurable"]["thread_id"])
+        linked = self._linked.setdefault(thread_id, set())
+        unlinked = [doc_id for doc_id in found if doc_id not in linked]
+        if unlinked:
+            with self.cursor() as cur:
+                cur.executemany(
+                    "INSERT OR IGNORE INTO checkpoint_document_sessions (thread_id, doc_id) VALUES (?, ?)",
+                    [(thread_id, doc_id) for doc_id in unlinked]
+                )
+            linked.update(unlinked)
+        new = {doc_id: doc for doc_id, doc in found.items() if not self.serde.is_known(doc_id)}
+        referenced = [doc_id for doc_id, doc in new.items() if doc is None]
+        if referenced:
+            new.update(get_document_store().get_many(referenced))
+            new = {doc_id: doc for doc_id, doc in new.items() if doc is not None}
+        if not new:
+            return
+        with self.cursor() as cur:
+            cur.executemany(
+                "INSERT OR IGNORE INTO checkpoint_documents (id, content, metadata) VALUES (?, ?, ?)",
+                [(doc_id, doc.page_content, json.dumps(doc.metadata, default=str)) for doc_id, doc in new.items()]
+            )
+        for doc_id, doc in new.items():
+            self.serde.remember(doc_id, doc)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._store_documents(checkpoint, config)
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        self._store_documents([value for _, value in writes], config)
+        return super().put_writes(config, writes, task_id, task_path)
+
+    def prune_sessions(self, keep: int) -> int:
+        """
+        Delete all but the `keep` most recent sessions, with the documents no other session uses.
+
+        Returns:
+            Number of deleted sessions
+        """
+        with self.cursor(transaction=False) as cur:
+            old = [row[0] for row in cur.execute(
+                "SELECT thread_id FROM checkpoints GROUP BY thread_id ORDER BY MAX(checkpoint_id) DESC "
+                "LIMIT -1 OFFSET ?", (keep,)
+            ).fetchall()]
+        for thread_id in old:
+            self.delete_thread(thread_id)
+            with self.cursor() as cur:
+                doc_ids = [row[0] for row in cur.execute(
+                    "SELECT doc_id FROM checkpoint_document_sessions WHERE thread_id = ?", (thread_id,)
+                ).fetchall()]
+                cur.execute("DELETE FROM checkpoint_document_sessions WHERE thread_id = ?", (thread_id,))
+                cur.executemany(
+                    "DELETE FROM checkpoint_documents WHERE id = ? AND NOT EXISTS "
+                    "(SELECT 1 FROM checkpoint_document_sessions WHERE doc_id = ?)",
+                    [(doc_id, doc_id) for doc_id in doc_ids]
+                )
+            self._linked.pop(thread_id, None)
+            self.serde.forget(doc_ids)
+        if old:
+            log.info("Pruned old research sessions", deleted=len(old), kept=keep)
+        return len(old)
+
+
+_savers: Dict[str, CompactSqliteSaver] = {}
+_savers_lock = threading.Lock()
+
+
+def get_checkpointer(db_path: Optional[str] = None, max_sessions: Optional[int] = None) -> CompactSqliteSaver:
+    """
+    Get the (process-wide cached) checkpointer for the given SQLite file.
+
+    When the file is opened, sessions beyond the `max_sessions` most recent ones are deleted
+    (default: Configuration.checkpoint_max_sessions; 0 keeps all sessions).
+    """
+    db_path = os.path.abspath(db_path or os.environ.get("RESEARCH_CHECKPOINT_DB") or DEFAULT_CHECKPOINT_DB)
+    with _savers_lock:
+        saver = _savers.get(db_path)
+        if saver is None:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            saver = CompactSqliteSaver(sqlite3.connect(db_path, check_same_thread=False))
+            saver.setup()
+            if max_sessions is None:
+                max_sessions = get_config_instance().checkpoint_max_sessions
+            if max_sessions > 0:
+                saver.prune_sessions(max_sessions)
+            _savers[db_path] = saver
+    return saver
+
+
+def get_session_config(session_id: str) -> Dict[str, Any]:
+    """RunnableConfig of a research session (the session id is the LangGraph thread id)."""
+    return {"configurable": {"thread_id": session_id}}
+
+
+def list_research_sessions(graph, limit: int = 10, resumable_only: bool = True) -> List[Dict[str, Any]]:
+    """
+    Most recent research sessions stored by the graph's checkpointer.
+
+    Returns:
+        List of {"session_id", "user_query", "next", "updated"}; with `resumable_only` only
+        sessions that stopped before reaching END (failed or interrupted runs).
+    """
+    saver = graph.checkpointer
+    with saver.cursor(transaction=False) as cur:
+        rows = cur.execute(
+            "SELECT thread_id, MAX(checkpoint_id) AS latest FROM checkpoints WHERE checkpoint_ns = '' "
+            "GROUP BY thread_id ORDER BY latest DESC LIMIT ?",
+            (limit * 3 if resumable_only else limit,)
+        ).fetchall()
+
+    sessions = []
+    for thread_id, _ in rows:
+        snapshot = graph.get_state(get_session_config(thread_id))
+        if resumable_only and not snapshot.next:
+            continue
+        sessions.append({
+            "session_id": thread_id,
+            "user_query": snapshot.values.get("user_query", ""),
+            "next": list(snapshot.next),
+            "updated": snapshot.created_at,
+        })
+        if len(sessions) >= limit:
+            break
+    return sessions
@@ -27,6 +27,47 @@ class Configuration:
     enable_web_search: bool = False
     enable_quality_checker: bool = True
     quality_check_loops: int = 1
+    enable_fused_hitl_turn: bool = True
+    conversation_memory_max_tokens: int = 1500
+    conversation_memory_keep_turns: int = 4
+    kb_question_mode: str = "two_pass"  # "two_pass" or "single_pass"
+    enable_query_dedup: bool = True
+    query_dedup_threshold: float = 0.9
+    enable_context_compression: bool = False
+    context_compression_token_budget: int = 800
+    report_mode: str = "single_pass"  # "single_pass" or "sectioned"
+    report_max_parallel_sections: int = 2
+    report_section_min_summaries: int = 2
+    report_section_routing_threshold: float = 0.35
+    reflection_mode: str = "full"  # "full" (regenerate report) or "incremental" (repair failing sections)
+    enable_quality_prechecks: bool = True
+    precheck_grounding_threshold: float = 0.6
+    precheck_pass_share: float = 0.8
+    precheck_fail_share: float = 0.4
+    source_link_threshold: float = 0.6
+    web_search_max_results: int = 3
+    web_search_max_concurrency: int = 4
+    web_search_cache_ttl: int = 86400  # seconds, 0 disables the on-disk cache
+    web_search_raw_content_tokens: int = 500
+    enable_checkpointing: bool = True
+    checkpoint_db_path: str = None  # None: .cache/research_checkpoints.sqlite
+    checkpoint_max_sessions: int = 20  # older sessions are deleted when the database is opened, 0 = keep all
+    enable_tracing: bool = False
+    trace_dir: str = None  # None: RESEARCH_TRACE_DIR or .cache/traces
+    trace_format: str = "jsonl"  # "jsonl" or "chrome" (chrome://tracing, Perfetto)
+    enable_profiling: bool = False  # RESEARCH_PROFILE=1 or =<targets> enables it as well
+    profile_targets: str = "get_embedding_model,generate_final_answer_prompt"  # node/function names, "*" = all nodes
+    profile_dir: str = None  # None: RESEARCH_PROFILE_DIR or .cache/profiles
+    cassette_mode: str = "off"  # "off", "record" or "replay" (RESEARCH_CASSETTE_MODE)
+    cassette_path: str = None  # gzipped cassette file (RESEARCH_CASSETTE)
+    cassette_replay_latency: float = 0.0  # 0: replay instantly, 1: recorded latencies
+    log_level: str = "info"  # "debug", "info", "warning", "error" or "off" (RESEARCH_LOG_LEVEL)
+    log_console_level: str = None  # None: same as log_level
+    log_file: str = None  # None: RESEARCH_LOG_FILE or .cache/logs/research.jsonl, "-": console only
+    log_max_bytes: int = 5 * 1024 * 1024  # rotate the log file at this size
+    log_backups: int = 3  # rotated files kept
+    enable_warmup: bool = True  # app: compile graphs, load the embedding model, index and LLM at startup
+    warmup_keep_alive: str = "30m"  # how long Ollama keeps the warmed-up models loaded
     llm_model: str = "gpt-oss:20b"
     embedding_model: str = "jinaai/jina-embeddings-v2-base-de"
     selected_database: str = None
@@ -0,0 +1,89 @@
+from typing import List
+import numpy as np
+from langchain_core.documents import Document
+
+from src.utils import split_sentences, estimate_tokens
+from src.similarity import embed_texts, normalize_rows
+
+
+def compress_documents(query: str, documents: List[Document], token_budget: int = 800,
+                       embeddings=None) -> List[Document]:
+    """
+    Extractive compression of retrieved chunks before summarization.
+
+    All chunks are split into sentences, the sentences are embedded in one batch and
+    scored against the query with a single matrix-vector cosine. The best sentences are
+    kept until `token_budget` is used up and re-assembled per source document in their
+    original order, so every kept sentence stays attributed to its source metadata.
+
+    Args:
+        query: The research query the documents were retrieved for.
+        documents: Retrieved chunks.
+        token_budget: Approximate token budget for all kept sentences together.
+        embeddings: Optional LangChain embeddings instance, defaults to the configured model.
+
+    Returns:
+        Compressed Documents (documents without any kept sentence are dropped).
+    """
+    if not documents:
+        return []
+
+    if embeddings is None:
+        from src.vector_db import get_embedding_model
+        embeddings = get_embedding_model()
+
+    # (document index, sentence text)
+    sentences = []
+    for doc_idx, doc in enumerate(documents):
+        for sentence in split_sentences(doc.page_content):
+            sentences.append((doc_idx, sentence))
+
+    if not sentences:
+        return list(documents)
+
+    total_tokens = sum(estimate_tokens(text) for _, text in sentences)
+    if total_tokens <= token_budget:
+        return list(documents)
+
+    sentence_vectors = embed_texts([text for _, text in sentences], embeddings=embeddings)
+    query_vector = normalize_rows(embeddings.embed_query(query))[0]
+    scores = sentence_vectors @ query_vector
+
+    selected = set()
+    seen_texts = set()
+    used = 0
+    for idx in np.argsort(-scores):
+        text = sentences[idx][1]
+        cost = estimate_tokens(text)
+        # Overlapping chunks often repeat sentences verbatim
+        if text in seen_texts or used + cost > token_budget:
+            continue
+        selected.add(int(idx))
+        seen_texts.add(text)
+        used += cost
+        if used >= token_budget:
+            break
+
+    compressed = []
+    for doc_idx, doc in enumerate(documents):
+        kept = []
+        previous = None
+        for sent_idx, (owner, text) in enumerate(sentences):
+            if owner != doc_idx or sent_idx not in selected:
+                continue
+            # Mark gaps between non-adjacent sentences
+            if previous is not None and sent_idx != previous + 1:
+                kept.append("[...]")
+            kept.append(text)
+            previous = sent_idx
+        if not kept:
+            continue
+        compressed.append(Document(
+            page_content=" ".join(kept),
+            metadata={
+                **doc.metadata,
+                "compressed": True,
+                "original_tokens": estimate_tokens(doc.page_content)
+            }
+        ))
+    return compressed
@@ -0,0 +1,154 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from langchain_core.documents import Document
+
+from src.state import DocumentRef
+from src.perf_metrics import get_performance_store
+from src.logger import get_logger
+
+log = get_logger("document_store")
+
+# Upper bound of documents kept in memory; evicted documents can still be reloaded
+# through a registered loader (e.g. from the checkpoint database).
+DOCUMENT_STORE_SIZE = 50000
+
+# Per-retrieval metadata that is kept in the reference instead of the stored document
+REF_ONLY_METADATA = ("score",)
+
+
+def get_document_id(doc: Document) -> str:
+    """
+    Content address of a document: the vector store chunk id for knowledge base chunks,
+    otherwise a hash of page content and metadata.
+    """
+    chunk_id = doc.metadata.get("chunk_id") or getattr(doc, "id", None)
+    if chunk_id:
+        return str(chunk_id)
+    metadata = {k: v for k, v in doc.metadata.items() if k not in REF_ONLY_METADATA}
+    payload = json.dumps({"content": doc.page_content, "metadata": metadata}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class DocumentStore:
+    """
+    In-process, content-addressed store of Documents.
+
+    Research state only carries references ({"doc_id", "score"}); the text is fetched
+    from here when a node needs it. Identical chunks retrieved for several queries or
+    sessions are held once.
+    """
+
+    def __init__(self, max_documents: int = DOCUMENT_STORE_SIZE):
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[str, Document]" = OrderedDict()
+        self._loaders: List[Callable[[List[str]], Dict[str, Document]]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def add_loader(self, loader: Callable[[List[str]], Dict[str, Document]]) -> None:
+        """Register a fallback that returns {doc_id: Document} for ids missing in memory."""
+        with self._lock:
+            if loader not in self._loaders:
+                self._loaders.append(loader)
+
+    def put(self, doc: Document, doc_id: Optional[str] = None) -> str:
+        doc_id = doc_id or get_document_id(doc)
+        with self._lock:
+            if doc_id in self._documents:
+                self._documents.move_to_end(doc_id)
+            else:
+                metadata = {k: v for k, v in doc.metadata.items() if k not in REF_ONLY_METADATA}
+                self._documents[doc_id] = Document(page_content=doc.page_content, metadata=metadata)
+                while len(self._documents) > self.max_documents:
+                    self._documents.popitem(last=False)
+        return doc_id
+
+    def get_many(self, doc_ids: List[str]) -> Dict[str, Document]:
+        found: Dict[str, Document] = {}
+        with self._lock:
+            for doc_id in doc_ids:
+                doc = self._documents.get(doc_id)
+                if doc is not None:
+                    self._documents.move_to_end(doc_id)
+                    found[doc_id] = doc
+            loaders = list(self._loaders)
+        missing = [doc_id for doc_id in doc_ids if doc_id not in found]
+        get_performance_store().record_cache("retrieved_documents", len(found), len(missing))
+        for loader in loaders:
+            if not missing:
+                break
+            try:
+                loaded = loader(missing)
+            except Exception as e:
+                log.warning("Document loader failed", error=str(e))
+                continue
+            for doc_id, doc in loaded.items():
+                self.put(doc, doc_id)
+                found[doc_id] = doc
+            missing = [doc_id for doc_id in missing if doc_id not in found]
+        return found
+
+    def get(self, doc_id: str) -> Optional[Document]:
+        return self.get_many([doc_id]).get(doc_id)
+
+
+_store: Optional[DocumentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_document_store() -> DocumentStore:
+    """Get the process-wide document store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DocumentStore()
+    return _store
+
+
+def store_documents(docs: Iterable[Document]) -> List[DocumentRef]:
+    """Put documents into the store and return their references (retrieval scores are kept in the reference)."""
+    store = get_document_store()
+    return [{"doc_id": store.put(doc), "score": doc.metadata.get("score")} for doc in docs]
+
+
+def is_document_ref(obj: Any) -> bool:
+    return isinstance(obj, dict) and "doc_id" in obj
+
+
+def load_documents(refs: Iterable[Any]) -> List[Document]:
+    """
+    Resolve references to Documents (in order). Plain Documents are passed through so
+    state written before the store existed still works; unresolvable references are skipped.
+    """
+    refs = list(refs or [])
+    found = get_document_store().get_many([r["doc_id"] for r in refs if is_document_ref(r)])
+    documents = []
+    for ref in refs:
+        if isinstance(ref, Document):
+            documents.append(ref)
+        elif is_document_ref(ref):
+            doc = found.get(ref["doc_id"])
+            if doc is None:
+                log.warning("Document is not available", doc_id=ref["doc_id"])
+                continue
+            documents.append(doc)
+    return documents
+
+
+def load_texts(refs: Iterable[Any]) -> List[str]:
+    """Page contents of the referenced documents."""
+    return [doc.page_content for doc in load_documents(refs)]
+
+
+def load_document_map(mapping: Optional[Dict[str, List[Any]]]) -> Dict[str, List[Document]]:
+    """Resolve a {query: [refs]} state field to {query: [Document]}."""
+    return {query: load_documents(refs) for query, refs in (mapping or {}).items()}
@@ -1,14 +1,20 @@
 import datetime
 import operator
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Annotated, List, Dict, Any, Literal
 from langgraph.graph import START, END, StateGraph
 from langchain_core.runnables.config import RunnableConfig
 from langchain_core.documents import Document
+from pydantic import ValidationError
 
-from src.state import ResearcherState, HitlState
+from src.state import ResearcherState, HitlState, RagBranchOutput
 from src.configuration import get_config_instance
-from src.utils import invoke_ollama, parse_output, format_documents_with_metadata
+from src.utils import invoke_ollama, parse_output, format_documents_with_metadata, estimate_tokens
+from src.cancellation import ResearchCancelled, cancellable_node, check_cancelled
+from src.tracing import traced_node
+from src.profiling import profile_block
+from src.document_store import store_documents, load_documents, load_texts, load_document_map, get_document_id
 from src.vector_db import search_documents
 from src.rag_helpers import source_summarizer_ollama
 from src.prompts import (
@@ -16,16 +22,22 @@ from src.prompts import (
     KNOWLEDGE_BASE_SEARCH_SYSTEM_PROMPT, KNOWLEDGE_BASE_SEARCH_HUMAN_PROMPT,
     RESEARCH_QUERY_WRITER_SYSTEM_PROMPT, RESEARCH_QUERY_WRITER_HUMAN_PROMPT,
     LLM_QUALITY_CHECKER_SYSTEM_PROMPT, LLM_QUALITY_CHECKER_HUMAN_PROMPT,
-    REPORT_WRITER_SYSTEM_PROMPT, REPORT_WRITER_HUMAN_PROMPT,
-    LANGUAGE_DETECTOR_SYSTEM_PROMPT, LANGUAGE_DETECTOR_HUMAN_PROMPT
+    REPORT_WRITER_SYSTEM_PROMPT, REPORT_WRITER_HUMAN_PROMPT, REPORT_WRITER_REVISION_PROMPT,
+    LANGUAGE_DETECTOR_SYSTEM_PROMPT, LANGUAGE_DETECTOR_HUMAN_PROMPT,
+    HITL_TURN_SYSTEM_PROMPT, HITL_TURN_HUMAN_PROMPT,
+    KNOWLEDGE_BASE_SINGLE_PASS_SYSTEM_PROMPT, KNOWLEDGE_BASE_SINGLE_PASS_HUMAN_PROMPT,
+    LLM_QUALITY_CHECKER_SECTION_LOCATOR_PROMPT
 )
-from src.tools import web_search_tool
+from src.logger import log_debug, get_logger
+
+log = get_logger("graph")
 
 # --- HITL NODES ---
 
+@traced_node
 def analyse_user_feedback(state: HitlState, config: RunnableConfig):
     """Analyze user feedback in the context of the research workflow."""
-    print("--- Analyzing user feedback ---")
+    log.info("Analyzing user feedback")
     
     query = state["user_query"]
     detected_language = state.get("detected_language", "English")
@@ -89,9 +101,10 @@ Analyze the human feedback above in the context of the initial research query an
         "current_position": "analyse_user_feedback"
     }
 
+@traced_node
 def generate_follow_up_questions(state: HitlState, config: RunnableConfig):
     """Generate follow-up questions based on the current state and analysis."""
-    print("--- Generating follow-up questions ---")
+    log.info("Generating follow-up questions")
     
     query = state["user_query"]
     detected_language = state.get("detected_language", "English")
@@ -146,11 +159,161 @@ Based on the research context and analysis above, generate strategic follow-up q
         "current_position": "generate_follow_up_questions"
     }
 
+def _analyse_and_follow_up_two_calls(state: HitlState, config: RunnableConfig):
+    """Legacy HITL turn: analysis and follow-up questions as two sequential LLM calls."""
+    res_an = analyse_user_feedback(state, config)
+    res_qs = generate_follow_up_questions({**state, **res_an}, config)
+    return {**res_an, **res_qs, "current_position": "analyse_feedback_and_follow_up"}
+
+@traced_node
+def analyse_feedback_and_follow_up(state: HitlState, config: RunnableConfig):
+    """
+    Run one HITL feedback turn with a single schema-constrained LLM call that returns
+    both the feedback analysis and the follow-up questions.
+    Falls back to `analyse_user_feedback` + `generate_follow_up_questions` if the fused
+    call is disabled or its response cannot be validated.
+    """
+    log.info("Analyzing feedback and generating follow-up questions")
+
+    query = state["user_query"]
+    detected_language = state.get("detected_language", "English")
+    human_feedback = state.get("human_feedback", "")
+    additional_context = state.get("additional_context", "")
+
+    model_to_use = state.get("report_llm", "deepseek-r1:latest")
+
+    if not get_config_instance().enable_fused_hitl_turn or not human_feedback.strip():
+        return _analyse_and_follow_up_two_calls(state, config)
+
+    from src.utils import HitlTurn
+
+    try:
+        res = invoke_ollama(
+            model=model_to_use,
+            system_prompt=HITL_TURN_SYSTEM_PROMPT.format(language=detected_language),
+            user_prompt=HITL_TURN_HUMAN_PROMPT.format(
+                query=query,
+                human_feedback=human_feedback,
+                language=detected_language
+            ),
+            output_format=HitlTurn
+        )
+        analysis = res.analysis.strip()
+        questions = [q.strip() for q in res.follow_up_questions if q.strip()][:3]
+        if not analysis or not questions:
+            raise ValueError("Fused HITL response is missing analysis or follow-up questions")
+    except Exception as e:
+        log.warning("Fused HITL turn failed, falling back to two-call path", error=str(e))
+        return _analyse_and_follow_up_two_calls(state, config)
+
+    follow_up_questions = "\n".join(f"{i+1}. {q}" for i, q in enumerate(questions))
+
+    if additional_context:
+        additional_context += "\n\n"
+    additional_context += f"Human Feedback Analysis:\n{analysis}"
+    additional_context += f"\n\nAI Follow-up Questions:\n{follow_up_questions}"
+
+    return {
+        "analysis": analysis,
+        "follow_up_questions": follow_up_questions,
+        "additional_context": additional_context,
+        "current_position": "analyse_feedback_and_follow_up"
+    }
+
+@traced_node
+def generate_knowledge_base_questions_single_pass(state: HitlState, config: RunnableConfig):
+    """
+    Generate the deep analysis and the knowledge base questions in one schema-constrained,
+    streamed LLM call. Retrieval for each query is started as soon as the query has been
+    streamed, so the documents are ready by the time the full list is complete.
+    """
+    log.info("Generating knowledge base questions (single pass)")
+    
+    query = state["user_query"]
+    detected_language = state.get("detected_language", "English")
+    human_feedback = state.get("human_feedback", "")
+    additional_context = state.get("additional_context", "")
+    max_search_queries = state.get("max_search_queries", 3)
+    max_additional = max(0, max_search_queries - 1)
+    
+    model_to_use = state.get("report_llm", "deepseek-r1:latest")
+    
+    from src.utils import KnowledgeBaseQuestions, stream_ollama, extract_streamed_json_list
+    
+    schema = KnowledgeBaseQuestions.model_json_schema()
+    schema["properties"]["queries"]["maxItems"] = max_additional
+    
+    system_prompt = KNOWLEDGE_BASE_SINGLE_PASS_SYSTEM_PROMPT.format(
+        language=detected_language,
+        max_queries=max_additional
+    )
+    human_prompt = KNOWLEDGE_BASE_SINGLE_PASS_HUMAN_PROMPT.format(
+        query=query,
+        additional_context=additional_context if additional_context else "No detailed conversation history.",
+        human_feedback=human_feedback,
+        language=detected_language,
+        max_queries=max_additional
+    )
+    
+    k = 3
+    generated_queries = []
+    futures = {}
+    
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="kb-prefetch") as executor:
+        # The original query is always searched, no need to wait for the LLM
+        futures[query] = executor.submit(search_documents, query=query, k=k, language=detected_language)
+        
+        buffer = ""
+        if max_additional > 0:
+            for chunk in stream_ollama(model_to_use, system_prompt, human_prompt, format=schema):
+                buffer += chunk
+                for q in extract_streamed_json_list(buffer, "queries")[len(generated_queries):]:
+                    q = q.strip()
+                    generated_queries.append(q)
+                    if q and q not in futures and len(futures) <= max_additional:
+                        log.debug("Prefetching documents", query=q)
+                        futures[q] = executor.submit(search_documents, query=q, k=k, language=detected_language)
+        
+        result = None
+        if buffer:
+            try:
+                result = KnowledgeBaseQuestions.model_validate_json(buffer)
+            except ValidationError as e:
+                # Truncated or malformed stream: fall back to the original query
+                log.warning("Invalid knowledge base questions, keeping only the original query", error=str(e))
+                for q in list(futures)[1:]:
+                    futures.pop(q).cancel()
+        
+        prefetched_documents = {}
+        for q, future in futures.items():
+            try:
+                prefetched_documents[q] = store_documents(future.result())
+            except Exception as e:
+                log.warning("Prefetch failed", query=q, error=str(e))
+    
+    research_queries = list(futures.keys())
+    # Without an analysis (no additional queries, or an invalid response) keep the HITL context
+    deep_analysis = result.analysis if result else additional_context
+    
+    return {
+        "additional_context": deep_analysis,
+        "research_queries": research_queries,
+        "prefetched_documents": prefetched_documents,
+        "current_position": "generate_knowledge_base_questions"
+    }
+
+@traced_node
 def generate_knowledge_base_questions(state: HitlState, config: RunnableConfig):
     """
     Generate knowledge base questions using deep analysis of query + feedback.
     """
-    print("--- Generating knowledge base questions ---")
+    if get_config_instance().kb_question_mode == "single_pass":
+        try:
+            return generate_knowledge_base_questions_single_pass(state, config)
+        except Exception as e:
+            log.warning("Single-pass question generation failed, falling back to two-pass", error=str(e))
+    
+    log.info("Generating knowledge base questions")
     
     query = state["user_query"]
     detected_language = state.get("detected_language", "English")
@@ -212,9 +375,41 @@ def generate_knowledge_base_questions(state: HitlState, config: RunnableConfig):
         "current_position": "generate_knowledge_base_questions"
     }
 
+@traced_node
+def deduplicate_research_queries(state: HitlState, config: RunnableConfig):
+    """
+    Drop research queries that paraphrase the user query or each other.
+    Queries are embedded in one batch and clustered at `query_dedup_threshold`;
+    one representative per cluster is kept.
+    """
+    log.info("Deduplicating research queries")
+    queries = state.get("research_queries", [])
+    conf = get_config_instance()
+    
+    if not conf.enable_query_dedup or len(queries) < 2:
+        return {"research_queries": queries, "dropped_queries": []}
+    
+    from src.similarity import deduplicate_queries
+    
+    try:
+        kept, dropped = deduplicate_queries(queries, threshold=conf.query_dedup_threshold)
+    except Exception as e:
+        log.warning("Query deduplication failed, keeping all queries", error=str(e))
+        return {"research_queries": queries, "dropped_queries": []}
+    
+    for d in dropped:
+        log.info("Dropped duplicate query", query=d["query"], duplicate_of=d["duplicate_of"], similarity=d["similarity"])
+    
+    result = {"research_queries": kept, "dropped_queries": dropped}
+    prefetched = state.get("prefetched_documents")
+    if prefetched:
+        result["prefetched_documents"] = {q: docs for q, docs in prefetched.items() if q in kept}
+    return result
+
+@traced_node
 def detect_language(state: HitlState, config: RunnableConfig):
     """Detect language of the initial query."""
-    print("--- Detecting language ---")
+    log.info("Detecting language")
     query = state["user_query"]
     model_to_use = state.get("report_llm", "deepseek-r1:latest") # Use report LLM for better reasoning or summarizer
     
@@ -232,7 +427,7 @@ def detect_language(state: HitlState, config: RunnableConfig):
         )
         detected_language = res.language
     except Exception as e:
-        print(f"Language detection failed: {e}, defaulting to English")
+        log.warning("Language detection failed, defaulting to English", error=str(e))
         detected_language = "English"
         
     return {"detected_language": detected_language}
@@ -240,9 +435,10 @@ def detect_language(state: HitlState, config: RunnableConfig):
 
 # --- MAIN RESEARCHER NODES ---
 
+@traced_node
 def retrieve_rag_documents(state: ResearcherState, config: RunnableConfig):
     """Retrieve documents for each research query."""
-    print("--- Retrieving documents ---")
+    log.info("Retrieving documents")
     queries = state["research_queries"]
     language = state.get("detected_language", "English")
     
@@ -252,40 +448,74 @@ def retrieve_rag_documents(state: ResearcherState, config: RunnableConfig):
     conf = get_config_instance()
     k = 3 # Hardcode or config
     
-    all_retrieved = {}
+    # Queries already prefetched during question generation are not searched again
+    prefetched = state.get("retrieved_documents") or {}
+    all_retrieved = {q: prefetched[q] for q in queries if q in prefetched}
     
     for q in queries:
-        print(f"Searching for: {q}")
+        if q in all_retrieved:
+            continue
+        check_cancelled(partial={"retrieved_documents": all_retrieved})
+        log.debug("Searching", query=q)
         docs = search_documents(query=q, k=k, language=language)
-        all_retrieved[q] = docs
+        all_retrieved[q] = store_documents(docs)
         
     return {"retrieved_documents": all_retrieved}
 
+@traced_node
 def summarize_query_research(state: ResearcherState, config: RunnableConfig):
     """Summarize retrieved documents."""
-    print("--- Summarizing research ---")
-    retrieved_docs = state["retrieved_documents"]
+    log.info("Summarizing research")
+    retrieved_refs = state["retrieved_documents"]
     language = state.get("detected_language", "English")
     human_feedback = state.get("additional_context", "") # Use additional context as feedback/context
     summarization_llm = state.get("summarization_llm", "gpt-oss:20b")
     
     search_summaries = {}
     
-    for query, docs in retrieved_docs.items():
+    conf = get_config_instance()
+    compression_embeddings = None
+    if conf.enable_context_compression:
+        from src.context_compression import compress_documents
+        from src.vector_db import get_embedding_model
+        compression_embeddings = get_embedding_model()
+    
+    for query, refs in retrieved_refs.items():
+        # Fetch the chunk texts from the document store only for this query
+        docs = load_documents(refs)
         if not docs:
             continue
             
-        print(f"Summarizing for query: {query}")
+        log.debug("Summarizing", query=query)
         
-        # Call summarizer helper
-        summary_text = source_summarizer_ollama(
-            user_query=query,
-            context_documents=docs,
-            language=language,
-            system_message="", # handled in helper
-            llm_model=summarization_llm,
-            human_feedback=human_feedback
-        )
+        context_docs = docs
+        if compression_embeddings is not None:
+            try:
+                context_docs = compress_documents(
+                    query=query,
+                    documents=docs,
+                    token_budget=conf.context_compression_token_budget,
+                    embeddings=compression_embeddings
+                )
+                before = sum(estimate_tokens(d.page_content) for d in docs)
+                after = sum(estimate_tokens(d.page_content) for d in context_docs)
+                log.debug("Compressed context", query=query, tokens_before=before, tokens_after=after)
+            except Exception as e:
+                log.warning("Context compression failed, using full documents", error=str(e))
+                context_docs = docs
+        
+        # Call summarizer helper; a cancelled run keeps the summaries finished so far
+        try:
+            summary_text = source_summarizer_ollama(
+                user_query=query,
+                context_documents=context_docs,
+                language=language,
+                system_message="", # handled in helper
+                llm_model=summarization_llm,
+                human_feedback=human_feedback
+            )
+        except ResearchCancelled as e:
+            raise ResearchCancelled(str(e), partial={"search_summaries": search_summaries}) from None
         
         # Create a Document for the summary to maintain type consistency if desired, 
         # or just store text. The reference state expects Dict[str, List[Document]]
@@ -299,10 +529,11 @@ def summarize_query_research(state: ResearcherState, config: RunnableConfig):
                 "original_doc_count": len(docs)
             }
         )
-        search_summaries[query] = [summary_doc]
+        search_summaries[query] = store_documents([summary_doc])
         
     return {"search_summaries": search_summaries}
 
+@traced_node
 def rerank_summaries(state: ResearcherState, config: RunnableConfig):
     """
     Rerank summaries. 
@@ -312,7 +543,7 @@ def rerank_summaries(state: ResearcherState, config: RunnableConfig):
     Given requirements 'functionalities shall be close to ... KB_BS_local-rag-he', 
     we should implement reranking.
     """
-    print("--- Reranking summaries ---")
+    log.info("Reranking summaries")
     # For now, pass through as a placeholder or implement simple logic.
     # The reference `rerank_summaries` uses `rerank_query_summaries` which invokes LLM.
     # We will implement a simplified version that just aggregates them for the report writer,
@@ -322,12 +553,12 @@ def rerank_summaries(state: ResearcherState, config: RunnableConfig):
     search_summaries = state.get("search_summaries", {})
     all_summaries_list = []
     
-    for query, docs in search_summaries.items():
-        for doc in docs:
+    for query, refs in search_summaries.items():
+        for doc in load_documents(refs):
             all_summaries_list.append({
                 "summary": doc.page_content,
                 "query": query,
-                "original_doc": doc
+                "doc_id": get_document_id(doc)
             })
             
     # Ideally we'd score them here. For V0.1, let's just format them for the next step 
@@ -335,47 +566,136 @@ def rerank_summaries(state: ResearcherState, config: RunnableConfig):
     
     return {"all_reranked_summaries": all_summaries_list}
 
+@traced_node
 def web_search_node(state: ResearcherState, config: RunnableConfig):
-    """Perform web search if enabled."""
-    print("--- Web Search ---")
+    """
+    Perform web search if enabled: the user query and all research queries are searched
+    concurrently, results are deduplicated by canonical URL and raw page content is
+    trimmed to `web_search_raw_content_tokens` per result.
+    """
+    log.info("Web search")
     if not state.get("web_search_enabled", False):
         return {"internet_result": None}
     
-    query = state["user_query"]
-    result = web_search_tool.invoke({"query": query, "max_results": 3})
-    return {"internet_result": result}
+    from src.web_search import search_web, format_web_results
+    conf = get_config_instance()
+    queries = [state["user_query"]] + list(state.get("research_queries", []))
+    try:
+        results = search_web(
+            queries,
+            max_results=conf.web_search_max_results,
+            raw_content_tokens=conf.web_search_raw_content_tokens,
+            max_concurrency=conf.web_search_max_concurrency,
+            cache_ttl=conf.web_search_cache_ttl
+        )
+    except Exception as e:
+        log.error("Web search failed", error=str(e))
+        return {"internet_result": f"Error performing web search: {str(e)}"}
+    
+    log.info("Web search results", results=len(results), queries=len(queries))
+    return {"internet_result": format_web_results(results) or "No results found."}
 
+def _collect_summaries(state: ResearcherState) -> List[Dict[str, str]]:
+    """Flatten search summaries (and the web search result) into {"query", "summary"} items."""
+    summaries = []
+    for q, docs in load_document_map(state.get("search_summaries")).items():
+        for d in docs:
+            summaries.append({"query": q, "summary": d.page_content})
+    internet_result = state.get("internet_result")
+    if internet_result:
+        summaries.append({"query": "Internet Search Results", "summary": internet_result})
+    return summaries
+
+def _reflection_issues(state: ResearcherState) -> str:
+    """Issues of the previous report when it is regenerated after a failed quality check."""
+    qc = state.get("quality_check") or {}
+    if qc.get("is_accurate", True):
+        return ""
+    issues = qc.get("issues_found") or ""
+    if isinstance(issues, list):
+        issues = "\n".join(str(i) for i in issues)
+    return str(issues).strip()
+
+@traced_node
+def generate_final_answer_sectioned(state: ResearcherState, config: RunnableConfig):
+    """
+    Generate the final report section by section: summaries are routed to the sections of
+    `Configuration.report_structure`, the sections are generated concurrently (bounded by
+    `report_max_parallel_sections`) and stitched together after a short coherence pass.
+    """
+    log.info("Generating final answer (sectioned)")
+    from src.report_sections import (
+        parse_report_structure, generate_sections_parallel, apply_coherence_pass, stitch_sections
+    )
+    
+    user_query = state["user_query"]
+    language = state.get("detected_language", "English")
+    report_llm = state.get("report_llm", "gpt-oss:20b")
+    conf = get_config_instance()
+    
+    sections = parse_report_structure(conf.report_structure)
+    issues = _reflection_issues(state)
+    section_bodies = generate_sections_parallel(
+        sections,
+        _collect_summaries(state),
+        user_query=user_query,
+        language=language,
+        report_llm=report_llm,
+        max_parallel=conf.report_max_parallel_sections,
+        min_per_section=conf.report_section_min_summaries,
+        threshold=conf.report_section_routing_threshold,
+        guidance={s["title"]: issues for s in sections} if issues else None
+    )
+    section_bodies = apply_coherence_pass(section_bodies, user_query, language, report_llm)
+    
+    return {
+        "final_answer": stitch_sections(section_bodies),
+        "report_sections": section_bodies
+    }
+
+@traced_node
 def generate_final_answer(state: ResearcherState, config: RunnableConfig):
     """Generate final report."""
-    print("--- Generating Final Answer ---")
+    if get_config_instance().report_mode == "sectioned":
+        try:
+            return generate_final_answer_sectioned(state, config)
+        except Exception as e:
+            log.warning("Sectioned report generation failed, falling back to single pass", error=str(e))
+    
+    log.info("Generating final answer")
     user_query = state["user_query"]
     language = state.get("detected_language", "English")
     report_llm = state.get("report_llm", "gpt-oss:20b")
     
-    # Aggregate information
-    # 1. Reranked/Search Summaries
-    summaries = state.get("search_summaries", {})
-    internet_result = state.get("internet_result")
-    
-    info_parts = []
-    for q, docs in summaries.items():
-        for d in docs:
-            info_parts.append(f"Query: {q}\nSummary: {d.page_content}\n")
+    with profile_block("generate_final_answer_prompt"):
+        # Aggregate information
+        # 1. Reranked/Search Summaries
+        summaries = load_document_map(state.get("search_summaries"))
+        internet_result = state.get("internet_result")
+        
+        info_parts = []
+        for q, docs in summaries.items():
+            for d in docs:
+                info_parts.append(f"Query: {q}\nSummary: {d.page_content}\n")
+                
+        if internet_result:
+            info_parts.append(f"Internet Search Results:\n{internet_result}")
             
-    if internet_result:
-        info_parts.append(f"Internet Search Results:\n{internet_result}")
+        aggregated_info = "\n\n".join(info_parts)
         
-    aggregated_info = "\n\n".join(info_parts)
-    
-    conf = get_config_instance()
-    
-    system_prompt = REPORT_WRITER_SYSTEM_PROMPT.format(language=language)
-    human_prompt = REPORT_WRITER_HUMAN_PROMPT.format(
-        instruction=user_query,
-        information=aggregated_info,
-        report_structure=conf.report_structure,
-        language=language
-    )
+        conf = get_config_instance()
+        
+        system_prompt = REPORT_WRITER_SYSTEM_PROMPT.format(language=language)
+        human_prompt = REPORT_WRITER_HUMAN_PROMPT.format(
+            instruction=user_query,
+            information=aggregated_info,
+            report_structure=conf.report_structure,
+            language=language
+        )
+        # Regeneration after a failed quality check: the writer has to know what to fix
+        issues = _reflection_issues(state)
+        if issues:
+            human_prompt += REPORT_WRITER_REVISION_PROMPT.format(issues=issues)
     
     final_answer = invoke_ollama(
         model=report_llm,
@@ -385,16 +705,67 @@ def generate_final_answer(state: ResearcherState, config: RunnableConfig):
     
     return {"final_answer": final_answer}
 
+@traced_node
+def quality_prechecker(state: ResearcherState, config: RunnableConfig):
+    """
+    Cheap deterministic checks before the LLM quality checker (numbers, citations, sections,
+    language, embedding grounding). Clear passes and clear failures set `quality_check`
+    directly so the LLM checker is skipped; borderline reports go to `quality_checker`.
+    """
+    log.info("Quality pre-check")
+    conf = get_config_instance()
+    if not state.get("enable_quality_checker", True) or not conf.enable_quality_prechecks:
+        return {"quality_precheck": {"verdict": "skipped"}}
+    
+    from src.quality_prechecks import run_prechecks
+    from src.report_sections import parse_report_structure
+    
+    summaries = [text for refs in (state.get("search_summaries") or {}).values() for text in load_texts(refs)]
+    if state.get("internet_result"):
+        summaries.append(state["internet_result"])
+    section_titles = [s["title"] for s in parse_report_structure(conf.report_structure)]
+    final_answer = parse_output(state.get("final_answer", ""))["response"]
+    
+    precheck = run_prechecks(
+        report=final_answer if isinstance(final_answer, str) else str(final_answer),
+        summaries=summaries,
+        section_titles=section_titles,
+        detected_language=state.get("detected_language", "English"),
+        grounding_threshold=conf.precheck_grounding_threshold,
+        pass_share=conf.precheck_pass_share,
+        fail_share=conf.precheck_fail_share
+    )
+    log.info("Pre-check verdict", verdict=precheck["verdict"], issues=precheck["issues"])
+    log_debug("quality_prechecker", precheck)
+    
+    result = {"quality_precheck": precheck}
+    if precheck["verdict"] == "pass":
+        result["quality_check"] = {"is_accurate": True, "source": "precheck"}
+        result["reflection_count"] = state.get("reflection_count", 0) + 1
+    elif precheck["verdict"] == "fail":
+        failing = [{"section": t, "issues": "This section is missing from the report."}
+                   for t in precheck["sections"]["missing"] if not precheck["sections"]["passed"]]
+        result["quality_check"] = {
+            "is_accurate": False,
+            "improvement_needed": True,
+            "issues_found": "\n".join(precheck["issues"]),
+            "failing_sections": failing,
+            "source": "precheck"
+        }
+        result["reflection_count"] = state.get("reflection_count", 0) + 1
+    return result
+
+@traced_node
 def quality_checker(state: ResearcherState, config: RunnableConfig):
     """Check quality of the report."""
-    print("--- Quality Check ---")
+    log.info("Quality check")
     if not state.get("enable_quality_checker", True):
         return {"quality_check": {"is_accurate": True}}
         
     final_answer = state["final_answer"]
     language = state.get("detected_language", "English")
     query = state["user_query"]
-    summaries = state.get("search_summaries", {})
+    summaries = load_document_map(state.get("search_summaries"))
     
     # Format summaries for context
     summary_text = ""
@@ -412,6 +783,17 @@ def quality_checker(state: ResearcherState, config: RunnableConfig):
         language=language
     )
     
+    # Incremental reflection: ask the checker to locate the failing sections
+    section_titles = list((state.get("report_sections") or {}).keys())
+    if get_config_instance().reflection_mode == "incremental" and not section_titles:
+        from src.report_sections import parse_report_structure
+        section_titles = [s["title"] for s in parse_report_structure(get_config_instance().report_structure)]
+    if get_config_instance().reflection_mode == "incremental" and section_titles:
+        human_prompt += LLM_QUALITY_CHECKER_SECTION_LOCATOR_PROMPT.format(
+            section_titles="\n".join(f"- {t}" for t in section_titles),
+            language=language
+        )
+    
     try:
         response = invoke_ollama(
             model=report_llm,
@@ -439,24 +821,121 @@ def quality_checker(state: ResearcherState, config: RunnableConfig):
         except:
             qc_result = {"is_accurate": True, "quality_score": 350}
             
-        log_debug("quality_checker", {
-            "result": qc_result,
-            "reflection_count": state.get("reflection_count", 0) + 1
-        })
+        log.info("Quality check result", result=qc_result, reflection_count=state.get("reflection_count", 0) + 1)
             
         return {"quality_check": qc_result, "reflection_count": state.get("reflection_count", 0) + 1}
         
     except Exception as e:
-        print(f"Quality check failed: {e}")
-        log_debug("quality_checker_error", str(e))
+        log.error("Quality check failed", error=str(e))
         return {"quality_check": {"is_accurate": True, "error": str(e)}}
 
+@traced_node
+def repair_report_sections(state: ResearcherState, config: RunnableConfig):
+    """
+    Incremental reflection: regenerate only the report sections the quality checker
+    flagged, with its issues as guidance, and reuse all other sections unchanged.
+    Falls back to a full regeneration if the failing sections cannot be located.
+    """
+    log.info("Repairing report sections")
+    from src.report_sections import (
+        parse_report_structure, split_report_into_sections, generate_sections_parallel, stitch_sections
+    )
+    
+    conf = get_config_instance()
+    qc = state.get("quality_check") or {}
+    sections = parse_report_structure(conf.report_structure)
+    titles = [s["title"] for s in sections]
+    
+    section_bodies = dict(state.get("report_sections") or {})
+    if not section_bodies:
+        section_bodies = split_report_into_sections(state.get("final_answer", ""), titles)
+    
+    # Map the checker's section names onto the template titles
+    by_lower = {t.lower(): t for t in titles}
+    guidance = {}
+    for item in qc.get("failing_sections") or []:
+        if not isinstance(item, dict):
+            continue
+        title = by_lower.get(str(item.get("section", "")).strip().lstrip("#").strip().lower())
+        if title:
+            guidance[title] = str(item.get("issues", "")) or str(qc.get("issues_found", ""))
+    # Sections missing from the report always need to be (re)generated
+    for title in titles:
+        if title not in section_bodies:
+            guidance.setdefault(title, "This section is missing from the report.")
+    
+    if not guidance or len(section_bodies) == 0:
+        log.warning("Could not locate failing sections, regenerating the full report")
+        result = generate_final_answer(state, config)
+        if "report_sections" not in result:
+            # Single-pass report: sections of the new answer, not the stale ones of the previous report
+            answer = parse_output(result["final_answer"])["response"]
+            result["report_sections"] = split_report_into_sections(answer if isinstance(answer, str) else str(answer), titles)
+        return result
+    
+    general_issues = "\n".join(
+        str(qc.get(k)) for k in ("citation_issues", "missing_elements") if qc.get(k)
+    )
+    if general_issues:
+        guidance = {t: f"{g}\n{general_issues}" for t, g in guidance.items()}
+    for title in guidance:
+        if section_bodies.get(title):
+            guidance[title] += f"\n\nPrevious version of this section:\n{section_bodies[title]}"
+    
+    log.info("Regenerating sections", sections=list(guidance.keys()))
+    repaired = generate_sections_parallel(
+        sections,
+        _collect_summaries(state),
+        user_query=state["user_query"],
+        language=state.get("detected_language", "English"),
+        report_llm=state.get("report_llm", "gpt-oss:20b"),
+        max_parallel=conf.report_max_parallel_sections,
+        min_per_section=conf.report_section_min_summaries,
+        threshold=conf.report_section_routing_threshold,
+        guidance=guidance,
+        only=list(guidance.keys())
+    )
+    section_bodies.update(repaired)
+    # Keep template order
+    section_bodies = {t: section_bodies[t] for t in titles if t in section_bodies}
+    
+    return {
+        "final_answer": stitch_sections(section_bodies),
+        "report_sections": section_bodies
+    }
+
+@traced_node
 def source_linker(state: ResearcherState, config: RunnableConfig):
-    """Mock source linker - in real app would resolve PDF links."""
-    print("--- Source Linking ---")
-    # In a full implementation, this would use `linkify_sources` from rag_helpers
-    # For now, we pass the final answer as linked answer
-    return {"linked_final_answer": state["final_answer"]}
+    """
+    Link report sentences to the retrieved chunks they are grounded in.
+    Sentences are matched against the chunk embeddings cached during retrieval,
+    source links and grounding scores are attached, and existing [Source_filename]
+    citations are turned into links.
+    """
+    log.info("Source linking")
+    from src.rag_helpers import linkify_sources, link_sources_by_embedding
+    
+    final_answer = state["final_answer"]
+    documents = [d for refs in (state.get("retrieved_documents") or {}).values() for d in load_documents(refs)]
+    conf = get_config_instance()
+    
+    grounding = []
+    linked = final_answer
+    try:
+        linked, grounding = link_sources_by_embedding(
+            final_answer, documents, threshold=conf.source_link_threshold,
+            selected_database=state.get("selected_database")
+        )
+    except Exception as e:
+        log.warning("Embedding source linking failed", error=str(e))
+    
+    linked = linkify_sources(linked, selected_database=state.get("selected_database"), documents=documents)
+    
+    if grounding:
+        grounded = sum(1 for g in grounding if g["linked"])
+        log.info("Source grounding", grounded=grounded, sentences=len(grounding))
+    
+    return {"linked_final_answer": linked, "source_grounding": grounding}
 
 # --- ROUTERS ---
 
@@ -468,14 +947,17 @@ def quality_router(state: ResearcherState):
     # If passed or max retries reached
     if qc.get("is_accurate", False) or count >= 2: # Limit loops
         return "source_linker"
+    elif get_config_instance().reflection_mode == "incremental":
+        return "repair_report_sections"
     else:
         return "generate_final_answer" # Simply regenerate for now, effectively a retry
 
-def web_search_router(state: ResearcherState):
-    if state.get("web_search_enabled", False):
-        return "web_search"
-    else:
-        return "generate_final_answer"
+def precheck_router(state: ResearcherState):
+    """Only borderline (or skipped) pre-checks pay for the LLM quality checker."""
+    verdict = (state.get("quality_precheck") or {}).get("verdict")
+    if verdict in ("pass", "fail"):
+        return quality_router(state)
+    return "quality_checker"
 
 # --- GRAPH CONSTRUCTION ---
 
@@ -485,6 +967,7 @@ def create_hitl_graph():
     workflow.add_node("detect_language", detect_language)
     workflow.add_node("analyse_user_feedback", analyse_user_feedback)
     workflow.add_node("generate_follow_up_questions", generate_follow_up_questions)
+    workflow.add_node("analyse_feedback_and_follow_up", analyse_feedback_and_follow_up)
     workflow.add_node("generate_knowledge_base_questions", generate_knowledge_base_questions)
     
     # Simple flow for HITL: 
@@ -500,38 +983,72 @@ def create_hitl_graph():
     
     # For the app, we likely run nodes individually. 
     # Let's define a linear path for the *finalization* of HITL
-    workflow.add_edge("generate_knowledge_base_questions", END)
+    workflow.add_node("deduplicate_research_queries", deduplicate_research_queries)
+    workflow.add_edge("generate_knowledge_base_questions", "deduplicate_research_queries")
+    workflow.add_edge("deduplicate_research_queries", END)
     
     return workflow.compile()
 
-def create_main_graph():
-    workflow = StateGraph(ResearcherState)
+def create_rag_subgraph():
+    """Retrieval -> summarization -> reranking as one branch of the main graph."""
+    workflow = StateGraph(ResearcherState, output_schema=RagBranchOutput)
     
-    workflow.add_node("retrieve_rag_documents", retrieve_rag_documents)
-    workflow.add_node("summarize_query_research", summarize_query_research)
-    workflow.add_node("rerank_summaries", rerank_summaries)
-    workflow.add_node("web_search", web_search_node)
-    workflow.add_node("generate_final_answer", generate_final_answer)
-    workflow.add_node("quality_checker", quality_checker)
-    workflow.add_node("source_linker", source_linker)
+    workflow.add_node("retrieve_rag_documents", cancellable_node(retrieve_rag_documents))
+    workflow.add_node("summarize_query_research", cancellable_node(summarize_query_research))
+    workflow.add_node("rerank_summaries", cancellable_node(rerank_summaries))
     
-    # Flow
     workflow.add_edge(START, "retrieve_rag_documents")
     workflow.add_edge("retrieve_rag_documents", "summarize_query_research")
     workflow.add_edge("summarize_query_research", "rerank_summaries")
+    workflow.add_edge("rerank_summaries", END)
+    
+    return workflow.compile()
+
+def create_main_graph(checkpointer=None):
+    """
+    Args:
+        checkpointer: Optional LangGraph checkpointer (see src.checkpointing.get_checkpointer).
+            Runs are then persisted per research session id (thread_id) and a failed or
+            interrupted run can be resumed with `graph.stream(None, config)`.
     
-    # Conditional web search
+    A CancellationToken passed as configurable "cancellation_token" stops the run:
+    every node checks it on entry and LLM calls inside the nodes abort in-flight.
+    
+    Nodes record tracing spans (src.tracing) when `enable_tracing` is set.
+    """
+    workflow = StateGraph(ResearcherState)
+    
+    # The RAG chain is a subgraph so the whole chain runs in the same superstep as
+    # web search (LangGraph waits for all nodes of a superstep before the next one).
+    workflow.add_node("rag_research", create_rag_subgraph())
+    workflow.add_node("web_search", cancellable_node(web_search_node))
+    workflow.add_node("generate_final_answer", cancellable_node(generate_final_answer))
+    workflow.add_node("quality_prechecker", cancellable_node(quality_prechecker))
+    workflow.add_node("quality_checker", cancellable_node(quality_checker))
+    workflow.add_node("repair_report_sections", cancellable_node(repair_report_sections))
+    workflow.add_node("source_linker", cancellable_node(source_linker))
+    
+    # Flow: the RAG branch and the web search branch run in parallel from START.
+    # web_search only depends on user_query and returns immediately when disabled.
+    workflow.add_edge(START, "rag_research")
+    workflow.add_edge(START, "web_search")
+    
+    # Join both branches before writing the report
+    workflow.add_edge(["rag_research", "web_search"], "generate_final_answer")
+    
+    workflow.add_edge("generate_final_answer", "quality_prechecker")
+    
+    # Deterministic pre-checks decide whether the LLM quality checker is needed
     workflow.add_conditional_edges(
-        "rerank_summaries",
-        web_search_router,
+        "quality_prechecker",
+        precheck_router,
         {
-            "web_search": "web_search",
-            "generate_final_answer": "generate_final_answer"
+            "quality_checker": "quality_checker",
+            "source_linker": "source_linker",
+            "generate_final_answer": "generate_final_answer",
+            "repair_report_sections": "repair_report_sections"
         }
     )
-    workflow.add_edge("web_search", "generate_final_answer")
-    
-    workflow.add_edge("generate_final_answer", "quality_checker")
     
     # Conditional quality check loop
     workflow.add_conditional_edges(
@@ -539,10 +1056,12 @@ def create_main_graph():
         quality_router,
         {
             "source_linker": "source_linker",
-            "generate_final_answer": "generate_final_answer"
+            "generate_final_answer": "generate_final_answer",
+            "repair_report_sections": "repair_report_sections"
         }
     )
+    workflow.add_edge("repair_report_sections", "quality_prechecker")
     
     workflow.add_edge("source_linker", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
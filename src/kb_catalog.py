@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import threading
+from typing import List, Dict, Any, Optional
+from src.logger import get_logger
+
+log = get_logger("kb_catalog")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATABASE_PATH = os.path.join(PROJECT_ROOT, 'kb', 'database')
+CATALOG_FILENAME = "kb_catalog.json"
+CATALOG_VERSION = 2
+
+# Minimum number of seconds between two change checks of the source directories
+REFRESH_INTERVAL = 30.0
+
+
+def get_kb_source_roots(selected_database: Optional[str] = None) -> List[str]:
+    """Directories that may contain the KB source files, most specific first."""
+    candidates = []
+    if selected_database:
+        candidates.append(os.path.join(DATABASE_PATH, selected_database, 'files'))
+    candidates += [
+        os.path.join(PROJECT_ROOT, 'kb', 'files'),
+        os.path.join(PROJECT_ROOT, 'files'),
+        os.path.join(os.getcwd(), 'files'),
+    ]
+    roots = []
+    for c in candidates:
+        c = os.path.abspath(c)
+        if c not in roots:
+            roots.append(c)
+    return roots
+
+
+def get_catalog_path(selected_database: Optional[str] = None) -> str:
+    """Location of the persisted catalog: inside the database directory if it exists."""
+    if selected_database and os.path.isdir(os.path.join(DATABASE_PATH, selected_database)):
+        return os.path.join(DATABASE_PATH, selected_database, CATALOG_FILENAME)
+    return os.path.join(PROJECT_ROOT, 'kb', CATALOG_FILENAME)
+
+
+def _count_pages(path: str) -> Optional[int]:
+    if not path.lower().endswith('.pdf'):
+        return None
+    try:
+        import fitz  # pymupdf
+        with fitz.open(path) as pdf:
+            return pdf.page_count
+    except Exception:
+        return None
+
+
+class KBCatalog:
+    """
+    Catalog of the knowledge base source files.
+
+    Maps the path of every file relative to its source root ('sub/report.pdf') to the
+    absolute path, size and page count of the file. A source string from chunk metadata
+    is resolved by its longest trailing path that matches a relative path, so same-named
+    files in different directories stay apart; the bare basename is the fallback
+    (earlier roots and then the first file found win, collisions are logged at build time).
+    The catalog is built once, persisted as JSON next to the database and only rebuilt
+    when the directory signature of the source roots changes, so path resolution is a
+    dictionary lookup instead of per-chunk filesystem calls.
+    """
+
+    def __init__(self, roots: List[str], catalog_path: str):
+        self.roots = roots
+        self.catalog_path = catalog_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Basename -> relative path of the entry a bare filename resolves to
+        self.basenames: Dict[str, str] = {}
+        self.signature: List[Any] = []
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _compute_signature(self) -> List[Any]:
+        """Modification times of all directories below the roots (files are not stat-ed)."""
+        signature = []
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            for dirpath, _, _ in os.walk(root):
+                try:
+                    signature.append([dirpath, os.stat(dirpath).st_mtime_ns])
+                except OSError:
+                    pass
+        return signature
+
+    def load(self) -> bool:
+        """Load the persisted catalog, returns False if missing or incompatible."""
+        try:
+            with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != CATALOG_VERSION or data.get("roots") != self.roots:
+            return False
+        self.entries = data.get("entries", {})
+        self.basenames = self._index_basenames(self.entries)
+        self.signature = data.get("signature", [])
+        return True
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+            tmp_path = self.catalog_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": CATALOG_VERSION,
+                    "roots": self.roots,
+                    "signature": self.signature,
+                    "entries": self.entries
+                }, f)
+            os.replace(tmp_path, self.catalog_path)
+        except OSError as e:
+            log.warning("Could not persist KB catalog", error=str(e))
+
+    @staticmethod
+    def _index_basenames(entries: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+        """Basename -> relative path; the first entry (earlier root, walk order) wins."""
+        basenames: Dict[str, str] = {}
+        for relpath in entries:
+            basenames.setdefault(relpath.rsplit('/', 1)[-1], relpath)
+        return basenames
+
+    def build(self, signature: Optional[List[Any]] = None) -> None:
+        """(Re)build the catalog; page counts of unchanged files are reused."""
+        previous = self.entries
+        entries: Dict[str, Dict[str, Any]] = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                # Sorted, so which of two same-named files a bare filename resolves to is stable
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if filename.startswith('.'):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    relpath = os.path.relpath(path, root).replace(os.sep, '/')
+                    # Earlier roots win for the same relative path
+                    if relpath in entries:
+                        log.warning("KB source file shadowed by an earlier root", file=relpath,
+                                    used=entries[relpath]["path"], ignored=path)
+                        continue
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    old = previous.get(relpath)
+                    if old and old["path"] == path and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime:
+                        entries[relpath] = old
+                        continue
+                    entries[relpath] = {
+                        "path": path,
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime,
+                        "pages": _count_pages(path)
+                    }
+        basenames = self._index_basenames(entries)
+        for relpath in entries:
+            basename = relpath.rsplit('/', 1)[-1]
+            if basenames[basename] != relpath:
+                log.warning("KB source files share a basename, bare filenames resolve to the first",
+                            file=basename, used=basenames[basename], other=relpath)
+        self.entries = entries
+        self.basenames = basenames
+        self.signature = signature if signature is not None else self._compute_signature()
+        self.save()
+
+    def refresh(self, force: bool = False) -> None:
+        """Rebuild if the source directories changed (checked at most every REFRESH_INTERVAL seconds)."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_check < REFRESH_INTERVAL:
+                return
+            self._last_check = now
+            signature = self._compute_signature()
+            if force or signature != self.signature:
+                self.build(signature)
+
+    def resolve(self, source: Optional[str] = None, path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a file by its metadata 'path' or 'source' (full or relative path, or basename).
+        The longest trailing part of the path that is a relative path of the catalog wins,
+        e.g. '/old/host/kb/files/2024/report.pdf' finds '2024/report.pdf'.
+
+        Returns:
+            Entry dict with 'path', 'size', 'pages' or None if unknown.
+        """
+        self.refresh()
+        candidates = [c.replace('\\', '/') for c in (path, source) if c]
+        for candidate in candidates:
+            parts = [p for p in candidate.split('/') if p]
+            for i in range(len(parts)):
+                entry = self.entries.get('/'.join(parts[i:]))
+                if entry:
+                    return entry
+        for candidate in candidates:
+            relpath = self.basenames.get(candidate.rsplit('/', 1)[-1])
+            if relpath:
+                return self.entries[relpath]
+        return None
+
+
+_catalogs: Dict[str, KBCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(selected_database: Optional[str] = None) -> KBCatalog:
+    """Get the (process-wide cached) catalog of the given database."""
+    key = selected_database or ""
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = KBCatalog(get_kb_source_roots(selected_database), get_catalog_path(selected_database))
+            if not catalog.load():
+                catalog.build()
+            _catalogs[key] = catalog
+    return catalog
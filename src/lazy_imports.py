@@ -0,0 +1,72 @@
+import sys
+import time
+import importlib
+import threading
+from typing import Any, Dict
+
+# Import time (seconds) of the modules loaded through lazy_import, in load order
+_import_times: Dict[str, float] = {}
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+        torch = lazy_import("torch")      # nothing imported yet
+        torch.cuda.is_available()         # imports torch here
+
+    Use it for heavy dependencies (torch, Chroma, HuggingFace, Ollama) that are only
+    needed once a research run actually reaches them, so importing src.graph or
+    starting the app does not pay for them.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is not None:
+            return module
+        name = self.__dict__["_name"]
+        with _lock:
+            module = self.__dict__["_module"]
+            if module is None:
+                already_imported = name in sys.modules
+                start = time.perf_counter()
+                module = importlib.import_module(name)
+                if not already_imported:
+                    _import_times[name] = time.perf_counter() - start
+                self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if is_imported(self.__dict__["_name"]) else "not loaded"
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """A LazyModule for `name`; import errors surface on first use."""
+    return LazyModule(name)
+
+
+def is_imported(name: str) -> bool:
+    """Whether `name` has been imported by anyone (through lazy_import or not)."""
+    return name in sys.modules
+
+
+def import_times() -> Dict[str, float]:
+    """Seconds spent importing each module on first use through lazy_import."""
+    with _lock:
+        return dict(_import_times)
+
@@ -0,0 +1,225 @@
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from src.logger import get_logger
+
+log = get_logger("llm_metrics")
+
+# A load_duration above this means the model was (re)loaded for the request
+MODEL_RELOAD_THRESHOLD_MS = 500.0
+
+# Runs kept in the registry (oldest are dropped)
+MAX_RUNS = 50
+
+DEFAULT_RUN_ID = "default"
+
+# Timing fields of the final Ollama response (durations in nanoseconds)
+TIMING_FIELDS = ("model", "prompt_eval_count", "prompt_eval_duration", "eval_count", "eval_duration",
+                 "load_duration", "total_duration")
+
+
+def timing_fields(response: Any) -> Dict[str, Any]:
+    """The timing fields of an Ollama response object or dict as a plain dict."""
+    if isinstance(response, dict):
+        return {k: response.get(k) for k in TIMING_FIELDS}
+    return {k: getattr(response, k, None) for k in TIMING_FIELDS}
+
+
+@dataclass
+class OllamaMetrics:
+    """Server-side timing of one Ollama response (durations in milliseconds)."""
+    model: str = ""
+    prompt_eval_count: int = 0
+    prompt_eval_ms: float = 0.0
+    eval_count: int = 0
+    eval_ms: float = 0.0
+    load_ms: float = 0.0
+    total_ms: float = 0.0
+    node: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, response: Any, model: str = "") -> "OllamaMetrics":
+        """
+        Read the timing fields of an Ollama response: an ollama ChatResponse/GenerateResponse
+        or the final chunk dict of the REST API (as in langchain's generation_info).
+        Missing fields count as 0 (e.g. prompt_eval_count when the prompt was cached).
+        """
+        def field(name):
+            value = response.get(name) if isinstance(response, dict) else getattr(response, name, None)
+            return value or 0
+
+        return cls(
+            model=(response.get("model") if isinstance(response, dict) else getattr(response, "model", None)) or model,
+            prompt_eval_count=int(field("prompt_eval_count")),
+            prompt_eval_ms=field("prompt_eval_duration") / 1e6,
+            eval_count=int(field("eval_count")),
+            eval_ms=field("eval_duration") / 1e6,
+            load_ms=field("load_duration") / 1e6,
+            total_ms=field("total_duration") / 1e6,
+        )
+
+    @property
+    def prefill_tps(self) -> Optional[float]:
+        return self.prompt_eval_count / (self.prompt_eval_ms / 1000) if self.prompt_eval_ms else None
+
+    @property
+    def decode_tps(self) -> Optional[float]:
+        return self.eval_count / (self.eval_ms / 1000) if self.eval_ms else None
+
+    @property
+    def reloaded(self) -> bool:
+        return self.load_ms >= MODEL_RELOAD_THRESHOLD_MS
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "prefill_tps": _round(self.prefill_tps), "decode_tps": _round(self.decode_tps),
+                "reloaded": self.reloaded}
+
+
+@dataclass
+class LLMResult:
+    """Output of an LLM call (text or parsed model) together with its server-side metrics."""
+    output: Any
+    metrics: OllamaMetrics
+
+
+def _round(value: Optional[float], digits: int = 1) -> Optional[float]:
+    return round(value, digits) if value is not None else None
+
+
+def summarize_metrics(calls: List[OllamaMetrics]) -> Dict[str, Any]:
+    """
+    Totals of several calls with throughput and the dominant phase: "prefill" if more
+    server time went into prompt evaluation than into generation, else "decode".
+    """
+    prompt_ms = sum(c.prompt_eval_ms for c in calls)
+    eval_ms = sum(c.eval_ms for c in calls)
+    prompt_tokens = sum(c.prompt_eval_count for c in calls)
+    eval_tokens = sum(c.eval_count for c in calls)
+    return {
+        "calls": len(calls),
+        "prompt_eval_count": prompt_tokens,
+        "prompt_eval_ms": round(prompt_ms, 3),
+        "eval_count": eval_tokens,
+        "eval_ms": round(eval_ms, 3),
+        "load_ms": round(sum(c.load_ms for c in calls), 3),
+        "total_ms": round(sum(c.total_ms for c in calls), 3),
+        "reloads": sum(c.reloaded for c in calls),
+        "prefill_tps": _round(prompt_tokens / (prompt_ms / 1000)) if prompt_ms else None,
+        "decode_tps": _round(eval_tokens / (eval_ms / 1000)) if eval_ms else None,
+        "prefill_share": round(prompt_ms / (prompt_ms + eval_ms), 3) if prompt_ms + eval_ms else None,
+        "bound": None if not calls or prompt_ms + eval_ms == 0 else ("prefill" if prompt_ms > eval_ms else "decode"),
+    }
+
+
+class LLMMetricsRegistry:
+    """
+    Process-wide store of Ollama metrics per research run, aggregated per node
+    (the node is taken from the tracing context, see src.tracing.get_current_node).
+    """
+
+    def __init__(self, max_runs: int = MAX_RUNS):
+        self.max_runs = max_runs
+        self._runs: "OrderedDict[str, List[OllamaMetrics]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, metrics: OllamaMetrics, run_id: Optional[str] = None) -> None:
+        run_id = run_id or get_metrics_run_id()
+        with self._lock:
+            calls = self._runs.setdefault(run_id, [])
+            self._runs.move_to_end(run_id)
+            calls.append(metrics)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+
+    def calls(self, run_id: str) -> List[OllamaMetrics]:
+        with self._lock:
+            return list(self._runs.get(run_id, []))
+
+    def runs(self) -> List[str]:
+        with self._lock:
+            return list(self._runs)
+
+    def clear(self, run_id: Optional[str] = None) -> None:
+        with self._lock:
+            if run_id is None:
+                self._runs.clear()
+            else:
+                self._runs.pop(run_id, None)
+
+    def run_summary(self, run_id: str) -> Dict[str, Any]:
+        """{"totals": ..., "nodes": {node: ...}, "models": {model: ...}} of one run."""
+        calls = self.calls(run_id)
+        by_node: Dict[str, List[OllamaMetrics]] = {}
+        by_model: Dict[str, List[OllamaMetrics]] = {}
+        for call in calls:
+            by_node.setdefault(call.node or "(outside node)", []).append(call)
+            by_model.setdefault(call.model, []).append(call)
+        return {
+            "run_id": run_id,
+            "totals": summarize_metrics(calls),
+            "nodes": {node: summarize_metrics(c) for node, c in by_node.items()},
+            "models": {model: summarize_metrics(c) for model, c in by_model.items()},
+        }
+
+
+_registry = LLMMetricsRegistry()
+_current_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("metrics_run_id", default=None)
+
+
+def get_metrics_registry() -> LLMMetricsRegistry:
+    return _registry
+
+
+def get_metrics_run_id() -> str:
+    return _current_run_id.get() or DEFAULT_RUN_ID
+
+
+@contextmanager
+def metrics_run(run_id: str):
+    """Attribute all LLM calls in this context (and threads started from it) to `run_id`."""
+    reset = _current_run_id.set(run_id)
+    try:
+        yield _registry
+    finally:
+        _current_run_id.reset(reset)
+
+
+def record_llm_metrics(metrics: OllamaMetrics, target_span: Any = None) -> OllamaMetrics:
+    """
+    Tag metrics with the current node and add them to the registry and to `target_span`
+    (default: the current tracing span), replacing its estimated token counts.
+    """
+    from src.tracing import current_span, get_current_node
+    metrics.node = metrics.node or get_current_node()
+    _registry.record(metrics)
+    (target_span or current_span()).set(
+        prompt_eval_count=metrics.prompt_eval_count, prompt_eval_ms=round(metrics.prompt_eval_ms, 3),
+        eval_count=metrics.eval_count, eval_ms=round(metrics.eval_ms, 3), load_ms=round(metrics.load_ms, 3),
+        input_tokens=metrics.prompt_eval_count or None, output_tokens=metrics.eval_count or None,
+    )
+    if metrics.reloaded:
+        log.info("Ollama loaded the model for this request", model=metrics.model, load_ms=round(metrics.load_ms))
+    return metrics
+
+
+class OllamaMetricsCallback(BaseCallbackHandler):
+    """LangChain callback that keeps the Ollama metrics of the final generation (langchain Ollama LLM)."""
+
+    def __init__(self, model: str = ""):
+        self.model = model
+        self.timing: Optional[Dict[str, Any]] = None
+
+    @property
+    def metrics(self) -> Optional[OllamaMetrics]:
+        return OllamaMetrics.from_response(self.timing, model=self.model) if self.timing else None
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                if generation.generation_info:
+                    self.timing = timing_fields(generation.generation_info)
@@ -1,36 +1,245 @@
 import os
-import datetime
+import sys
 import json
-from typing import Any
+import time
+import queue
+import atexit
+import threading
+from typing import Any, Dict, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_LOG_FILE = os.path.join(PROJECT_ROOT, '.cache', 'logs', 'research.jsonl')
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "off": 100}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+# Records waiting for the writer thread; when full, new records are dropped (and counted)
+QUEUE_SIZE = 10000
+
+# Minimum level of records that are created at all; checked before anything else is done.
+# Set from RESEARCH_LOG_LEVEL / Configuration.log_level when the first logger is created.
+_min_level = LEVELS["info"]
+_level_configured = False
+
+
+class LogWriter:
+    """
+    Background thread that writes log records as compact JSON lines to a size-rotated
+    file (research.jsonl, research.jsonl.1, ...) and echoes them to the console.
+
+    Callers only put the record on a bounded queue and never block: if the writer
+    falls behind, records are dropped and the number of dropped records is logged.
+    """
+
+    def __init__(self, path: Optional[str], max_bytes: int = 5 * 1024 * 1024, backups: int = 3,
+                 console_level: int = LEVELS["info"], queue_size: int = QUEUE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.console_level = console_level
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._size = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until the records queued so far are written."""
+        done = threading.Event()
+        try:
+            self._queue.put({"_flush": done}, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self) -> None:
+        self.flush()
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if record["level"] >= self.console_level:
+            fields = " ".join(f"{k}={v}" for k, v in record.items()
+                              if k not in ("ts", "level", "logger", "msg", "run", "node", "thread"))
+            print(f"[{LEVEL_NAMES[record['level']].upper()}] {record['logger']}: {record['msg']}"
+                  + (f" {fields}" if fields else ""), file=sys.stderr if record["level"] >= LEVELS["warning"] else sys.stdout)
+        if not self.path:
+            return
+        line = json.dumps({**record, "level": LEVEL_NAMES[record["level"]]}, default=str,
+                          ensure_ascii=False, separators=(",", ":")) + "\n"
+        if self._file is None:
+            self._open()
+        size = len(line.encode("utf-8"))
+        if self._size and self._size + size > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        self._size += size
+
+    def _run(self) -> None:
+        reported = 0
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            if "_flush" in record:
+                if self._file:
+                    self._file.flush()
+                record["_flush"].set()
+                continue
+            try:
+                if self.dropped > reported:
+                    self._write({"ts": time.time(), "level": LEVELS["warning"], "logger": "logger",
+                                 "msg": "Log records dropped", "dropped": self.dropped - reported})
+                    reported = self.dropped
+                self._write(record)
+                if self._queue.empty() and self._file:
+                    self._file.flush()
+            except Exception as e:
+                print(f"Log writer failed: {e}", file=sys.stderr)
+        if self._file:
+            self._file.close()
+
+
+_writer: Optional[LogWriter] = None
+_writer_lock = threading.Lock()
+
+
+def configure_logging(level: Optional[str] = None, path: Optional[str] = None, max_bytes: Optional[int] = None,
+                      backups: Optional[int] = None, console_level: Optional[str] = None) -> LogWriter:
+    """
+    (Re)configure logging from the arguments, RESEARCH_LOG_LEVEL / RESEARCH_LOG_FILE and the
+    Configuration (log_level, log_file, log_max_bytes, log_backups, log_console_level).
+    """
+    global _writer, _min_level, _level_configured
+    from src.configuration import get_config_instance
+    conf = get_config_instance()
+    level = (level or os.environ.get("RESEARCH_LOG_LEVEL") or conf.log_level).lower()
+    console_level = (console_level or conf.log_console_level or level).lower()
+    path = path or os.environ.get("RESEARCH_LOG_FILE") or conf.log_file or DEFAULT_LOG_FILE
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+        _writer = LogWriter(None if path == "-" else path,
+                            max_bytes=max_bytes or conf.log_max_bytes,
+                            backups=conf.log_backups if backups is None else backups,
+                            console_level=LEVELS[console_level])
+        _min_level = LEVELS[level]
+        _level_configured = True
+    return _writer
+
+
+def _apply_configured_level() -> None:
+    """Apply RESEARCH_LOG_LEVEL or Configuration.log_level without starting the writer."""
+    global _min_level, _level_configured
+    from src.configuration import get_config_instance
+    level = (os.environ.get("RESEARCH_LOG_LEVEL") or get_config_instance().log_level or "info").lower()
+    with _writer_lock:
+        if not _level_configured:
+            _min_level = LEVELS.get(level, LEVELS["info"])
+            _level_configured = True
+
+
+def get_log_writer() -> LogWriter:
+    if _writer is None:
+        configure_logging()
+    return _writer
+
+
+def flush_logs() -> None:
+    if _writer is not None:
+        _writer.flush()
+
+
+@atexit.register
+def _close_writer() -> None:
+    if _writer is not None:
+        _writer.flush(timeout=2)
+
+
+class Logger:
+    """
+    Named structured logger: log.info("Retrieved documents", query=q, results=3).
+
+    Records below the configured level return right away; enabled records carry the
+    research run and graph node of the calling context and are serialized by the writer
+    thread. Pass values as fields instead of formatting them into the message.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def is_enabled(self, level: str) -> bool:
+        return LEVELS[level] >= _min_level
+
+    def _log(self, level: int, msg: str, fields: Dict[str, Any]) -> None:
+        from src.llm_metrics import get_metrics_run_id
+        from src.tracing import get_current_node
+        record = {"ts": round(time.time(), 6), "level": level, "logger": self.name, "msg": msg,
+                  "run": get_metrics_run_id(), "node": get_current_node(),
+                  "thread": threading.current_thread().name}
+        record.update(fields)
+        get_log_writer().put(record)
+
+    def debug(self, msg: str, **fields) -> None:
+        if _min_level <= 10:
+            self._log(10, msg, fields)
+
+    def info(self, msg: str, **fields) -> None:
+        if _min_level <= 20:
+            self._log(20, msg, fields)
+
+    def warning(self, msg: str, **fields) -> None:
+        if _min_level <= 30:
+            self._log(30, msg, fields)
+
+    def error(self, msg: str, **fields) -> None:
+        if _min_level <= 40:
+            self._log(40, msg, fields)
+
+
+_loggers: Dict[str, Logger] = {}
+
+
+def get_logger(name: str) -> Logger:
+    if not _level_configured:
+        _apply_configured_level()
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, Logger(name))
+    return logger
 
-DEBUG_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dev', 'debugging_info.txt')
 
 def log_debug(step: str, data: Any):
     """
-    Log debug information to the dev/debugging_info.txt file.
-    
+    Log debug information (kept for existing callers; a debug record of the "debug" logger).
+
     Args:
         step: The name of the step or component logging the info.
         data: The data to log (string, dict, or object).
     """
-    try:
-        # Create dev directory if it doesn't exist (though it should)
-        os.makedirs(os.path.dirname(DEBUG_FILE_PATH), exist_ok=True)
-        
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        with open(DEBUG_FILE_PATH, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] [{step}]\n")
-            
-            if isinstance(data, (dict, list)):
-                try:
-                    f.write(json.dumps(data, indent=2, default=str))
-                except:
-                    f.write(str(data))
-            else:
-                f.write(str(data))
-                
-            f.write("\n" + "-"*50 + "\n")
-            
-    except Exception as e:
-        print(f"Failed to log debug info: {e}")
+    get_logger("debug").debug(step, data=data)
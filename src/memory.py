@@ -0,0 +1,134 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Optional
+
+from src.utils import invoke_ollama, parse_output, estimate_tokens
+from src.prompts import CONVERSATION_COMPACTION_SYSTEM_PROMPT, CONVERSATION_COMPACTION_HUMAN_PROMPT
+from src.logger import get_logger
+
+log = get_logger("memory")
+
+# Shared by all conversations of the process; each memory runs at most one compaction at a time
+_compaction_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hitl-compaction")
+
+
+class ConversationMemory:
+    """
+    Bounded conversation memory for the HITL phase.
+
+    The latest `keep_turns` turns are kept verbatim. Once the rendered context grows
+    beyond `max_tokens`, older turns are folded into a running summary by the LLM.
+    Compaction runs on a shared background worker so it overlaps with the user
+    typing their next answer instead of adding latency to the next turn.
+    """
+
+    def __init__(self, query: str, model: str, language: str = "English",
+                 max_tokens: int = 1500, keep_turns: int = 4):
+        self.query = query
+        self.model = model
+        self.language = language
+        self.max_tokens = max_tokens
+        self.keep_turns = max(1, keep_turns)
+
+        self.turns: List[Dict[str, str]] = []
+        self.summary = ""
+        # Number of leading turns already folded into `summary`
+        self._folded = 0
+
+        self._lock = threading.Lock()
+        self._pending: Optional[Future] = None
+
+    def add_turn(self, role: str, content: str) -> None:
+        """Append a turn (role is e.g. 'user' or 'assistant')."""
+        if not content or not content.strip():
+            return
+        with self._lock:
+            self.turns.append({"role": role, "content": content.strip()})
+
+    @staticmethod
+    def _format_turns(turns: List[Dict[str, str]]) -> str:
+        return "\n\n".join(f"{t['role'].capitalize()}: {t['content']}" for t in turns)
+
+    def render(self) -> str:
+        """Render the bounded context: compact summary followed by the verbatim recent turns."""
+        with self._lock:
+            summary = self.summary
+            recent = self.turns[self._folded:]
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}")
+        if recent:
+            parts.append(self._format_turns(recent))
+        return "\n\n".join(parts)
+
+    def needs_compaction(self) -> bool:
+        with self._lock:
+            unfolded = len(self.turns) - self._folded
+        return unfolded > self.keep_turns and estimate_tokens(self.render()) > self.max_tokens
+
+    def compact(self) -> bool:
+        """
+        Synchronously fold all but the latest `keep_turns` turns into the summary.
+
+        Returns:
+            True if the summary was updated.
+        """
+        with self._lock:
+            start = self._folded
+            end = len(self.turns) - self.keep_turns
+            if end <= start:
+                return False
+            to_fold = self.turns[start:end]
+            summary = self.summary
+
+        system_prompt = CONVERSATION_COMPACTION_SYSTEM_PROMPT.format(
+            language=self.language,
+            max_words=max(50, self.max_tokens // 3)
+        )
+        human_prompt = CONVERSATION_COMPACTION_HUMAN_PROMPT.format(
+            query=self.query,
+            summary=summary if summary else "No summary yet.",
+            turns=self._format_turns(to_fold),
+            language=self.language
+        )
+
+        try:
+            response = invoke_ollama(
+                model=self.model,
+                system_prompt=system_prompt,
+                user_prompt=human_prompt
+            )
+            new_summary = parse_output(response)["response"]
+        except Exception as e:
+            log.warning("Conversation compaction failed", error=str(e))
+            return False
+
+        if not isinstance(new_summary, str) or not new_summary.strip():
+            return False
+
+        with self._lock:
+            # Only apply if nobody folded the same range in the meantime
+            if self._folded != start:
+                return False
+            self.summary = new_summary.strip()
+            self._folded = end
+        return True
+
+    def schedule_compaction(self) -> Optional[Future]:
+        """Start a background compaction if the threshold is crossed and none is running."""
+        if self._pending is not None and not self._pending.done():
+            return self._pending
+        if not self.needs_compaction():
+            return None
+        self._pending = _compaction_executor.submit(self.compact)
+        return self._pending
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for a running background compaction (used before building long prompts)."""
+        pending = self._pending
+        if pending is None:
+            return
+        try:
+            pending.result(timeout=timeout)
+        except Exception as e:
+            log.warning("Waiting for conversation compaction failed", error=str(e))
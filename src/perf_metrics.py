@@ -0,0 +1,163 @@
+import os
+import sys
+import time
+import resource
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.llm_metrics import get_metrics_run_id, get_metrics_registry
+
+# Runs kept in the store (oldest are dropped), and events kept per run and kind
+MAX_RUNS = 20
+MAX_EVENTS = 2000
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_mb() -> float:
+    """Resident memory of this process in MB (peak RSS where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * _PAGE_SIZE / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024, 1)
+
+
+@dataclass
+class RunPerformance:
+    """Timings, cache counters and memory samples of one research run."""
+    run_id: str
+    started: float = field(default_factory=time.time)
+    nodes: List[Dict[str, Any]] = field(default_factory=list)
+    retrievals: List[Dict[str, Any]] = field(default_factory=list)
+    caches: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    dropped: int = 0
+
+    def _append(self, events: List[Dict[str, Any]], event: Dict[str, Any]) -> None:
+        events.append(event)
+        if len(events) > MAX_EVENTS:
+            del events[0]
+            self.dropped += 1
+
+
+class PerformanceStore:
+    """
+    Bounded, in-process history of per-run performance data for the dashboard:
+    node durations (with the RSS after each node), retrieval latencies and cache
+    hit/miss counters. LLM throughput comes from the LLM metrics registry of the same run.
+    """
+
+    def __init__(self, max_runs: int = MAX_RUNS):
+        self.max_runs = max_runs
+        self._runs: "OrderedDict[str, RunPerformance]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _run(self, run_id: Optional[str]) -> RunPerformance:
+        # Called with the lock held
+        run_id = run_id or get_metrics_run_id()
+        run = self._runs.get(run_id)
+        if run is None:
+            run = self._runs[run_id] = RunPerformance(run_id)
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        return run
+
+    def record_node(self, node: str, start: float, wall_ms: float, error: Optional[str] = None,
+                    run_id: Optional[str] = None) -> None:
+        event = {"node": node, "start": start, "wall_ms": round(wall_ms, 3), "rss_mb": current_rss_mb(),
+                 "thread": threading.current_thread().name, "error": error}
+        with self._lock:
+            run = self._run(run_id)
+            # The run record is created when its first node ends; the timeline starts with that node
+            run.started = min(run.started, start)
+            run._append(run.nodes, event)
+
+    def record_retrieval(self, query: str, wall_ms: float, search_ms: float, k: int, results: int,
+                         run_id: Optional[str] = None) -> None:
+        event = {"query": query, "start": time.time(), "wall_ms": round(wall_ms, 3),
+                 "search_ms": round(search_ms, 3), "k": k, "results": results}
+        with self._lock:
+            run = self._run(run_id)
+            run._append(run.retrievals, event)
+
+    def record_cache(self, cache: str, hits: int = 0, misses: int = 0, run_id: Optional[str] = None) -> None:
+        if not hits and not misses:
+            return
+        with self._lock:
+            counters = self._run(run_id).caches.setdefault(cache, {"hits": 0, "misses": 0})
+            counters["hits"] += hits
+            counters["misses"] += misses
+
+    def runs(self) -> List[str]:
+        """Run ids, most recent last."""
+        with self._lock:
+            return list(self._runs)
+
+    def clear(self, run_id: Optional[str] = None) -> None:
+        with self._lock:
+            if run_id is None:
+                self._runs.clear()
+            else:
+                self._runs.pop(run_id, None)
+
+    def run_report(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Everything the dashboard shows for one run, or None for an unknown run."""
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            nodes = [dict(e) for e in run.nodes]
+            retrievals = [dict(e) for e in run.retrievals]
+            caches = {name: dict(c) for name, c in run.caches.items()}
+            started, dropped = run.started, run.dropped
+
+        llm = get_metrics_registry().run_summary(run_id)
+        llm_totals = llm["totals"]
+        if llm_totals["calls"]:
+            # A request that found its model resident counts as a hit
+            caches["llm_model"] = {"hits": llm_totals["calls"] - llm_totals["reloads"], "misses": llm_totals["reloads"]}
+        for counters in caches.values():
+            total = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = round(counters["hits"] / total, 3) if total else None
+
+        for event in nodes:
+            event["offset_ms"] = round((event["start"] - started) * 1000, 3)
+        latencies = sorted(e["wall_ms"] for e in retrievals)
+        return {
+            "run_id": run_id,
+            "started": started,
+            "nodes": nodes,
+            "retrievals": retrievals,
+            "retrieval_latency": summarize_latencies(latencies),
+            "caches": caches,
+            "llm_models": llm["models"],
+            "memory": {
+                "current_rss_mb": current_rss_mb(),
+                "peak_node_rss_mb": max((e["rss_mb"] for e in nodes), default=None),
+            },
+            "dropped_events": dropped,
+        }
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, Optional[float]]:
+    """count, mean, p50, p90 and max of a list of latencies in ms."""
+    if not values:
+        return {"count": 0, "mean": None, "p50": None, "p90": None, "max": None}
+    values = sorted(values)
+
+    def pct(p):
+        return round(values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))], 3)
+
+    return {"count": len(values), "mean": round(sum(values) / len(values), 3), "p50": pct(50), "p90": pct(90),
+            "max": round(values[-1], 3)}
+
+
+_store = PerformanceStore()
+
+
+def get_performance_store() -> PerformanceStore:
+    return _store
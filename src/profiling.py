@@ -0,0 +1,180 @@
+import io
+import os
+import re
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Set
+from src.logger import get_logger
+
+log = get_logger("profiling")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROFILE_DIR = os.path.join(PROJECT_ROOT, '.cache', 'profiles')
+
+# Profiled by default: embedding model construction and report prompt building
+DEFAULT_PROFILE_TARGETS = "get_embedding_model,generate_final_answer_prompt"
+
+# Lines of the pstats listing and allocation sites written per profile
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+_sequence_lock = threading.Lock()
+_sequence = 0
+_active = threading.local()
+
+
+def get_profile_targets() -> Optional[Set[str]]:
+    """
+    Names of the nodes/functions to profile, or None when profiling is off.
+
+    RESEARCH_PROFILE overrides the configuration: "0" turns profiling off, "1" profiles
+    the configured targets, anything else is a comma separated list of names ("*" = all).
+    """
+    env = os.environ.get("RESEARCH_PROFILE", "").strip()
+    from src.configuration import get_config_instance
+    conf = get_config_instance()
+    if env.lower() in ("0", "false", "off"):
+        return None
+    if env and env.lower() not in ("1", "true", "on"):
+        targets = env
+    elif env or conf.enable_profiling:
+        targets = conf.profile_targets or DEFAULT_PROFILE_TARGETS
+    else:
+        return None
+    return {t.strip() for t in targets.split(",") if t.strip()}
+
+
+def should_profile(name: str) -> bool:
+    targets = get_profile_targets()
+    return bool(targets) and ("*" in targets or name in targets)
+
+
+def get_profile_dir(run_id: Optional[str] = None) -> str:
+    """Directory of the profiles of a run (RESEARCH_PROFILE_DIR or the configured profile_dir)."""
+    from src.configuration import get_config_instance
+    from src.llm_metrics import get_metrics_run_id
+    base = os.environ.get("RESEARCH_PROFILE_DIR") or get_config_instance().profile_dir or DEFAULT_PROFILE_DIR
+    run_id = re.sub(r"[^\w.-]", "_", run_id or get_metrics_run_id())
+    return os.path.join(base, run_id)
+
+
+def _start_tracemalloc() -> None:
+    # Shared by concurrently profiled blocks; left alone if it was started elsewhere (python -X tracemalloc)
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+def _next_sequence() -> int:
+    global _sequence
+    with _sequence_lock:
+        _sequence += 1
+        return _sequence
+
+
+def _write_profile(name: str, profiler: Optional[cProfile.Profile], allocations, wall_ms: float,
+                   peak_kb: float, note: Optional[str]) -> Dict[str, Any]:
+    profile_dir = get_profile_dir()
+    os.makedirs(profile_dir, exist_ok=True)
+    prefix = os.path.join(profile_dir, f"{time.strftime('%H%M%S')}_{_next_sequence():03d}_{name}")
+    entry: Dict[str, Any] = {"target": name, "wall_ms": round(wall_ms, 3), "traced_peak_kb": round(peak_kb, 1),
+                             "thread": threading.current_thread().name, "note": note}
+
+    if profiler is not None:
+        # .prof loads into pstats, snakeviz or gprof2dot
+        profiler.dump_stats(prefix + ".prof")
+        text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=text)
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+        stats.sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+        with open(prefix + ".txt", "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        entry["profile"] = prefix + ".prof"
+
+    lines = [f"Top {TOP_ALLOCATIONS} allocation sites of {name} (net size after the call, KiB)"]
+    top = []
+    for stat in allocations[:TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        top.append({"site": f"{frame.filename}:{frame.lineno}", "size_kb": round(stat.size_diff / 1024, 1),
+                    "count": stat.count_diff})
+        lines.append(f"{stat.size_diff / 1024:10.1f} KiB {stat.count_diff:8d} blocks  {frame.filename}:{frame.lineno}")
+    with open(prefix + ".alloc.txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    entry["allocations"] = top[:5]
+
+    with open(os.path.join(profile_dir, "summary.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+@contextmanager
+def _profile_block(name: str):
+    profiler, note = None, None
+    outer = getattr(_active, "name", None)
+    _start_tracemalloc()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    t0 = time.perf_counter()
+    if outer is not None:
+        # A second profiler would replace the outer one on this thread
+        note = f"nested in {outer}, see its profile for the call graph"
+    else:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            _active.name = name
+        except ValueError as e:
+            # Only one cProfile can be active per process from Python 3.12
+            profiler, note = None, f"cProfile unavailable: {e}"
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _active.name = None
+        wall_ms = (time.perf_counter() - t0) * 1000
+        after = tracemalloc.take_snapshot()
+        peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        _stop_tracemalloc()
+        # Allocations of concurrently running nodes are included as well
+        allocations = [s for s in after.compare_to(before, "lineno") if s.size_diff > 0]
+        try:
+            _write_profile(name, profiler, allocations, wall_ms, peak_kb, note)
+            log.info("Profile written", target=name, wall_ms=round(wall_ms), path=get_profile_dir())
+        except OSError as e:
+            log.warning("Could not write profile", target=name, error=str(e))
+
+
+def profile_block(name: str):
+    """Profile a block with cProfile and tracemalloc if `name` is a profiling target (no-op otherwise)."""
+    return _profile_block(name) if should_profile(name) else nullcontext()
+
+
+def profiled(fn: Callable) -> Callable:
+    """Decorator: profile calls of `fn` when its name is a profiling target."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with profile_block(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
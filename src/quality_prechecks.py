@@ -0,0 +1,183 @@
+import re
+from typing import List, Dict, Any, Optional
+
+from src.utils import split_sentences
+from src.logger import get_logger
+
+log = get_logger("quality_prechecks")
+
+# Small stopword lists, enough to tell the supported report languages apart
+LANGUAGE_STOPWORDS = {
+    "English": {"the", "and", "of", "to", "is", "in", "that", "for", "with", "are", "this", "on", "be", "as", "by"},
+    "German": {"der", "die", "das", "und", "ist", "nicht", "mit", "den", "von", "für", "auf", "ein", "eine", "zu", "im"},
+    "French": {"le", "la", "les", "et", "est", "des", "une", "du", "pour", "dans", "que", "sur", "pas", "par", "au"},
+    "Spanish": {"el", "la", "los", "las", "y", "es", "de", "que", "en", "una", "por", "para", "con", "del", "se"},
+    "Italian": {"il", "la", "di", "che", "e", "è", "per", "una", "con", "non", "sono", "del", "della", "nel", "gli"},
+    "Dutch": {"de", "het", "een", "en", "van", "is", "dat", "op", "te", "voor", "met", "zijn", "niet", "aan", "ook"},
+    "Portuguese": {"o", "a", "os", "as", "e", "de", "que", "em", "um", "uma", "para", "com", "não", "do", "da"},
+}
+
+_NUMBER_RE = re.compile(r'(?<![\w.,])\d+(?:[.,]\d+)*')
+_FIDELITY_RE = re.compile(r'Information Fidelity Score:.*', re.IGNORECASE)
+# [Source_filename] citations as asked for by the prompts, and plain [filename.ext] references
+_CITATION_RE = re.compile(r'\[(Source_[^\[\]\n]+|[^\[\]\n]+?\.[A-Za-z0-9]{2,5})\]')
+
+
+def _number_variants(raw: str) -> List[str]:
+    """Normalize a number token so '1,5' / '1.5' and '1,000' / '1000' compare equal."""
+    raw = raw.rstrip(".,")
+    variants = {raw, raw.replace(",", "."), raw.replace(".", ","), raw.replace(",", "").replace(".", "")}
+    return [v for v in variants if v]
+
+
+def extract_numbers(text: str) -> List[str]:
+    """Extract number tokens, ignoring single digits (list markers, scores, section numbers)."""
+    text = _FIDELITY_RE.sub("", text or "")
+    return [m.rstrip(".,") for m in _NUMBER_RE.findall(text) if len(m.rstrip(".,").replace(".", "").replace(",", "")) > 1]
+
+
+def check_numbers(report: str, summaries_text: str) -> Dict[str, Any]:
+    """Every number in the report should also appear in some summary."""
+    report_numbers = extract_numbers(report)
+    known = set()
+    for n in extract_numbers(summaries_text):
+        known.update(_number_variants(n))
+    ungrounded = sorted({n for n in report_numbers if not any(v in known for v in _number_variants(n))})
+    total = len(set(report_numbers))
+    score = 1.0 if total == 0 else 1.0 - len(ungrounded) / total
+    return {"score": round(score, 3), "total": total, "ungrounded": ungrounded}
+
+
+def check_sections(report: str, section_titles: List[str]) -> Dict[str, Any]:
+    """
+    Required sections of the report structure must be present as headings.
+    Reports in other languages may translate the headings, so a report with at least as
+    many top-level headings as required sections is accepted as well.
+    """
+    headings = [h.strip().lower() for h in re.findall(r'^\s*#{1,2}\s*(.+?)\s*$', report or "", re.MULTILINE)]
+    missing = [t for t in section_titles if t.lower() not in headings]
+    passed = not missing or len(headings) >= len(section_titles)
+    return {"passed": passed, "missing": missing, "heading_count": len(headings)}
+
+
+def extract_citations(text: str) -> List[str]:
+    """Cited source names, normalized ('[Source_Radon.pdf]' and '[radon.pdf]' -> 'radon.pdf')."""
+    names = []
+    for raw in _CITATION_RE.findall(text or ""):
+        name = raw.strip()
+        if name.startswith("Source_"):
+            name = name[len("Source_"):]
+        names.append(name.replace("\\", "/").rsplit("/", 1)[-1].lower())
+    return names
+
+
+def check_citations(report: str, summaries_text: str) -> Dict[str, Any]:
+    """
+    The report should cite its sources, and only sources cited in the summaries.
+    Not decidable (passed None) if the summaries cite nothing.
+    """
+    cited = set(extract_citations(report))
+    known = set(extract_citations(summaries_text))
+    if not known:
+        return {"passed": None, "cited": len(cited), "unknown": []}
+    unknown = sorted(cited - known)
+    return {"passed": bool(cited) and not unknown, "cited": len(cited), "unknown": unknown}
+
+
+def guess_language(text: str) -> Optional[str]:
+    """Guess the language of a text from stopword frequencies (None if undecidable)."""
+    words = re.findall(r'[^\W\d_]+', (text or "").lower())
+    if len(words) < 20:
+        return None
+    counts = {lang: sum(1 for w in words if w in stopwords) for lang, stopwords in LANGUAGE_STOPWORDS.items()}
+    best = max(counts, key=counts.get)
+    return best if counts[best] > 0 else None
+
+
+def check_language(report: str, detected_language: str) -> Dict[str, Any]:
+    """The report language should match the detected query language."""
+    guessed = guess_language(report)
+    if guessed is None or detected_language not in LANGUAGE_STOPWORDS:
+        # Not decidable deterministically
+        return {"passed": None, "guessed": guessed}
+    return {"passed": guessed == detected_language, "guessed": guessed}
+
+
+def check_grounding(report: str, summaries: List[str], threshold: float = 0.6,
+                    max_claims: int = 200, embeddings=None) -> Dict[str, Any]:
+    """
+    Share of report claims (sentences) whose most similar summary sentence has a
+    cosine similarity >= threshold. Claims and summary sentences are embedded in one batch.
+    """
+    # Treat every non-heading markdown line as its own paragraph
+    body = "\n\n".join(
+        line for line in (report or "").splitlines()
+        if line.strip() and not line.lstrip().startswith("#") and not _FIDELITY_RE.match(line.strip())
+    )
+    claims = [s for s in split_sentences(body) if len(s) >= 30][:max_claims]
+    evidence = [s for text in summaries for s in split_sentences(text) if len(s) >= 15]
+    if not claims or not evidence:
+        return {"share": None, "claims": len(claims)}
+
+    from src.similarity import embed_texts
+    vectors = embed_texts(claims + evidence, embeddings=embeddings)
+    best = (vectors[:len(claims)] @ vectors[len(claims):].T).max(axis=1)
+    grounded = int((best >= threshold).sum())
+    return {"share": round(grounded / len(claims), 3), "claims": len(claims), "grounded": grounded}
+
+
+def run_prechecks(report: str, summaries: List[str], section_titles: List[str], detected_language: str,
+                  grounding_threshold: float = 0.6, pass_share: float = 0.8, fail_share: float = 0.4,
+                  embeddings=None) -> Dict[str, Any]:
+    """
+    Run all deterministic pre-checks and classify the report.
+
+    Returns:
+        Dict with the individual check results, a list of `issues` and a `verdict` of
+        "pass" (skip the LLM checker), "fail" (reflect without the LLM checker) or
+        "borderline" (run the LLM checker).
+    """
+    numbers = check_numbers(report, "\n".join(summaries))
+    citations = check_citations(report, "\n".join(summaries))
+    sections = check_sections(report, section_titles)
+    language = check_language(report, detected_language)
+    try:
+        grounding = check_grounding(report, summaries, threshold=grounding_threshold, embeddings=embeddings)
+    except Exception as e:
+        log.warning("Grounding pre-check failed", error=str(e))
+        grounding = {"share": None, "error": str(e)}
+
+    issues = []
+    if numbers["ungrounded"]:
+        issues.append(f"Numbers not found in any source summary: {', '.join(numbers['ungrounded'][:10])}")
+    if citations["passed"] is False:
+        if citations["unknown"]:
+            issues.append(f"Citations not found in any source summary: {', '.join(citations['unknown'][:10])}")
+        else:
+            issues.append("The report does not cite any of its sources")
+    if not sections["passed"]:
+        issues.append(f"Missing report sections: {', '.join(sections['missing'])}")
+    if language["passed"] is False:
+        issues.append(f"Report appears to be written in {language['guessed']} instead of {detected_language}")
+    share = grounding.get("share")
+    if share is not None and share < pass_share:
+        issues.append(f"Only {share:.0%} of the claims are grounded in the source summaries")
+
+    # The stopword language guess alone is too weak to fail a report; it leaves the report borderline
+    if not sections["passed"] or numbers["score"] < 0.5 or (share is not None and share < fail_share):
+        verdict = "fail"
+    elif (language["passed"] is not False and citations["passed"] is not False and numbers["score"] >= 0.95
+            and share is not None and share >= pass_share):
+        verdict = "pass"
+    else:
+        verdict = "borderline"
+
+    return {
+        "verdict": verdict,
+        "issues": issues,
+        "numbers": numbers,
+        "citations": citations,
+        "sections": sections,
+        "language": language,
+        "grounding": grounding,
+    }
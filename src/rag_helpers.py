@@ -2,8 +2,15 @@ import os
 import re
 from typing import List, Dict, Any
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_community.llms import Ollama
 from src.prompts import SUMMARIZER_SYSTEM_PROMPT, SUMMARIZER_HUMAN_PROMPT
+from src.cancellation import get_cancellation_token, run_cancellable
+from src.tracing import span, current_span
+from src.llm_metrics import OllamaMetrics, OllamaMetricsCallback, LLMResult, record_llm_metrics
+from src.perf_metrics import get_performance_store
+from src.cassette import through_cassette
+from src.logger import get_logger
+
+log = get_logger("rag_helpers")
 
 def load_models_from_file(file_path: str) -> List[str]:
     """
@@ -85,9 +92,29 @@ def extract_embedding_model(db_dir_name):
     model_name = model_name.replace("--", "/")
     return model_name
 
+def _stream_llm_text(llm, messages, token, config=None):
+    """Stream an LLM completion, closing the stream (and its HTTP response) when the run is cancelled."""
+    chunks = []
+    stream = llm.stream(messages, config=config)
+    try:
+        for chunk in stream:
+            token.raise_if_cancelled()
+            chunks.append(chunk)
+    finally:
+        stream.close()
+    return "".join(chunks)
+
 def source_summarizer_ollama(user_query, context_documents, language, system_message, llm_model="deepseek-r1", human_feedback=""):
-    print(f"Generating summary using language: {language}")
-    print(f"  [DEBUG] Actually using summarization model in source_summarizer_ollama: {llm_model}")
+    return source_summarizer_ollama_with_metrics(
+        user_query, context_documents, language, system_message, llm_model, human_feedback
+    ).output
+
+def source_summarizer_ollama_with_metrics(user_query, context_documents, language, system_message, llm_model="deepseek-r1", human_feedback=""):
+    """
+    Like source_summarizer_ollama, but return an LLMResult with the summary and the
+    server-side timing metrics of the response (also recorded in the LLM metrics registry).
+    """
+    log.debug("Generating summary", language=language, model=llm_model)
     
     if not language or not isinstance(language, str):
         language = "English"
@@ -95,7 +122,7 @@ def source_summarizer_ollama(user_query, context_documents, language, system_mes
     try:
         system_message = SUMMARIZER_SYSTEM_PROMPT.format(language=language)
     except Exception as e:
-        print(f"  [ERROR] Error formatting system prompt with language '{language}': {str(e)}")
+        log.error("Error formatting system prompt", language=language, error=str(e))
         language = "English"
         system_message = SUMMARIZER_SYSTEM_PROMPT.format(language=language)
 
@@ -117,14 +144,40 @@ def source_summarizer_ollama(user_query, context_documents, language, system_mes
         language=language
     )
     
-    llm = Ollama(model=llm_model, temperature=0.1, repeat_penalty=1.2) 
+    from src.utils import get_ollama_base_url, estimate_tokens
+    from langchain_community.llms import Ollama
+    llm = Ollama(model=llm_model, base_url=get_ollama_base_url(), temperature=0.1, repeat_penalty=1.2)
     
     messages = [
         SystemMessage(content=system_message),
         HumanMessage(content=prompt)
     ]
     
-    response = llm.invoke(messages)
+    token = get_cancellation_token()
+    # The timing fields of the final Ollama chunk end up in the generation_info seen by callbacks
+    metrics_callback = OllamaMetricsCallback(model=llm_model)
+    llm_config = {"callbacks": [metrics_callback]}
+    
+    def summarize():
+        if token is None:
+            text = llm.invoke(messages, config=llm_config)
+        else:
+            # Returns as soon as the run is cancelled; the stream stops at its next chunk
+            token.raise_if_cancelled()
+            text = run_cancellable(_stream_llm_text, llm, messages, token, llm_config)
+        return {"content": text, "timing": metrics_callback.timing}
+    
+    with span("source_summarizer_ollama", "summarizer", model=llm_model,
+              input_tokens=estimate_tokens(system_message) + estimate_tokens(prompt)) as current:
+        # Recorded or replayed when a cassette is active (see src/cassette.py)
+        result = through_cassette(
+            "summarizer", {"model": llm_model, "system": system_message, "prompt": prompt}, summarize,
+            describe={"model": llm_model, "prompt_chars": len(system_message) + len(prompt)}
+        )
+        response = result["content"]
+        current.set(output_tokens=estimate_tokens(response))
+        metrics = record_llm_metrics(OllamaMetrics.from_response(result["timing"], model=llm_model)
+                                     if result["timing"] else OllamaMetrics(model=llm_model))
     
     # Clean markdown formatting if present
     try:
@@ -132,18 +185,120 @@ def source_summarizer_ollama(user_query, context_documents, language, system_mes
     except:
         final_content = response.strip()
 
-    return final_content
+    return LLMResult(final_content, metrics)
 
-def linkify_sources(text, selected_database=None, kb_path="./kb"):
+def resolve_source_path(metadata, selected_database=None):
+    """
+    Resolve the file path of a document source from its metadata via the KB catalog
+    (falls back to the explicit 'path', then to the 'files' directory next to the working directory).
     """
-    Convert source references like [Filename.pdf] to clickable links or base64 data URIs.
-    For this implementation, we will keep it simple and just return the text, 
-    or basic markdown links if we can resolve them.
+    from src.kb_catalog import get_catalog
+    if selected_database is None:
+        from src.configuration import get_config_instance
+        selected_database = get_config_instance().selected_database
+    
+    source = metadata.get('source', 'Unknown source')
+    entry = get_catalog(selected_database).resolve(source=source, path=metadata.get('path'))
+    if entry:
+        return entry["path"]
+    if metadata.get('path'):
+        return metadata['path']
+    return os.path.abspath(os.path.join(os.getcwd(), 'files', os.path.basename(source)))
+
+def linkify_sources(text, selected_database=None, kb_path="./kb", documents=None):
     """
-    # This is a simplified placeholder. 
-    # The full implementation requires resolving PDF paths and potentially creating base64 data URIs
-    # which is UI specific. 
-    return text
+    Convert source references like [Filename.pdf] to markdown links [Filename.pdf](path).
+    Paths are resolved through the KB catalog of `selected_database` (see src/kb_catalog.py)
+    and the metadata of `documents`. References that are already links are left untouched.
+    """
+    if not text:
+        return text
+    
+    paths = {}
+    for doc in documents or []:
+        source = doc.metadata.get('source')
+        if source:
+            paths.setdefault(os.path.basename(source), resolve_source_path(doc.metadata, selected_database))
+    
+    def _link(match):
+        name = match.group(1)
+        filename = os.path.basename(name)
+        path = paths.get(filename) or resolve_source_path({'source': filename}, selected_database)
+        return f"[{filename}]({path})"
+    
+    # [name.ext] not followed by "(" (already a link)
+    return re.sub(r'\[([^\[\]\n]+?\.[A-Za-z0-9]{2,5})\](?!\()', _link, text)
+
+def link_sources_by_embedding(text, documents, threshold=0.6, embeddings=None, selected_database=None):
+    """
+    Ground every sentence of a report in the retrieved chunks and attach source links.
+    
+    Report sentences are embedded in one batch and matched against the chunk embeddings
+    cached during retrieval (missing ones are embedded in one extra batch) with a single
+    vectorized top-1 cosine. Sentences with a similarity >= threshold get a link to the
+    best matching source appended, unless they already cite that source.
+    
+    Returns:
+        Tuple of (linked_text, grounding) where grounding is a list of
+        {"sentence", "source", "path", "score", "linked"} dicts.
+    """
+    import numpy as np
+    from src.utils import split_sentences
+    from src.similarity import embed_texts, normalize_rows
+    from src.vector_db import get_cached_chunk_embeddings, get_chunk_key
+    
+    # Unique chunks
+    chunks = list({get_chunk_key(doc): doc for doc in documents}.values())
+    lines = text.splitlines()
+    sentences = []  # (line index, sentence)
+    for i, line in enumerate(lines):
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        for sentence in split_sentences(line):
+            if len(sentence) >= 20:
+                sentences.append((i, sentence))
+    if not chunks or not sentences:
+        return text, []
+    
+    if embeddings is None:
+        from src.vector_db import get_embedding_model
+        embeddings = get_embedding_model()
+    
+    cached = get_cached_chunk_embeddings(chunks)
+    missing = [i for i, emb in enumerate(cached) if emb is None]
+    current_span().add("embedding_cache_hits", len(chunks) - len(missing))
+    current_span().add("embedding_cache_misses", len(missing))
+    get_performance_store().record_cache("chunk_embeddings", len(chunks) - len(missing), len(missing))
+    if missing:
+        fresh = embed_texts([chunks[i].page_content for i in missing], embeddings=embeddings)
+        for row, i in enumerate(missing):
+            cached[i] = fresh[row]
+    chunk_matrix = normalize_rows(np.vstack([np.asarray(e, dtype=np.float32) for e in cached]))
+    sentence_matrix = embed_texts([s for _, s in sentences], embeddings=embeddings)
+    
+    sims = sentence_matrix @ chunk_matrix.T
+    best = sims.argmax(axis=1)
+    best_scores = sims[np.arange(len(sentences)), best]
+    
+    grounding = []
+    for (line_idx, sentence), chunk_idx, score in zip(sentences, best, best_scores):
+        metadata = chunks[chunk_idx].metadata
+        filename = os.path.basename(metadata.get('source', 'Unknown source'))
+        path = resolve_source_path(metadata, selected_database)
+        linked = bool(score >= threshold)
+        if linked and filename not in sentence:
+            # Place the link before the closing punctuation
+            body, end = (sentence[:-1], sentence[-1]) if sentence[-1] in '.!?' else (sentence, '')
+            lines[line_idx] = lines[line_idx].replace(sentence, f"{body} [{filename}]({path}){end}", 1)
+        grounding.append({
+            "sentence": sentence,
+            "source": filename,
+            "path": path,
+            "score": round(float(score), 4),
+            "linked": linked
+        })
+    
+    return "\n".join(lines), grounding
 
 def get_license_content() -> str:
     """
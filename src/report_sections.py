@@ -0,0 +1,223 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+from src.utils import invoke_ollama, parse_output, split_sentences, ReportCoherence
+from src.cancellation import ResearchCancelled, submit_in_scope, wait_for_futures
+from src.prompts import (
+    REPORT_SECTION_WRITER_SYSTEM_PROMPT, REPORT_SECTION_WRITER_HUMAN_PROMPT,
+    REPORT_COHERENCE_SYSTEM_PROMPT, REPORT_COHERENCE_HUMAN_PROMPT
+)
+from src.logger import get_logger
+
+log = get_logger("report_sections")
+
+
+def parse_report_structure(report_structure: str) -> List[Dict[str, str]]:
+    """
+    Parse a markdown report template into sections.
+
+    Returns:
+        List of {"title", "guidance"} in template order.
+    """
+    sections = []
+    for line in report_structure.splitlines():
+        heading = re.match(r'^\s*#+\s*(.+?)\s*$', line)
+        if heading:
+            sections.append({"title": heading.group(1), "guidance": ""})
+        elif sections and line.strip():
+            sections[-1]["guidance"] += line.strip() + "\n"
+    for section in sections:
+        section["guidance"] = section["guidance"].strip()
+    return sections
+
+
+def split_report_into_sections(report: str, titles: List[str]) -> Dict[str, str]:
+    """
+    Split a generated markdown report back into section bodies by its top-level headings.
+    Only headings matching one of `titles` (case-insensitive) start a new section.
+    """
+    wanted = {t.lower(): t for t in titles}
+    sections: Dict[str, str] = {}
+    current = None
+    lines: List[str] = []
+    for line in report.splitlines():
+        heading = re.match(r'^\s*#{1,2}\s*(.+?)\s*$', line)
+        if heading and heading.group(1).strip().lower() in wanted:
+            if current is not None:
+                sections[current] = "\n".join(lines).strip()
+            current = wanted[heading.group(1).strip().lower()]
+            lines = []
+        elif current is not None:
+            lines.append(line)
+    if current is not None:
+        sections[current] = "\n".join(lines).strip()
+    return sections
+
+
+def route_summaries_to_sections(sections: List[Dict[str, str]], summaries: List[Dict[str, str]],
+                                min_per_section: int = 2, threshold: float = 0.35,
+                                embeddings=None) -> Dict[str, List[int]]:
+    """
+    Assign summaries to the report sections they are relevant for.
+
+    Section descriptions (title + guidance) and summaries are embedded in one batch.
+    A summary is routed to its best matching section, to every section with a cosine
+    similarity >= threshold, and each section receives at least its `min_per_section`
+    most similar summaries. If embedding fails, every section receives all summaries.
+
+    Returns:
+        Mapping of section title -> list of summary indices (in original order).
+    """
+    all_ids = list(range(len(summaries)))
+    if not sections or not summaries:
+        return {s["title"]: all_ids for s in sections}
+
+    try:
+        from src.similarity import embed_texts
+        texts = [f"{s['title']}\n{s['guidance']}" for s in sections]
+        texts += [f"{s['query']}\n{s['summary']}" for s in summaries]
+        vectors = embed_texts(texts, embeddings=embeddings)
+        sims = vectors[len(sections):] @ vectors[:len(sections)].T  # summaries x sections
+    except Exception as e:
+        log.warning("Section routing failed, routing all summaries to all sections", error=str(e))
+        return {s["title"]: all_ids for s in sections}
+
+    routed = {s["title"]: set() for s in sections}
+    best_section = sims.argmax(axis=1)
+    for summary_idx in all_ids:
+        routed[sections[best_section[summary_idx]]["title"]].add(summary_idx)
+        for section_idx, section in enumerate(sections):
+            if sims[summary_idx, section_idx] >= threshold:
+                routed[section["title"]].add(summary_idx)
+    for section_idx, section in enumerate(sections):
+        top = sims[:, section_idx].argsort()[::-1][:min_per_section]
+        routed[section["title"]].update(int(i) for i in top)
+
+    return {title: sorted(ids) for title, ids in routed.items()}
+
+
+def _format_information(summaries: List[Dict[str, str]], ids: List[int]) -> str:
+    return "\n\n".join(
+        f"Query: {summaries[i]['query']}\nSummary: {summaries[i]['summary']}\n" for i in ids
+    )
+
+
+def generate_section(section: Dict[str, str], outline: str, information: str, user_query: str,
+                     language: str, report_llm: str, guidance: Optional[str] = None) -> str:
+    """Generate a single report section body (without heading)."""
+    section_guidance = section["guidance"] or "No specific guidance."
+    if guidance:
+        section_guidance += f"\n\nIssues to fix from the previous version of this section:\n{guidance}"
+
+    response = invoke_ollama(
+        model=report_llm,
+        system_prompt=REPORT_SECTION_WRITER_SYSTEM_PROMPT.format(language=language),
+        user_prompt=REPORT_SECTION_WRITER_HUMAN_PROMPT.format(
+            instruction=user_query,
+            outline=outline,
+            section_title=section["title"],
+            section_guidance=section_guidance,
+            information=information if information else "No information available for this section.",
+            language=language
+        )
+    )
+    body = parse_output(response)["response"]
+    if not isinstance(body, str):
+        body = str(body)
+    # Drop a repeated heading if the model added one anyway
+    body = re.sub(r'^\s*#+\s*' + re.escape(section["title"]) + r'\s*\n', '', body, flags=re.IGNORECASE)
+    return body.strip()
+
+
+def generate_sections_parallel(sections: List[Dict[str, str]], summaries: List[Dict[str, str]],
+                               user_query: str, language: str, report_llm: str,
+                               max_parallel: int = 2, min_per_section: int = 2,
+                               threshold: float = 0.35, guidance: Optional[Dict[str, str]] = None,
+                               only: Optional[List[str]] = None, embeddings=None) -> Dict[str, str]:
+    """
+    Route summaries to sections and generate the sections concurrently.
+
+    Args:
+        sections: Parsed report structure (see `parse_report_structure`).
+        summaries: List of {"query", "summary"}.
+        max_parallel: Upper bound of concurrent LLM requests against Ollama.
+        guidance: Optional issues per section title, passed to the section writer.
+        only: Optional subset of section titles to generate; routing still considers all sections.
+
+    Returns:
+        Mapping of section title -> section body, in template order.
+    """
+    routing = route_summaries_to_sections(
+        sections, summaries, min_per_section=min_per_section, threshold=threshold, embeddings=embeddings
+    )
+    outline = "\n".join(f"- {s['title']}" for s in sections)
+    guidance = guidance or {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix="report-section") as executor:
+        futures = {
+            section["title"]: submit_in_scope(
+                executor,
+                generate_section,
+                section,
+                outline,
+                _format_information(summaries, routing.get(section["title"], [])),
+                user_query,
+                language,
+                report_llm,
+                guidance.get(section["title"])
+            )
+            for section in sections
+            if only is None or section["title"] in only
+        }
+        try:
+            wait_for_futures(futures.values())
+        except ResearchCancelled as e:
+            finished = {title: f.result() for title, f in futures.items()
+                        if f.done() and not f.cancelled() and f.exception() is None}
+            raise ResearchCancelled(str(e), partial={"report_sections": finished}) from None
+        return {title: future.result() for title, future in futures.items()}
+
+
+def apply_coherence_pass(section_bodies: Dict[str, str], user_query: str, language: str,
+                         report_llm: str) -> Dict[str, str]:
+    """
+    Short coherence pass over independently generated sections: the LLM only sees the
+    first and last sentences of every section and returns at most one bridging sentence
+    per section, which is prepended to that section. Failures leave the sections unchanged.
+    """
+    titles = list(section_bodies.keys())
+    if len(titles) < 2:
+        return section_bodies
+
+    digest_parts = []
+    for title in titles:
+        sentences = split_sentences(section_bodies[title])
+        opening = " ".join(sentences[:2])
+        ending = " ".join(sentences[-2:]) if len(sentences) > 2 else ""
+        digest_parts.append(f"## {title}\nOpening: {opening}\nEnding: {ending}")
+
+    try:
+        result = invoke_ollama(
+            model=report_llm,
+            system_prompt=REPORT_COHERENCE_SYSTEM_PROMPT.format(language=language),
+            user_prompt=REPORT_COHERENCE_HUMAN_PROMPT.format(
+                instruction=user_query,
+                section_digest="\n\n".join(digest_parts)
+            ),
+            output_format=ReportCoherence
+        )
+    except Exception as e:
+        log.warning("Coherence pass failed, stitching sections unchanged", error=str(e))
+        return section_bodies
+
+    updated = dict(section_bodies)
+    for item in result.transitions:
+        if item.section in updated and item.section != titles[0] and item.transition.strip():
+            updated[item.section] = f"{item.transition.strip()}\n\n{updated[item.section]}"
+    return updated
+
+
+def stitch_sections(section_bodies: Dict[str, str]) -> str:
+    """Join section bodies into a markdown report with one top-level heading per section."""
+    return "\n\n".join(f"# {title}\n\n{body}" for title, body in section_bodies.items())
@@ -0,0 +1,96 @@
+from typing import List, Dict, Any, Tuple
+import numpy as np
+
+
+def normalize_rows(matrix) -> np.ndarray:
+    """L2-normalize the rows of a matrix so dot products are cosine similarities."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarity_matrix(a, b) -> np.ndarray:
+    """Pairwise cosine similarity between the rows of `a` and the rows of `b`."""
+    return normalize_rows(a) @ normalize_rows(b).T
+
+
+def embed_texts(texts: List[str], embeddings=None) -> np.ndarray:
+    """
+    Embed a list of texts in a single batch and return a row-normalized matrix.
+
+    Args:
+        texts: Texts to embed.
+        embeddings: Optional LangChain embeddings instance, defaults to the configured model.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    if embeddings is None:
+        from src.vector_db import get_embedding_model
+        embeddings = get_embedding_model()
+    from src.tracing import span
+    with span("embed_texts", "embedding", texts=len(texts), input_tokens=sum(len(t) for t in texts) // 4):
+        return normalize_rows(embeddings.embed_documents(list(texts)))
+
+
+def cluster_by_similarity(vectors: np.ndarray, threshold: float) -> List[Tuple[int, List[int]]]:
+    """
+    Greedy leader clustering: rows are visited in order, each row joins the most similar
+    existing representative if the cosine similarity is >= threshold, otherwise it becomes
+    a new representative. Earlier rows are therefore always kept as representatives.
+
+    Returns:
+        List of (representative_index, member_indices) with members excluding the representative.
+    """
+    sims = vectors @ vectors.T
+    representatives: List[int] = []
+    members: Dict[int, List[int]] = {}
+    for i in range(len(vectors)):
+        if representatives:
+            rep_sims = sims[i, representatives]
+            best = int(np.argmax(rep_sims))
+            if rep_sims[best] >= threshold:
+                members[representatives[best]].append(i)
+                continue
+        representatives.append(i)
+        members[i] = []
+    return [(rep, members[rep]) for rep in representatives]
+
+
+def deduplicate_queries(queries: List[str], threshold: float = 0.9,
+                        embeddings=None) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Remove semantically duplicated queries, keeping one representative per cluster.
+    The first query (the original user query) is always kept.
+
+    Returns:
+        Tuple of (kept_queries, dropped) where dropped holds dicts with
+        'query', 'duplicate_of' and 'similarity'.
+    """
+    # Exact duplicates never need an embedding
+    unique, dropped = [], []
+    for q in queries:
+        if not q or not q.strip():
+            continue
+        if q in unique:
+            dropped.append({"query": q, "duplicate_of": q, "similarity": 1.0})
+        else:
+            unique.append(q)
+    if len(unique) < 2:
+        return unique, dropped
+
+    vectors = embed_texts(unique, embeddings=embeddings)
+    sims = vectors @ vectors.T
+
+    kept = []
+    for rep, member_ids in cluster_by_similarity(vectors, threshold):
+        kept.append(unique[rep])
+        for m in member_ids:
+            dropped.append({
+                "query": unique[m],
+                "duplicate_of": unique[rep],
+                "similarity": round(float(sims[m, rep]), 4)
+            })
+    return kept, dropped
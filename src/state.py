@@ -1,7 +1,14 @@
 import operator
 from typing import Annotated, List, Dict, Any, Optional
 from typing_extensions import TypedDict
-from langchain_core.documents import Document
+
+class DocumentRef(TypedDict):
+    """
+    Reference to a document in the content-addressed store (src.document_store).
+    The state carries only ids and retrieval scores; the text is fetched when needed.
+    """
+    doc_id: str
+    score: Optional[float]
 
 class ResearcherState(TypedDict):
     """
@@ -19,9 +26,9 @@ class ResearcherState(TypedDict):
     research_queries: List[str]  # List of sub-questions/tasks
     
     # Execution / Subagent Outputs
-    # We aggregate documents from all sub-tasks
-    retrieved_documents: Dict[str, List[Document]] 
-    search_summaries: Dict[str, List[Document]]
+    # We aggregate documents from all sub-tasks (as references into the document store)
+    retrieved_documents: Dict[str, List[DocumentRef]]
+    search_summaries: Dict[str, List[DocumentRef]]
     
     # Web Search (Optional)
     web_search_enabled: bool
@@ -30,9 +37,12 @@ class ResearcherState(TypedDict):
     # Reporting
     final_answer: str
     linked_final_answer: Optional[str]
+    source_grounding: List[Dict[str, Any]]  # per-sentence {"sentence", "source", "path", "score", "linked"}
+    report_sections: Dict[str, str]  # section title -> generated section body (sectioned report mode)
     
     # Quality Assurance
     quality_check: Optional[Dict[str, Any]]
+    quality_precheck: Optional[Dict[str, Any]]
     reflection_count: int
     enable_quality_checker: bool
     
@@ -41,6 +51,14 @@ class ResearcherState(TypedDict):
     summarization_llm: str
     selected_database: Optional[str]
 
+class RagBranchOutput(TypedDict):
+    """
+    Output of the RAG branch subgraph. Restricted to the keys the branch owns so it
+    can run in parallel with web search without conflicting state writes.
+    """
+    retrieved_documents: Dict[str, List[DocumentRef]]
+    search_summaries: Dict[str, List[DocumentRef]]
+
 class HitlState(TypedDict):
     """
     State for the Human-in-the-Loop (HITL) process.
@@ -56,3 +74,7 @@ class HitlState(TypedDict):
     summarization_llm: str
     research_queries: List[str]
     max_search_queries: int
+    # Documents retrieved while the research queries were still being generated
+    prefetched_documents: Dict[str, List[DocumentRef]]
+    # Queries removed as semantic duplicates: {"query", "duplicate_of", "similarity"}
+    dropped_queries: List[Dict[str, Any]]
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from src.logger import get_logger
+
+log = get_logger("tracing")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TRACE_DIR = os.path.join(PROJECT_ROOT, '.cache', 'traces')
+
+# Spans kept per tracer; older spans are dropped (and counted) beyond this
+MAX_SPANS = 100000
+
+
+class Span:
+    """
+    One timed operation: a graph node, an LLM call, an embedding batch, a vector search...
+
+    Wall time and CPU time (of the thread that runs the span) are measured when the span
+    closes; attributes such as input_tokens, output_tokens or cache_hits can be set while
+    it is open.
+    """
+
+    __slots__ = ("name", "category", "span_id", "parent_id", "thread", "start", "wall_ms", "cpu_ms",
+                 "attributes", "error", "_t0", "_cpu0")
+
+    def __init__(self, name: str, category: str, parent_id: Optional[str] = None, **attributes):
+        self.name = name
+        self.category = category
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.wall_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+        self.attributes: Dict[str, Any] = {k: v for k, v in attributes.items() if v is not None}
+        self.error: Optional[str] = None
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.thread_time()
+
+    def set(self, **attributes) -> None:
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def add(self, name: str, value: float = 1) -> None:
+        """Increment a numeric attribute (e.g. cache_hits)."""
+        self.attributes[name] = self.attributes.get(name, 0) + value
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.wall_ms = round((time.perf_counter() - self._t0) * 1000, 3)
+        self.cpu_ms = round((time.thread_time() - self._cpu0) * 1000, 3)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "thread": self.thread,
+            "start": round(self.start, 6),
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NullSpan:
+    """Stand-in yielded when tracing is off, so call sites never need to check."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def add(self, name: str, value: float = 1) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Thread-safe collection of finished spans with JSONL and Chrome trace export."""
+
+    def __init__(self, name: str = "trace", max_spans: int = MAX_SPANS):
+        self.name = name
+        self.max_spans = max_spans
+        self.dropped = 0
+        self._spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) > self.max_spans:
+                del self._spans[0]
+                self.dropped += 1
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def drain(self) -> List[Span]:
+        with self._lock:
+            spans, self._spans = self._spans, []
+        return spans
+
+    def extend(self, spans: List[Span]) -> None:
+        for span in spans:
+            self.add(span)
+
+    def to_jsonl(self) -> str:
+        return "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in self.spans())
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event format (chrome://tracing, Perfetto, speedscope)."""
+        pid = os.getpid()
+        threads: Dict[str, int] = {}
+        events = []
+        for span in sorted(self.spans(), key=lambda s: s.start):
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            args = dict(span.attributes, cpu_ms=span.cpu_ms)
+            if span.error:
+                args["error"] = span.error
+            events.append({
+                "name": span.name, "cat": span.category, "ph": "X", "pid": pid, "tid": tid,
+                "ts": round(span.start * 1e6), "dur": round((span.wall_ms or 0) * 1000), "args": args,
+            })
+        events.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                      for name, tid in threads.items())
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace": self.name, "dropped": self.dropped}}
+
+    def export(self, path: str, fmt: str = "jsonl") -> str:
+        """Write the spans to `path` as "jsonl" or "chrome" and return the path."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "chrome":
+                json.dump(self.to_chrome_trace(), f, default=str)
+            else:
+                f.write(self.to_jsonl())
+        return path
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Totals per span name: count, wall_ms, cpu_ms, errors and summed numeric attributes."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans():
+            entry = totals.setdefault(span.name, {"category": span.category, "count": 0, "wall_ms": 0.0,
+                                                  "cpu_ms": 0.0, "errors": 0})
+            entry["count"] += 1
+            entry["wall_ms"] = round(entry["wall_ms"] + (span.wall_ms or 0), 3)
+            entry["cpu_ms"] = round(entry["cpu_ms"] + (span.cpu_ms or 0), 3)
+            entry["errors"] += span.error is not None
+            for key, value in span.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    entry[key] = entry.get(key, 0) + value
+        return totals
+
+
+# Tracer of the current research run (see trace_run); spans outside a run go to the
+# process-wide tracer if tracing is enabled in the configuration.
+_run_tracer: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar("run_tracer", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_current_node: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_node", default=None)
+_default_tracer = Tracer("default")
+
+
+def get_default_tracer() -> Tracer:
+    return _default_tracer
+
+
+def is_tracing_enabled() -> bool:
+    from src.configuration import get_config_instance
+    return bool(get_config_instance().enable_tracing)
+
+
+def get_active_tracer() -> Optional[Tracer]:
+    tracer = _run_tracer.get()
+    if tracer is not None:
+        return tracer
+    return _default_tracer if is_tracing_enabled() else None
+
+
+@contextmanager
+def span(name: str, category: str = "function", activate: bool = True, **attributes) -> Iterator[Any]:
+    """
+    Record a span around a block. Yields the Span (or a no-op stand-in when tracing is off).
+
+    Spans opened inside become its children. Use activate=False for spans around
+    generators, whose body runs interleaved with the caller.
+    """
+    tracer = get_active_tracer()
+    if tracer is None:
+        yield NULL_SPAN
+        return
+    parent = _current_span.get()
+    current = Span(name, category, parent_id=parent.span_id if parent else None, **attributes)
+    reset = _current_span.set(current) if activate else None
+    try:
+        yield current
+    except GeneratorExit:
+        # A consumer that stops iterating early is not an error
+        current.finish()
+        raise
+    except BaseException as e:
+        current.finish(error=e)
+        raise
+    else:
+        current.finish()
+    finally:
+        if reset is not None:
+            _current_span.reset(reset)
+        tracer.add(current)
+
+
+def current_span() -> Any:
+    """The innermost open span of this context (a no-op stand-in if there is none)."""
+    return _current_span.get() or NULL_SPAN
+
+
+def traced(category: str = "function", name: Optional[str] = None) -> Callable:
+    """Decorator recording a span per call of the function."""
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_current_node() -> Optional[str]:
+    """Name of the graph node running in this context (set by traced_node, also with tracing off)."""
+    return _current_node.get()
+
+
+def traced_node(node: Callable) -> Callable:
+    """Graph node wrapper: one "node" span per call, tagged with the keys of the state update."""
+    @wraps(node)
+    def wrapper(state, config=None):
+        from src.perf_metrics import get_performance_store
+        from src.profiling import profile_block
+        reset = _current_node.set(node.__name__)
+        start, t0, error = time.time(), time.perf_counter(), None
+        try:
+            with span(node.__name__, "node") as current, profile_block(node.__name__):
+                result = node(state, config)
+                if isinstance(result, dict):
+                    current.set(updates=sorted(result))
+                return result
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _current_node.reset(reset)
+            # Node timings feed the performance dashboard whether or not tracing is enabled
+            get_performance_store().record_node(node.__name__, start, (time.perf_counter() - t0) * 1000, error)
+    return wrapper
+
+
+def get_trace_path(run_id: str, fmt: str = "jsonl", trace_dir: Optional[str] = None) -> str:
+    trace_dir = trace_dir or os.environ.get("RESEARCH_TRACE_DIR") or DEFAULT_TRACE_DIR
+    suffix = "trace.json" if fmt == "chrome" else "jsonl"
+    return os.path.join(trace_dir, f"{time.strftime('%Y%m%d-%H%M%S')}_{run_id}.{suffix}")
+
+
+@contextmanager
+def trace_run(run_id: str, export: bool = True, fmt: Optional[str] = None, trace_dir: Optional[str] = None):
+    """
+    Collect the spans of one research run (including spans recorded before it, e.g. of the
+    HITL phase, in the process-wide tracer) and export them when the run ends.
+    Yields the run's Tracer, or None if tracing is disabled.
+    """
+    if not is_tracing_enabled():
+        yield None
+        return
+    from src.configuration import get_config_instance
+    conf = get_config_instance()
+    fmt = fmt or conf.trace_format
+    tracer = Tracer(run_id)
+    tracer.extend(_default_tracer.drain())
+    reset = _run_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _run_tracer.reset(reset)
+        if export:
+            try:
+                path = tracer.export(get_trace_path(run_id, fmt, trace_dir or conf.trace_dir), fmt)
+                log.info("Trace written", path=path)
+            except OSError as e:
+                log.warning("Could not write trace", error=str(e))
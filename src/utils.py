@@ -1,12 +1,22 @@
 import os
 import re
+import time
 import shutil
 import json
-import torch
-from ollama import chat
-from tavily import TavilyClient
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from src.cancellation import get_cancellation_token, ConnectionAborter
+from src.tracing import span
+from src.llm_metrics import OllamaMetrics, LLMResult, record_llm_metrics, timing_fields
+from src.cassette import get_cassette, through_cassette, request_key
+from src.logger import get_logger
+from src.lazy_imports import lazy_import, is_imported
+
+log = get_logger("utils")
+
+# Imported on first use: torch alone takes seconds to import
+torch = lazy_import("torch")
+ollama = lazy_import("ollama")
 
 class DetectedLanguage(BaseModel):
     language: str
@@ -14,13 +24,29 @@ class DetectedLanguage(BaseModel):
 class Queries(BaseModel):
     queries: List[str]
 
+class HitlTurn(BaseModel):
+    analysis: str
+    follow_up_questions: List[str]
+
+class KnowledgeBaseQuestions(BaseModel):
+    analysis: str
+    queries: List[str]
+
+class SectionTransition(BaseModel):
+    section: str
+    transition: str
+
+class ReportCoherence(BaseModel):
+    transitions: List[SectionTransition]
+
 
 def clear_cuda_memory():
     """
     Clear CUDA memory cache to free up GPU resources between queries.
-    Only has an effect if CUDA is available.
+    Only has an effect if CUDA is available; a no-op until something (e.g. the
+    embedding model) has imported torch, since nothing can be on the GPU before that.
     """
-    if torch.cuda.is_available():
+    if is_imported("torch") and torch.cuda.is_available():
         # Empty the cache
         torch.cuda.empty_cache()
         
@@ -28,56 +54,291 @@ def clear_cuda_memory():
         import gc
         gc.collect()
         
-        print("CUDA memory cache cleared")
+        log.debug("CUDA memory cache cleared")
     return
 
+def estimate_tokens(text):
+    """
+    Cheap token estimate (~4 characters per token) used for prompt budgeting.
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+def split_sentences(text):
+    """
+    Split text into sentences on sentence punctuation and line breaks.
+    Empty fragments are dropped.
+    """
+    if not text:
+        return []
+    parts = re.split(r'(?<=[.!?;:])\s+(?=[\"\'(\[]?[A-ZÄÖÜ0-9])|\n\s*\n|\n(?=\s*(?:[-*•]|\d+\.)\s)', text)
+    sentences = []
+    carry = ""
+    for part in parts:
+        part = (part or "").strip()
+        if not part:
+            continue
+        # Re-attach enumeration markers like "1." or "a)" to the following sentence
+        if re.fullmatch(r'(\d+|[a-zA-Z])[.)]', part):
+            carry = f"{carry} {part}".strip()
+            continue
+        sentences.append(f"{carry} {part}".strip() if carry else part)
+        carry = ""
+    if carry:
+        sentences.append(carry)
+    return sentences
+
 def get_configured_llm_model(default_model='deepseek-r1:latest'):
     return os.environ.get('LLM_MODEL', default_model)
 
 
+def get_ollama_base_url():
+    """Ollama endpoint from OLLAMA_HOST (as used by the ollama client), for the langchain Ollama wrapper."""
+    host = os.environ.get("OLLAMA_HOST", "").strip()
+    if not host:
+        return "http://localhost:11434"
+    if "://" not in host:
+        host = f"http://{host}"
+    return host.rstrip("/")
+
 def invoke_ollama(model, system_prompt, user_prompt, output_format=None):
+    return invoke_ollama_with_metrics(model, system_prompt, user_prompt, output_format).output
+
+def invoke_ollama_with_metrics(model, system_prompt, user_prompt, output_format=None):
+    """
+    Like invoke_ollama, but return an LLMResult with the output and the server-side
+    timing metrics of the response (also recorded in the LLM metrics registry).
+    """
     # Use the configured model if none is specified
     if model is None:
         model = get_configured_llm_model()
     
-    print(f"  [DEBUG] Actually using model in invoke_ollama: {model}")
-    
     # All models now use Ollama backend
-    print(f"  [DEBUG] Using Ollama backend for {model}")
+    log.debug("Invoking Ollama", model=model)
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt}
     ]
     
-    try:
-        response = chat(
+    format = output_format.model_json_schema() if output_format else None
+    
+    with span("invoke_ollama", "llm", model=model, output_format=output_format.__name__ if output_format else None,
+              input_tokens=estimate_tokens(system_prompt) + estimate_tokens(user_prompt)) as current:
+        try:
+            # Recorded or replayed when a cassette is active (see src/cassette.py)
+            result = through_cassette(
+                "llm", {"model": model, "messages": messages, "format": format},
+                lambda: _chat_content(messages, model, format),
+                describe={"model": model, "prompt_chars": len(system_prompt) + len(user_prompt)}
+            )
+            content, timing = result["content"], result["timing"]
+        
+            if not content.strip():
+                error_msg = f"Error: The LLM model {model} returned an empty response."
+                log.error("Empty LLM response", model=model)
+                raise ValueError(error_msg)
+            current.set(output_tokens=estimate_tokens(content))
+            metrics = record_llm_metrics(OllamaMetrics.from_response(timing, model=model) if timing
+                                         else OllamaMetrics(model=model))
+
+            if output_format:
+                return LLMResult(output_format.model_validate_json(content), metrics)
+            else:
+                return LLMResult(content, metrics)
+            
+        except Exception as e:
+            if "returned an empty response" in str(e):
+                raise
+            log.error("Exception in Ollama backend", model=model, error=str(e))
+            raise Exception(f"Error invoking Ollama model {model}: {str(e)}") from e
+
+def _chat_content(messages, model, format=None):
+    """One chat completion as {"content", "timing"} (timing: fields of the final response)."""
+    if get_cancellation_token() is not None:
+        # Streamed so a cancelled run can abort the request (see _chat_stream)
+        stats = {}
+        content = "".join(_chat_stream(messages, model, format, stats=stats))
+        response = stats.get("response")
+    else:
+        response = ollama.chat(
             messages=messages,
             model=model,
-            format=output_format.model_json_schema() if output_format else None
+            format=format
         )
-        
+    
         if not response or not response.message or not response.message.content:
             error_msg = f"Error: The LLM model {model} returned an empty response."
-            print(f"  [ERROR] {error_msg}")
+            log.error("Empty LLM response", model=model)
             raise ValueError(error_msg)
-        
+    
         content = response.message.content
-        
-        if not content.strip():
-            error_msg = f"Error: The LLM model {model} returned an empty response."
-            print(f"  [ERROR] {error_msg}")
-            raise ValueError(error_msg)
+    return {"content": content, "timing": timing_fields(response) if response else None}
+
+def _cassette_chat_stream(messages, model, format=None, stats=None):
+    """_chat_stream recorded to or replayed from the active cassette (same entries as invoke_ollama)."""
+    cassette = get_cassette()
+    if cassette is None:
+        yield from _chat_stream(messages, model, format, stats=stats)
+        return
+    request = {"model": model, "messages": messages, "format": format}
+    prompt_chars = sum(len(m["content"]) for m in messages)
+    if cassette.mode == "replay":
+        result = through_cassette("llm", request, None, describe={"model": model, "prompt_chars": prompt_chars})
+        if stats is not None and result["timing"]:
+            stats["response"] = result["timing"]
+        content = result["content"]
+        for i in range(0, len(content), 64):
+            yield content[i:i + 64]
+        return
+    chunks, stream_stats = [], {}
+    start = time.perf_counter()
+    for chunk in _chat_stream(messages, model, format, stats=stream_stats):
+        chunks.append(chunk)
+        yield chunk
+    response = stream_stats.get("response")
+    if stats is not None and response is not None:
+        stats["response"] = response
+    cassette.record("llm", request_key("llm", request), {"model": model, "prompt_chars": prompt_chars},
+                    {"content": "".join(chunks), "timing": timing_fields(response) if response else None},
+                    (time.perf_counter() - start) * 1000)
 
-        if output_format:
-            return output_format.model_validate_json(content)
+def _chat_stream(messages, model, format=None, stats=None):
+    """
+    Yield the content chunks of a streamed Ollama chat completion.
+    If `stats` is a dict, the final chunk (with the timing fields) is stored as stats["response"].
+    
+    Within a cancellation scope (src.cancellation) the request runs on its own client
+    whose connection is shut down as soon as the run is cancelled, so Ollama stops
+    prefill/decoding for it right away; ResearchCancelled is raised to the caller.
+    """
+    token = get_cancellation_token()
+    if token is None:
+        for chunk in ollama.chat(messages=messages, model=model, format=format, stream=True):
+            if chunk.done and stats is not None:
+                stats["response"] = chunk
+            if chunk.message and chunk.message.content:
+                yield chunk.message.content
+        return
+    
+    token.raise_if_cancelled()
+    aborter = ConnectionAborter()
+    client = ollama.Client(event_hooks={"request": [aborter.request_hook]})
+    handle = token.on_cancel(aborter.abort)
+    try:
+        # Cancelled before the abort callback was registered (e.g. while ollama was imported)
+        token.raise_if_cancelled()
+        for chunk in client.chat(messages=messages, model=model, format=format, stream=True):
+            token.raise_if_cancelled()
+            if chunk.done and stats is not None:
+                stats["response"] = chunk
+            if chunk.message and chunk.message.content:
+                yield chunk.message.content
+    except Exception:
+        # An aborted connection surfaces as a transport error
+        token.raise_if_cancelled()
+        raise
+    finally:
+        token.remove_callback(handle)
+        client.close()
+
+def load_ollama_model(model, keep_alive="30m"):
+    """
+    Load `model` into Ollama without generating anything (an empty prompt only loads it)
+    and keep it resident for `keep_alive`. Returns the load duration in milliseconds
+    (close to 0 if the model was already loaded).
+    """
+    response = ollama.generate(model=model, prompt="", keep_alive=keep_alive)
+    return (timing_fields(response).get("load_duration") or 0) / 1e6
+
+def stream_ollama(model, system_prompt, user_prompt, format=None):
+    """
+    Stream an Ollama chat completion and yield the content chunks as they arrive.
+    `format` may be a JSON schema dict to constrain the output.
+    """
+    if model is None:
+        model = get_configured_llm_model()
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    
+    # Not activated: the generator body runs interleaved with the caller's spans
+    with span("stream_ollama", "llm", activate=False, model=model,
+              input_tokens=estimate_tokens(system_prompt) + estimate_tokens(user_prompt)) as current:
+        output_chars = 0
+        stats = {}
+        try:
+            for chunk in _cassette_chat_stream(messages, model, format, stats=stats):
+                output_chars += len(chunk)
+                yield chunk
+        except Exception as e:
+            log.error("Exception in Ollama streaming", model=model, error=str(e))
+            raise Exception(f"Error streaming Ollama model {model}: {str(e)}") from e
+        finally:
+            current.set(output_tokens=output_chars // 4)
+            if "response" in stats:
+                record_llm_metrics(OllamaMetrics.from_response(stats["response"], model=model), current)
+
+def _json_string_end(buffer, i):
+    """Index of the quote closing the JSON string that opens at buffer[i], or -1 if not complete yet."""
+    j, escaped = i + 1, False
+    while j < len(buffer):
+        if escaped:
+            escaped = False
+        elif buffer[j] == '\\':
+            escaped = True
+        elif buffer[j] == '"':
+            return j
+        j += 1
+    return -1
+
+def extract_streamed_json_list(buffer, key):
+    """
+    Return the completed string items of the JSON array `key` in a partially
+    streamed JSON object, e.g. '{"queries": ["a", "b", "c' -> ['a', 'b'].
+    Only a key outside string literals counts, so a value that quotes
+    '"queries": [' (escaped) does not start the list.
+    """
+    # Find the key: skip over string literals, checking each one that is followed by ': ['
+    opening = re.compile(r'\s*:\s*\[')
+    start, i, n = None, 0, len(buffer)
+    while i < n:
+        if buffer[i] != '"':
+            i += 1
+            continue
+        j = _json_string_end(buffer, i)
+        if j < 0:
+            return []
+        if buffer[i + 1:j] == key:
+            match = opening.match(buffer, j + 1)
+            if match:
+                start = match.end()
+                break
+        i = j + 1
+    if start is None:
+        return []
+    
+    items = []
+    i = start
+    while i < n:
+        c = buffer[i]
+        if c == ']':
+            break
+        if c == '"':
+            j = _json_string_end(buffer, i)
+            if j < 0:
+                # String not complete yet
+                break
+            try:
+                items.append(json.loads(buffer[i:j + 1]))
+            except json.JSONDecodeError:
+                pass
+            i = j + 1
         else:
-            return content
-            
-    except Exception as e:
-        if "returned an empty response" in str(e):
-            raise
-        print(f"  [ERROR] Exception in Ollama backend with model {model}: {str(e)}")
-        raise Exception(f"Error invoking Ollama model {model}: {str(e)}") from e
+            i += 1
+    return items
 
 def parse_output(text):
     """
@@ -120,45 +381,38 @@ def parse_output(text):
     }
 
 def tavily_search(query, include_raw_content=True, max_results=3):
-    """ Search the web using the Tavily API. """
-    tavily_client = TavilyClient()
-    return tavily_client.search(
-        query,
-        max_results=max_results,
-        include_raw_content=include_raw_content
-    )
-
-def format_documents_with_metadata(documents, preserve_original=False):
+    """
+    Search the web using the Tavily API (over the shared client of src.web_search).
+    Set TAVILY_API_BASE_URL to point the client at a different endpoint (e.g. a local stand-in).
+    """
+    from src.web_search import run_async, search_queries_async
+    response = run_async(search_queries_async([query], max_results=max_results, include_raw_content=include_raw_content))[0]
+    if isinstance(response, BaseException):
+        raise response
+    return response
+
+def format_documents_with_metadata(documents, preserve_original=False, selected_database=None):
+    from src.kb_catalog import get_catalog
+    if selected_database is None:
+        from src.configuration import get_config_instance
+        selected_database = get_config_instance().selected_database
+    catalog = get_catalog(selected_database)
+    files_dir = os.path.join(os.getcwd(), 'files')
+    
     formatted_docs = []
     for doc in documents:
         # Get the source filename from metadata
         source = doc.metadata.get('source', 'Unknown source')
         
-        # Ensure we have an absolute path to the document
-        doc_path = ''
-        if 'path' in doc.metadata and os.path.isfile(doc.metadata['path']):
-            doc_path = doc.metadata['path']
-        elif 'source' in doc.metadata:
-            # Try to construct an absolute path to the file in the files directory
-            potential_path = os.path.abspath(os.path.join(os.getcwd(), 'files', source))
-            if os.path.isfile(potential_path):
-                doc_path = potential_path
-            else:
-                doc_path = os.path.abspath(os.path.join(os.getcwd(), 'files', source))
-        
         # Extract just the filename for display
         filename = os.path.basename(source) if source != 'Unknown source' else 'Unknown source'
         
+        # Resolve the absolute path via the KB catalog (dictionary lookup, no filesystem calls)
+        entry = catalog.resolve(source=source, path=doc.metadata.get('path'))
+        doc_path = entry["path"] if entry else os.path.join(files_dir, filename)
+        
         # Format with markdown link
-        if doc_path:
-            if '/files/' not in doc_path and '\\files\\' not in doc_path:
-                files_dir = os.path.join(os.getcwd(), 'files')
-                doc_path = os.path.join(files_dir, filename)
-            source_link = f"[{filename}]({doc_path})"
-        else:
-            files_dir = os.path.join(os.getcwd(), 'files')
-            doc_path = os.path.join(files_dir, filename)
-            source_link = f"[{filename}]({doc_path})"
+        source_link = f"[{filename}]({doc_path})"
         
         if preserve_original:
             formatted_doc = f"SOURCE: {source_link}\n\nContent: {doc.page_content}"
@@ -1,15 +1,21 @@
 import os
-import logging
-from typing import List
-# Use updated import path to avoid deprecation warning
-try:
-    from langchain_huggingface import HuggingFaceEmbeddings
-except ImportError:
-    # Fallback to original import if package is not installed
-    from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.document_loaders import DirectoryLoader
-from langchain_chroma import Chroma
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 from langchain_core.documents import Document
+from src.tracing import span
+from src.perf_metrics import get_performance_store
+from src.profiling import profiled
+from src.cassette import wrap_embeddings
+from src.logger import get_logger
+from src.lazy_imports import lazy_import
+
+log = get_logger("vector_db")
+
+# Chroma (and chromadb) take about a second to import; loaded on first use
+langchain_chroma = lazy_import("langchain_chroma")
 
 # Base path for vector database
 VECTOR_DB_PATH = "database"
@@ -23,6 +29,88 @@ SPECIAL_DB_CONFIG = {
     }
 }
 
+# Embeddings of chunks returned by `search_documents`, keyed by chunk id, so later stages
+# (e.g. source linking) can reuse them instead of re-embedding the chunk texts.
+# Least recently used entries are evicted; searches fill it from several threads.
+CHUNK_EMBEDDING_CACHE_SIZE = 20000
+_chunk_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+_chunk_embeddings_lock = threading.Lock()
+
+# Loaded embedding models by name, and opened Chroma collections (see open_vectorstore)
+VECTORSTORE_CACHE_SIZE = 4
+_embedding_models = {}
+_embedding_models_lock = threading.Lock()
+_vectorstores: "OrderedDict[tuple, object]" = OrderedDict()
+_vectorstores_lock = threading.Lock()
+
+def get_chunk_key(doc: Document) -> str:
+    """Stable key of a retrieved chunk: its vector store id or a hash of source and content."""
+    chunk_id = doc.metadata.get("chunk_id") or getattr(doc, "id", None)
+    if chunk_id:
+        return chunk_id
+    raw = f"{doc.metadata.get('source', '')}\n{doc.page_content}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def cache_chunk_embeddings(vectorstore, docs: List[Document]) -> None:
+    """Fetch the stored embeddings of retrieved chunks from Chroma and cache them."""
+    ids = []
+    with _chunk_embeddings_lock:
+        for doc in docs:
+            chunk_id = getattr(doc, "id", None)
+            if not chunk_id:
+                continue
+            if chunk_id in _chunk_embeddings:
+                _chunk_embeddings.move_to_end(chunk_id)
+            else:
+                ids.append(chunk_id)
+    if not ids:
+        return
+    # Fetched without holding the lock; a concurrent fetch of the same ids only stores them twice
+    stored = vectorstore.get(ids=ids, include=["embeddings"])
+    embeddings = stored.get("embeddings")
+    if embeddings is None:
+        return
+    with _chunk_embeddings_lock:
+        for chunk_id, embedding in zip(stored.get("ids", []), embeddings):
+            _chunk_embeddings[chunk_id] = list(embedding)
+            _chunk_embeddings.move_to_end(chunk_id)
+        while len(_chunk_embeddings) > CHUNK_EMBEDDING_CACHE_SIZE:
+            _chunk_embeddings.popitem(last=False)
+
+def get_cached_chunk_embeddings(docs: List[Document]) -> List[Optional[List[float]]]:
+    """Return the cached embedding for each document (None where not cached)."""
+    found = []
+    with _chunk_embeddings_lock:
+        for doc in docs:
+            key = get_chunk_key(doc)
+            embedding = _chunk_embeddings.get(key)
+            if embedding is not None:
+                _chunk_embeddings.move_to_end(key)
+            found.append(embedding)
+    return found
+
+def huggingface_embeddings_class():
+    """HuggingFaceEmbeddings, imported on first use (it pulls in torch and sentence-transformers)."""
+    # Use updated import path to avoid deprecation warning
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+    except ImportError:
+        # Fallback to original import if package is not installed
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings
+
+def load_embedding_model(model_name: str):
+    """HuggingFace embedding model, loaded once per process and model name."""
+    with _embedding_models_lock:
+        model = _embedding_models.get(model_name)
+        if model is None:
+            started = time.perf_counter()
+            model = huggingface_embeddings_class()(model_name=model_name, model_kwargs={'device': 'cpu'})
+            _embedding_models[model_name] = model
+            log.info("Embedding model loaded", model=model_name, ms=round((time.perf_counter() - started) * 1000))
+        return model
+
+@profiled
 def get_embedding_model():
     """Get the embedding model."""
     from src.configuration import get_config_instance
@@ -30,11 +118,12 @@ def get_embedding_model():
     # Get the embedding model from the global configuration instance
     embedding_model_name = get_config_instance().embedding_model
     
-    emb_model = HuggingFaceEmbeddings(model_name=embedding_model_name, model_kwargs={'device': 'cpu'})
-    print('-------------------------')
-    print(f"Using embedding model: {embedding_model_name}")
-    print(emb_model)
-    print('-------------------------')
+    with span("get_embedding_model", "embedding", model=embedding_model_name):
+        # Behind the cassette (and only loaded when needed) when recording or replaying, see src/cassette.py
+        emb_model = wrap_embeddings(
+            embedding_model_name,
+            lambda: load_embedding_model(embedding_model_name)
+        )
     return emb_model
 
 def get_embedding_model_path():
@@ -69,41 +158,21 @@ def get_tenant_vectorstore(tenant_id, embed_llm, persist_directory, similarity,
     # Get collection name for tenant
     collection_name = get_tenant_collection_name(tenant_id)
     
-    return Chroma(
+    return langchain_chroma.Chroma(
         persist_directory=tenant_vdb_dir,
         collection_name=collection_name,
         embedding_function=embed_llm,
         collection_metadata={"hnsw:space": similarity, "normalize_embeddings": normal}
     )
 
-def search_documents(query: str, k: int = 3, language: str = "English") -> List[Document]:
+def resolve_knowledge_base(selected_database: Optional[str] = None) -> Tuple[str, str]:
     """
-    Search for documents in the vector database.
-    
-    Args:
-        query: The search query.
-        k: Number of documents to retrieve.
-        language: Language of the query.
-        
-    Returns:
-        List of retrieved Documents.
+    Chroma directory and collection of a knowledge base (default: the selected database
+    of the configuration, else the database matching the configured embedding model).
     """
-    
-    # Set up logging
-    logging.basicConfig(level=logging.INFO)
-    logger = logging.getLogger(__name__)
-    
-    # Clear CUDA memory before embedding
-    from src.utils import clear_cuda_memory
-    clear_cuda_memory()
-    
-    # Get the configured embedding model
-    embeddings = get_embedding_model()
-    
-    # Get the selected database from configuration
     from src.configuration import get_config_instance
     config = get_config_instance()
-    selected_database = config.selected_database
+    selected_database = selected_database or config.selected_database
     
     # Use absolute path for database
     # Database is located in kb/database folder relative to the project root
@@ -114,8 +183,7 @@ def search_documents(query: str, k: int = 3, language: str = "English") -> List[
     if selected_database:
         # Use the selected database from the UI
         vector_db_path = os.path.join(DATABASE_PATH, selected_database)
-        logger.info(f"Using selected database: {selected_database}")
-        logger.info(f"Database path: {vector_db_path}")
+        log.debug("Using selected database", database=selected_database, path=vector_db_path)
         
         # Check if it's a special configuration
         special_db_key = None
@@ -127,11 +195,11 @@ def search_documents(query: str, k: int = 3, language: str = "English") -> List[
         if special_db_key:
             tenant_id = SPECIAL_DB_CONFIG[special_db_key]['tenant_id']
             collection_name = SPECIAL_DB_CONFIG[special_db_key]['collection_name']
-            logger.info(f"Using special configuration - tenant: {tenant_id}, collection: {collection_name}")
+            log.debug("Using special configuration", tenant=tenant_id, collection=collection_name)
         else:
             tenant_id = DEFAULT_TENANT_ID
             collection_name = None
-            logger.info(f"Using default configuration - tenant: {tenant_id}")
+            log.debug("Using default configuration", tenant=tenant_id)
     else:
         # Fallback to embedding model-based path (legacy)
         current_embedding_model = config.embedding_model
@@ -152,53 +220,107 @@ def search_documents(query: str, k: int = 3, language: str = "English") -> List[
         
         if matching_db:
             vector_db_path = os.path.join(DATABASE_PATH, matching_db)
-            logger.info(f"Found matching database: {matching_db}")
+            log.debug("Found matching database", database=matching_db)
         else:
             vector_db_path = os.path.join(DATABASE_PATH, sanitized_model_name)
-            logger.info(f"Using fallback DB path: {vector_db_path}")
+            log.info("Using fallback DB path", path=vector_db_path)
         
         tenant_id = DEFAULT_TENANT_ID
         collection_name = None
     
+    return os.path.join(vector_db_path, tenant_id), collection_name or get_tenant_collection_name(tenant_id)
+
+def open_vectorstore(persist_directory: str, collection_name: str, embeddings):
+    """
+    Chroma collection of a knowledge base, opened once per process and embedding model
+    instance; its HNSW index stays loaded between searches.
+    """
+    key = (persist_directory, collection_name, id(embeddings))
+    with _vectorstores_lock:
+        vectorstore = _vectorstores.get(key)
+        if vectorstore is not None:
+            _vectorstores.move_to_end(key)
+    get_performance_store().record_cache("vectorstore", hits=int(vectorstore is not None),
+                                         misses=int(vectorstore is None))
+    if vectorstore is not None:
+        return vectorstore
+    vectorstore = langchain_chroma.Chroma(
+        persist_directory=persist_directory,
+        collection_name=collection_name,
+        embedding_function=embeddings,
+        collection_metadata={"hnsw:space": "cosine", "normalize_embeddings": True}
+    )
+    with _vectorstores_lock:
+        _vectorstores[key] = vectorstore
+        while len(_vectorstores) > VECTORSTORE_CACHE_SIZE:
+            _vectorstores.popitem(last=False)
+    return vectorstore
+
+def search_documents(query: str, k: int = 3, language: str = "English") -> List[Document]:
+    """
+    Search for documents in the vector database.
+    
+    Args:
+        query: The search query.
+        k: Number of documents to retrieve.
+        language: Language of the query.
+        
+    Returns:
+        List of retrieved Documents.
+    """
+    started = time.perf_counter()
+    
+    # Clear CUDA memory before embedding
+    from src.utils import clear_cuda_memory
+    clear_cuda_memory()
+    
+    # Get the configured embedding model
+    embeddings = get_embedding_model()
+    
+    # Get the selected database from configuration
+    tenant_vdb_dir, collection_name = resolve_knowledge_base()
+    
     try:
         # Similarity search logic
         clear_cuda_memory()
         
-        tenant_vdb_dir = os.path.join(vector_db_path, tenant_id)
-        
         if not os.path.exists(tenant_vdb_dir):
-            error_msg = f"Vector database directory for tenant {tenant_id} does not exist at {tenant_vdb_dir}"
-            logger.error(error_msg)
+            error_msg = f"Vector database directory {tenant_vdb_dir} does not exist"
+            log.error(error_msg)
             # Try finding any directory if the specific tenant doesn't exist? 
             # Reference implementation threw exception. We might want to be graceful.
             return []
 
-        if collection_name is None:
-            collection_name = get_tenant_collection_name(tenant_id)
-            
-        vectorstore = Chroma(
-            persist_directory=tenant_vdb_dir,
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            collection_metadata={"hnsw:space": "cosine", "normalize_embeddings": True}
-        )
+        vectorstore = open_vectorstore(tenant_vdb_dir, collection_name, embeddings)
         
-        logger.info(f"Executing similarity_search with query: '{query}' and k={k}")
-        results = vectorstore.similarity_search(query, k=k)
-        logger.info(f"Retrieved {len(results)} documents from search")
+        log.debug("Executing similarity search", query=query, k=k)
+        with span("similarity_search", "vector_search", k=k, input_tokens=len(query) // 4) as current:
+            search_start = time.perf_counter()
+            scored = vectorstore.similarity_search_with_relevance_scores(query, k=k)
+            search_ms = (time.perf_counter() - search_start) * 1000
+            current.set(results=len(scored))
+        get_performance_store().record_retrieval(query, (time.perf_counter() - started) * 1000, search_ms, k, len(scored))
+        results = [doc for doc, _ in scored]
+        log.debug("Retrieved documents", query=query, results=len(results))
         
-        # Add language metadata
-        for doc in results:
+        # Add language metadata (the relevance score travels in the document reference, see src.document_store)
+        for doc, score in scored:
             if "metadata" in doc.__dict__:
                 doc.metadata["language"] = language
+                doc.metadata["chunk_id"] = get_chunk_key(doc)
+                doc.metadata["score"] = round(float(score), 4)
+        
+        # Keep the stored chunk embeddings for source linking
+        try:
+            cache_chunk_embeddings(vectorstore, results)
+        except Exception as e:
+            log.warning("Could not cache chunk embeddings", error=str(e))
                 
-        # Clean up
-        vectorstore = None
         clear_cuda_memory()
         
         return results
         
     except Exception as e:
-        logger.error(f"Error searching for documents: {e}")
+        log.error("Error searching for documents", query=query, error=str(e))
         clear_cuda_memory()
         return []
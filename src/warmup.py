@@ -0,0 +1,163 @@
+import os
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.logger import get_logger
+
+log = get_logger("warmup")
+
+# States of a warm-up step
+PENDING, RUNNING, READY, SKIPPED, FAILED = "pending", "running", "ready", "skipped", "failed"
+
+_graphs: Dict[Optional[str], Dict[str, Any]] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_compiled_graphs(checkpoint_db_path: Optional[str] = None, checkpointing: bool = False) -> Dict[str, Any]:
+    """
+    The HITL and main graph ({"hitl", "main"}), compiled once per process. The main graph
+    uses the SQLite checkpointer of `checkpoint_db_path` when `checkpointing` is set.
+    Compiled graphs hold no run state, so concurrent sessions can share them.
+    """
+    key = (checkpoint_db_path or "default") if checkpointing else None
+    with _graphs_lock:
+        graphs = _graphs.get(key)
+        if graphs is None:
+            from src.graph import create_hitl_graph, create_main_graph
+            checkpointer = None
+            if checkpointing:
+                from src.checkpointing import get_checkpointer
+                checkpointer = get_checkpointer(checkpoint_db_path)
+            graphs = {"hitl": create_hitl_graph(), "main": create_main_graph(checkpointer=checkpointer)}
+            _graphs[key] = graphs
+        return graphs
+
+
+class ResourceWarmer:
+    """
+    Loads what the first research run would otherwise wait for, in background threads:
+
+    - graphs: compiles the HITL and main graph (get_compiled_graphs)
+    - embedding_model: loads the embedding model of the knowledge base and embeds a query
+    - vector_index: opens the Chroma collection and runs a search, so the HNSW index is in memory
+    - ollama:<model>: loads each LLM into Ollama and keeps it resident for `keep_alive`
+
+    The Ollama models load on the server while the embedding model loads locally. status()
+    reports the state of each step (pending, running, ready, skipped or failed).
+    """
+
+    def __init__(self, selected_database: Optional[str], embedding_model: str, llm_models: List[str],
+                 checkpoint_db_path: Optional[str] = None, checkpointing: bool = False, keep_alive: str = "30m"):
+        self.selected_database = selected_database
+        self.embedding_model = embedding_model
+        self.llm_models = list(dict.fromkeys(m for m in llm_models if m))
+        self.checkpoint_db_path = checkpoint_db_path
+        self.checkpointing = checkpointing
+        self.keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self._steps: Dict[str, Dict[str, Any]] = {
+            name: {"step": name, "state": PENDING, "ms": None, "detail": None}
+            for name in ["graphs", "embedding_model", "vector_index"] + [f"ollama:{m}" for m in self.llm_models]
+        }
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "ResourceWarmer":
+        tracks = [self._warm_local, self._warm_ollama]
+        self._threads = [threading.Thread(target=track, name=f"warmup-{i}", daemon=True) for i, track in enumerate(tracks)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until all steps finished (or timeout); returns True if they did."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return self.done
+
+    @property
+    def done(self) -> bool:
+        return all(step["state"] not in (PENDING, RUNNING) for step in self.status())
+
+    @property
+    def ready(self) -> bool:
+        return all(step["state"] in (READY, SKIPPED) for step in self.status())
+
+    def status(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(step) for step in self._steps.values()]
+
+    def _update(self, name: str, **values) -> None:
+        with self._lock:
+            self._steps[name].update(values)
+
+    def _run_step(self, name: str, fn) -> Any:
+        """Run one step; fn returns (result, detail) or raises. A failed step does not stop the others."""
+        self._update(name, state=RUNNING)
+        start = time.perf_counter()
+        try:
+            result, detail = fn()
+        except Exception as e:
+            ms = round((time.perf_counter() - start) * 1000, 1)
+            self._update(name, state=FAILED, ms=ms, detail=str(e))
+            log.warning("Warm-up step failed", step=name, ms=ms, error=str(e))
+            return None
+        ms = round((time.perf_counter() - start) * 1000, 1)
+        self._update(name, state=READY, ms=ms, detail=detail)
+        log.info("Warm-up step ready", step=name, ms=ms, detail=detail)
+        return result
+
+    def _skip(self, name: str, reason: str) -> None:
+        self._update(name, state=SKIPPED, detail=reason)
+
+    def _warm_local(self) -> None:
+        import src.vector_db as vector_db
+        from src.cassette import is_replaying
+
+        self._run_step("graphs", lambda: (get_compiled_graphs(self.checkpoint_db_path, self.checkpointing), None))
+
+        if is_replaying():
+            # A replayed run gets its embeddings from the cassette
+            self._skip("embedding_model", "replaying a cassette")
+            self._skip("vector_index", "replaying a cassette")
+            return
+
+        def load_embeddings():
+            embeddings = vector_db.load_embedding_model(self.embedding_model)
+            return (embeddings, embeddings.embed_query("warm-up")), self.embedding_model
+
+        loaded = self._run_step("embedding_model", load_embeddings)
+        if loaded is None:
+            self._skip("vector_index", "no embedding model")
+            return
+        embeddings, vector = loaded
+        persist_directory, collection_name = vector_db.resolve_knowledge_base(self.selected_database)
+        if not os.path.exists(persist_directory):
+            self._skip("vector_index", f"{persist_directory} does not exist")
+            return
+
+        def open_index():
+            # Searches with the same (cached) embedding model instance reuse the opened collection
+            vectorstore = vector_db.open_vectorstore(persist_directory, collection_name, embeddings)
+            vectorstore.similarity_search_by_vector(vector, k=1)
+            return vectorstore, collection_name
+
+        self._run_step("vector_index", open_index)
+
+    def _warm_ollama(self) -> None:
+        from src.cassette import is_replaying
+        from src.utils import load_ollama_model
+        from src.llm_metrics import MODEL_RELOAD_THRESHOLD_MS
+
+        for model in self.llm_models:
+            name = f"ollama:{model}"
+            if is_replaying():
+                self._skip(name, "replaying a cassette")
+                continue
+
+            def load(model=model):
+                load_ms = load_ollama_model(model, self.keep_alive)
+                return None, f"loaded in {load_ms / 1000:.1f}s" if load_ms > MODEL_RELOAD_THRESHOLD_MS else "already loaded"
+
+            self._run_step(name, load)
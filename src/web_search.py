@@ -0,0 +1,278 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+import concurrent.futures
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from src.utils import estimate_tokens
+from src.cancellation import get_cancellation_token, POLL_INTERVAL
+from src.tracing import span
+from src.perf_metrics import get_performance_store
+from src.cassette import get_cassette, is_replaying, through_cassette_async
+from src.logger import get_logger
+
+log = get_logger("web_search")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, '.cache', 'web_search')
+
+# Query parameters that only track the visitor and never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "igshid"}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for deduplication: lowercase scheme and host, no 'www.',
+    no default port, no fragment, no tracking parameters, sorted query, no trailing slash.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower() or "https"
+    if scheme == "http":
+        scheme = "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def trim_to_token_budget(text: str, token_budget: int) -> str:
+    """Cut text to roughly `token_budget` tokens, preferably at a sentence or word boundary."""
+    text = (text or "").strip()
+    if token_budget <= 0:
+        return ""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    cut = text[:token_budget * 4]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < len(cut) // 2:
+        boundary = cut.rfind(" ")
+    if boundary > 0:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + " …"
+
+
+class WebSearchCache:
+    """On-disk cache of raw search responses, one JSON file per (query, parameters) with a TTL."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = 86400):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def make_key(query: str, **params) -> str:
+        payload = json.dumps({"query": query.strip().lower(), **params}, sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.ttl <= 0:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.get("response")
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        if self.ttl <= 0:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Per-thread temporary file: the same query may be stored by two threads at once
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"created": time.time(), "response": response}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            log.warning("Could not write web search cache", error=str(e))
+
+
+# One event loop thread and one Tavily client (with its httpx connection pool) per process.
+# Nodes run synchronously and possibly from several threads, so coroutines are submitted
+# to this loop instead of creating a new loop and client per call.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client = None
+_client_key = None
+_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="web-search-loop", daemon=True).start()
+        return _loop
+
+
+def _get_client():
+    """Shared AsyncTavilyClient, recreated only if the endpoint or API key changes."""
+    global _client, _client_key
+    from tavily import AsyncTavilyClient
+    base_url = os.environ.get("TAVILY_API_BASE_URL") or None
+    api_key = os.environ.get("TAVILY_API_KEY")
+    with _lock:
+        if _client is None or _client_key != (base_url, api_key):
+            _client = AsyncTavilyClient(api_key=api_key, api_base_url=base_url)
+            _client_key = (base_url, api_key)
+        return _client
+
+
+def run_async(coro, timeout: Optional[float] = None):
+    """
+    Run a coroutine on the shared web search loop and wait for its result.
+    A cancelled research run cancels the coroutine (and its in-flight requests).
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    token = get_cancellation_token()
+    if token is None:
+        return future.result(timeout)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        try:
+            return future.result(POLL_INTERVAL)
+        except concurrent.futures.TimeoutError:
+            if token.cancelled:
+                future.cancel()
+                token.raise_if_cancelled()
+            if deadline is not None and time.monotonic() > deadline:
+                future.cancel()
+                raise
+
+
+async def _search_one(client, query: str, semaphore: asyncio.Semaphore, cache: WebSearchCache,
+                      max_results: int, include_raw_content: bool) -> Dict[str, Any]:
+    key = WebSearchCache.make_key(query, max_results=max_results, include_raw_content=include_raw_content)
+    # The disk cache is read and written in worker threads, so file I/O never blocks the event loop
+    cached = await asyncio.to_thread(cache.get, key) if cache.ttl > 0 else None
+    if cached is not None:
+        return cached
+    async with semaphore:
+        response = await through_cassette_async(
+            "web_search", {"query": query, "max_results": max_results, "include_raw_content": include_raw_content},
+            lambda: client.search(query, max_results=max_results, include_raw_content=include_raw_content),
+            describe={"query": query}
+        )
+    if cache.ttl > 0:
+        await asyncio.to_thread(cache.set, key, response)
+    return response
+
+
+async def search_queries_async(queries: List[str], max_results: int = 3, include_raw_content: bool = True,
+                               max_concurrency: int = 4, cache: Optional[WebSearchCache] = None) -> List[Any]:
+    """
+    Search all queries concurrently over the shared client.
+
+    Returns:
+        One raw Tavily response per query (in query order), or the exception raised for it.
+    """
+    # A replayed run needs neither an API key nor network access
+    client = None if is_replaying() else _get_client()
+    cache = cache or WebSearchCache(ttl=0)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    return await asyncio.gather(
+        *[_search_one(client, q, semaphore, cache, max_results, include_raw_content) for q in queries],
+        return_exceptions=True
+    )
+
+
+def merge_results(queries: List[str], responses: List[Any], raw_content_tokens: int = 500) -> List[Dict[str, Any]]:
+    """
+    Merge the responses of several queries, deduplicated by canonical URL.
+    The first occurrence of a URL is kept (with its best score), the queries that found it
+    are collected and raw content is trimmed to `raw_content_tokens`.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for query, response in zip(queries, responses):
+        if isinstance(response, BaseException):
+            log.warning("Web search failed", query=query, error=str(response))
+            continue
+        for result in response.get("results", []):
+            url = result.get("url", "")
+            key = canonicalize_url(url) if url else f"{query}:{result.get('title', '')}"
+            if key in merged:
+                entry = merged[key]
+                entry["score"] = max(entry["score"], result.get("score") or 0.0)
+                if query not in entry["queries"]:
+                    entry["queries"].append(query)
+                continue
+            merged[key] = {
+                "url": url,
+                "title": result.get("title", "Unknown Title"),
+                "content": result.get("content", ""),
+                "raw_content": trim_to_token_budget(result.get("raw_content") or "", raw_content_tokens),
+                "score": result.get("score") or 0.0,
+                "queries": [query],
+            }
+    return list(merged.values())
+
+
+def format_web_results(results: List[Dict[str, Any]]) -> str:
+    """Format merged results for the report writer."""
+    formatted = ""
+    for i, res in enumerate(results):
+        formatted += f"Source {i+1}: {res['title']}\n"
+        formatted += f"URL: {res['url']}\n"
+        formatted += f"Content: {res['content']}\n"
+        if res["raw_content"]:
+            formatted += f"Excerpt: {res['raw_content']}\n"
+        formatted += "\n"
+    return formatted
+
+
+def search_web(queries: List[str], max_results: int = 3, include_raw_content: bool = True,
+               raw_content_tokens: int = 500, max_concurrency: int = 4, cache_ttl: float = 86400,
+               cache_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Search several queries concurrently and return the merged, URL-deduplicated results.
+
+    Args:
+        queries: Search queries (duplicates are searched once).
+        raw_content_tokens: Token budget of the raw page content kept per result.
+        max_concurrency: Upper bound of concurrent requests against the search API.
+        cache_ttl: Seconds a cached response stays valid (0 disables the cache).
+        cache_dir: Cache directory (defaults to WEB_SEARCH_CACHE_DIR or .cache/web_search).
+    """
+    queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    if not queries:
+        return []
+    if get_cassette() is not None:
+        # Every search has to reach the cassette to be recorded (or replayed)
+        cache_ttl = 0
+    cache = WebSearchCache(cache_dir or os.environ.get("WEB_SEARCH_CACHE_DIR") or DEFAULT_CACHE_DIR, ttl=cache_ttl)
+    with span("search_web", "web_search", queries=len(queries)) as current:
+        try:
+            responses = run_async(search_queries_async(
+                queries, max_results=max_results, include_raw_content=include_raw_content,
+                max_concurrency=max_concurrency, cache=cache
+            ))
+        finally:
+            current.set(cache_hits=cache.hits, cache_misses=cache.misses)
+            get_performance_store().record_cache("web_search", cache.hits, cache.misses)
+        results = merge_results(queries, responses, raw_content_tokens=raw_content_tokens)
+        current.set(results=len(results), failed_queries=sum(isinstance(r, BaseException) for r in responses))
+        return results